@@ -0,0 +1,467 @@
+"""마크다운 → HTML 변환 벤치마크
+
+main.convert_markdown(단일 패스 파서)과 이전 정규식 체인 구현을
+1~10MB 크기의 합성 챕터에서 비교한다.
+
+    python benchmark.py --sizes 1,2,5,10 --repeat 3
+
+--csv-rows를 주면 대기질 CSV 열 캐시(main.load_air_quality)의
+최초 파싱과 mmap 재로딩 시간도 측정한다.
+
+    python benchmark.py --sizes 1 --csv-rows 2000000
+
+--suite를 주면 합성 논문 원고 트리(챕터 파일 수, 제목 깊이, 전체 크기 변경)를 만들어
+collect_sections부터 HTML/PDF 변환까지 단계별 시간, 처리량(MB/s), 최대 메모리를 재고
+JSON으로 저장한다. --baseline으로 이전 결과와 비교해 느려진 단계를 찾는다.
+
+    python benchmark.py --suite --suite-sizes 0.01,0.1,1,10 --output bench.json
+    python benchmark.py --suite --baseline bench.json
+"""
+import argparse
+import contextlib
+import html
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import main
+
+# 이전 구현 (비교 기준용, main.py의 정규식 체인을 그대로 옮김)
+def legacy_convert_table_to_html(table_md, table_num=None):
+    rows = [row for row in table_md.strip().split('\n') if row.strip()]
+
+    if len(rows) < 2:
+        return f"<p>테이블 형식 오류: {table_md}</p>"
+
+    html_table = '<table>\n'
+    if table_num:
+        html_table += f'<caption>표 {table_num}</caption>\n'
+
+    # 헤더 행
+    header_cells = [cell.strip() for cell in rows[0].split('|')]
+    header_cells = [cell for cell in header_cells if cell != '']  # 빈 셀 제거
+
+    html_table += '<thead>\n<tr>\n'
+    for cell in header_cells:
+        html_table += f'<th>{cell}</th>\n'
+    html_table += '</tr>\n</thead>\n'
+
+    # 본문 행
+    html_table += '<tbody>\n'
+    for row in rows[2:]:  # 첫 행(헤더)과 두 번째 행(구분선)을 건너뜀
+        if not row.strip() or not '|' in row:
+            continue
+        cells = [cell.strip() for cell in row.split('|')]
+        cells = [cell for cell in cells if cell != '']  # 빈 셀 제거
+
+        html_table += '<tr>\n'
+        for cell in cells:
+            html_table += f'<td>{cell}</td>\n'
+        html_table += '</tr>\n'
+
+    html_table += '</tbody>\n</table>'
+    return html_table
+
+def legacy_convert_markdown(text):
+    # 이미지 처리
+    def process_image(match):
+        alt = match.group(1) or "그림"
+        path = match.group(2)
+
+        # 상대 경로 처리
+        if not path.startswith(('http://', 'https://')):
+            filename = os.path.basename(path)
+            path = f'images/{filename}'
+
+        return f'<figure><img src="{path}" alt="{alt}"><figcaption>{alt}</figcaption></figure>'
+
+    # 코드 블록 처리
+    def process_code_block(match):
+        lang = match.group(1) or ""
+        code = match.group(2)
+        return f'<pre><code class="language-{lang}">{html.escape(code)}</code></pre>'
+
+    # 인라인 코드 처리
+    def process_inline_code(match):
+        return f'<code>{html.escape(match.group(1))}</code>'
+
+    # 강조 처리
+    def process_bold(match):
+        return f'<strong>{match.group(1)}</strong>'
+
+    def process_italic(match):
+        return f'<em>{match.group(1)}</em>'
+
+    # 테이블 처리
+    def process_table(match):
+        table_content = match.group(0)
+        return legacy_convert_table_to_html(table_content)
+
+    # 순서 없는 목록 처리
+    def process_unordered_list(match):
+        list_text = match.group(0)
+        items = re.findall(r'[\*\-\+]\s+(.*?)(?=\n[\*\-\+]|\n\n|\Z)', list_text + '\n\n', re.DOTALL)
+        html_list = '<ul>\n'
+        for item in items:
+            html_list += f'  <li>{item.strip()}</li>\n'
+        html_list += '</ul>'
+        return html_list
+
+    # 순서 있는 목록 처리
+    def process_ordered_list(match):
+        list_text = match.group(0)
+        items = re.findall(r'\d+\.\s+(.*?)(?=\n\d+\.|\n\n|\Z)', list_text + '\n\n', re.DOTALL)
+        html_list = '<ol>\n'
+        for item in items:
+            html_list += f'  <li>{item.strip()}</li>\n'
+        html_list += '</ol>'
+        return html_list
+
+    # 처리 순서가 중요함: 블록 요소 → 인라인 요소
+
+    # 먼저 코드 블록 처리 (다른 마크다운 서식의 영향을 받지 않도록)
+    text = re.sub(r'```([a-z]*)\n(.*?)```', process_code_block, text, flags=re.DOTALL)
+
+    # 테이블 처리
+    text = re.sub(r'(\|.*\|\n)(\|[\s\-:]*\|\n)(\|.*\|\n)+', process_table, text)
+
+    # 목록 처리
+    text = re.sub(r'(?:^|\n)(?:[\*\-\+]\s+.*\n)+', process_unordered_list, text)
+    text = re.sub(r'(?:^|\n)(?:\d+\.\s+.*\n)+', process_ordered_list, text)
+
+    # 제목 처리는 별도로 수행하므로 여기서는 생략
+
+    # 인라인 요소 처리
+    text = re.sub(r'!\[(.*?)\]\((.*?)\)', process_image, text)  # 이미지
+    text = re.sub(r'`(.*?)`', process_inline_code, text)  # 인라인 코드
+    text = re.sub(r'\*\*(.*?)\*\*|__(.*?)__', lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>', text)  # 강조
+    text = re.sub(r'\*(.*?)\*|_(.*?)_', lambda m: f'<em>{m.group(1) or m.group(2)}</em>', text)  # 기울임
+    text = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', text)  # 링크
+
+    # 문단 처리: 빈 줄로 구분된 텍스트 블록을 <p> 태그로 감싸기
+    paragraphs = []
+    for para in re.split(r'\n\s*\n', text):
+        if para.strip():
+            # 이미 HTML 태그로 시작하는 콘텐츠는 그대로 두기
+            if re.match(r'^\s*<(pre|ul|ol|table|h[1-6]|blockquote|div|figure)', para.strip()):
+                paragraphs.append(para.strip())
+            else:
+                # 줄바꿈 처리
+                formatted_para = para.replace('\n', '<br>')
+                paragraphs.append(f'<p>{formatted_para}</p>')
+
+    return '\n\n'.join(paragraphs)
+
+
+# 합성 챕터 생성
+WORDS = ['시계열', '예측', '모델', 'PM2.5', '농도', 'LSTM', 'Transformer', '하이퍼파라미터', '튜닝',
+         '결과', 'RMSE', '분석', 'learning_rate', 'batch_size', '데이터', '성능', '향상', 'ARIMA']
+
+def _sentence(rng):
+    """논문 원고와 비슷한 밀도로 강조, 인라인 코드, 번호 인용([n])이 섞인 문장"""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 16))]
+    k = rng.randrange(len(words))
+    roll = rng.random()
+    if roll < 0.1:
+        words[k] = f'**{words[k]}**'
+    elif roll < 0.15:
+        words[k] = f'*{words[k]}*'
+    elif roll < 0.2:
+        words[k] = f'`{words[k]}`'
+    elif roll < 0.35:
+        words[k] = f'{words[k]}[{rng.randint(1, 30)}]'
+    return ' '.join(words) + '.'
+
+def make_chapter(size_bytes, seed=0):
+    """문단, 목록, 표, 코드, 이미지, 링크가 섞인 size_bytes 크기의 합성 마크다운 챕터"""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size_bytes:
+        kind = rng.random()
+        if kind < 0.55:
+            # 논문 원고처럼 한 줄에 여러 문장이 이어지는 긴 문단 (곱셈 기호 * 포함)
+            block = '\n'.join(' '.join(_sentence(rng) for _ in range(rng.randint(5, 15)))
+                              + f' 전체 조합 수는 {rng.randint(2, 9)} * {rng.randint(2, 9)} 이다.'
+                              for _ in range(rng.randint(1, 3)))
+        elif kind < 0.7:
+            marker = rng.choice(['-', '*', '1.'])
+            block = '\n'.join(f'{marker} {_sentence(rng)}' for _ in range(rng.randint(2, 6)))
+        elif kind < 0.8:
+            rows = ['| 모델 | RMSE | MAE |', '|---|---:|---:|']
+            rows += [f'| {rng.choice(WORDS)} | {rng.random() * 10:.2f} | {rng.random() * 5:.2f} |'
+                     for _ in range(rng.randint(3, 8))]
+            block = '\n'.join(rows)
+        elif kind < 0.88:
+            block = '```python\n' + '\n'.join(f'model_{i} = fit(x_train, lr={rng.random():.3f})'
+                                               for i in range(rng.randint(2, 6))) + '\n```'
+        elif kind < 0.94:
+            block = f'![그림 {rng.randint(1, 99)}](images/timeseries_plot_pm25.png)'
+        else:
+            block = f'자세한 내용은 [참고 자료](https://example.com/{rng.randint(1, 999)})를 본다. {_sentence(rng)}'
+        parts.append(block)
+        total += len(block.encode('utf-8')) + 2
+    return '\n\n'.join(parts)
+
+def time_call(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+STATIONS = ['강남구', '강동구', '강북구', '강서구', '관악구', '광진구', '구로구', '금천구', '노원구', '도봉구',
+            '동대문구', '동작구', '마포구', '서대문구', '서초구', '성동구', '성북구', '송파구', '양천구',
+            '영등포구', '용산구', '은평구', '종로구', '중구', '중랑구']
+
+def make_air_quality_csv(path, rows, seed=0):
+    """seoul_air_quality_data.csv와 같은 형식(BOM, 시간별 25개 관측소)의 합성 CSV를 만든다."""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write('MSRDT,MSRSTE_NM,NO2,O3,CO,SO2,PM10,PM25\n')
+        base = time.mktime((2020, 1, 1, 0, 0, 0, 0, 0, -1))
+        for i in range(rows):
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(base + (i // len(STATIONS)) * 3600))
+            pm25 = '' if rng.random() < 0.01 else f'{rng.uniform(1, 80):.1f}'
+            f.write(f'{stamp},{STATIONS[i % len(STATIONS)]},{rng.uniform(0, 0.08):.4f},{rng.uniform(0, 0.06):.4f},'
+                    f'{rng.uniform(0.2, 1.2):.2f},{rng.uniform(0.001, 0.006):.4f},{rng.uniform(5, 150):.1f},{pm25}\n')
+
+def bench_column_cache(rows):
+    """열 캐시의 최초 파싱(캐시 생성)과 이후 mmap 로딩 시간을 잰다."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'air.csv')
+        make_air_quality_csv(csv_path, rows)
+        main.configure_paths(output=tmp)
+        mb = os.path.getsize(csv_path) / (1024 * 1024)
+
+        start = time.perf_counter()
+        main.load_air_quality(csv_path, rebuild=True)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        data = main.load_air_quality(csv_path)
+        load_time = time.perf_counter() - start
+        total = sum(v for v in data['columns']['PM10'])
+        assert data['rows'] == rows and total > 0
+
+    print(f"\n대기질 CSV {rows:,}행 ({mb:.1f}MB)")
+    print(f"  파싱 + 캐시 생성 {build_time:8.3f}s")
+    print(f"  캐시 mmap 로딩   {load_time * 1000:8.2f}ms ({build_time / load_time:,.0f}배)")
+
+# 합성 논문 원고 트리 (collect_sections가 읽는 paper/ 구조와 같음)
+MULTI_FILE_CHAPTERS = [(2, '2_background', '이론적 배경'), (3, '3_method', '연구 방법'),
+                       (4, '4_experiments_and_results', '실험 및 결과')]
+
+def make_section(size_bytes, chapter, section, depth, seed=0):
+    """## 절 제목 아래에 깊이 depth까지의 하위 제목과 합성 본문이 이어지는 원고 파일 내용"""
+    rng = random.Random(seed)
+    parts = [f'## {chapter}.{section} {rng.choice(WORDS)} {rng.choice(WORDS)}']
+    total = 0
+    k = 0
+    while total < size_bytes:
+        if depth > 1 and k:
+            level = rng.randint(3, min(depth + 1, 6))
+            parts.append('#' * level + f' {rng.choice(WORDS)} {rng.choice(WORDS)}')
+        piece = make_chapter(min(4096, size_bytes - total), seed=seed * 100003 + k)
+        parts.append(piece)
+        total += len(piece.encode('utf-8')) + 2
+        k += 1
+    return '\n\n'.join(parts)
+
+def make_thesis_tree(paper_dir, size_bytes, chapters=6, depth=3, seed=0):
+    """전체 크기 size_bytes의 합성 원고 트리를 만들고 실제 크기(바이트)를 반환한다.
+
+    chapters는 이론적 배경/연구 방법/실험 및 결과에 번갈아 나누어 넣을 원고 파일 수이다.
+    서론과 결론은 항상 한 파일씩 있다.
+    """
+    def write(rel_path, text):
+        path = os.path.join(paper_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return len(text.encode('utf-8'))
+
+    total = write('0_overview/0_0_title.md', '합성 논문 제목')
+    total += write('0_overview/0_1_author.md', '이름: 홍길동\n학번: 0000000000')
+    total += write('0_overview/0_3_abstract.md', '# 초록\n\n' + make_chapter(2048, seed=seed))
+    share = max(1024, size_bytes // (chapters + 2))
+    total += write('1_introduction/1_introduction.md',
+                   '# 1. 서론\n\n' + make_section(share, 1, 1, depth, seed + 1))
+    for k in range(chapters):
+        number, folder, title = MULTI_FILE_CHAPTERS[k % len(MULTI_FILE_CHAPTERS)]
+        section = k // len(MULTI_FILE_CHAPTERS) + 1
+        head = f'# {number}. {title}\n\n' if section == 1 else ''
+        total += write(f'{folder}/{number}_{section}_section.md',
+                       head + make_section(share, number, section, depth, seed + 2 + k))
+    total += write('5_conclusion/5_conclusion.md',
+                   '# 5. 결론 및 향후 연구\n\n' + make_section(share, 5, 1, depth, seed + 99))
+    total += write('6_reference/6_reference.md',
+                   '# 6. 참고 문헌\n\n' + '\n'.join(f'[{i}] 저자 {i}. 논문 제목 {i}. 2024.' for i in range(1, 31)))
+    return total
+
+def _measure(func, repeat):
+    """출력을 숨긴 채 func를 repeat번 실행한 최소 시간과, 한 번 더 실행한 tracemalloc 최대 메모리(바이트)"""
+    sink = io.StringIO()
+    best = float('inf')
+    with contextlib.redirect_stdout(sink):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+# search_query 단계에서 조회하는 검색어 (여러 글자, 한 글자, 두 낱말)
+SEARCH_QUERIES = [WORDS[0], WORDS[1][:1], f'{WORDS[2]} {WORDS[3]}']
+
+def bench_pipeline(size_bytes, chapters, depth, repeat, include_pdf=False):
+    """합성 원고 트리 하나에 대해 빌드 단계별 측정 결과 목록을 반환한다."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paper_dir = os.path.join(tmp, 'paper')
+        input_bytes = make_thesis_tree(paper_dir, size_bytes, chapters, depth)
+        main.configure_paths(paper_dir, os.path.join(tmp, 'research_results'), os.path.join(tmp, 'output'))
+        images_dir = os.path.join(main.output_dir, 'images')
+
+        # 각 단계의 입력은 앞 단계를 한 번 실행해 준비
+        with contextlib.redirect_stdout(io.StringIO()):
+            sections = main.collect_sections()
+            document = main.build_document(sections, images_dir)
+            main.generate_thesis_markdown(document)
+            index = main.build_search_index(document)
+
+        stages = [
+            ('collect_sections', main.collect_sections),
+            ('fix_image_paths', lambda: [main.fix_image_paths(v, images_dir) for v in sections.values()]),
+            ('heading_index', lambda: [main.build_heading_index(c['content'], c['number'])
+                                       for c in document['chapters']]),
+            ('build_document', lambda: main.build_document(sections, images_dir)),
+            ('generate_thesis_markdown', lambda: main.generate_thesis_markdown(document)),
+            ('convert_markdown', lambda: [main.convert_markdown(c['content']) for c in document['chapters']]),
+            ('convert_to_thesis_html', lambda: main.convert_to_thesis_html(
+                main.markdown_file, main.html_file, None, document, open_browser=False)),
+            # 챕터별 색인 캐시를 지워 매번 전체 색인을 측정
+            ('build_search_index', lambda: (shutil.rmtree(main.search_cache_dir, ignore_errors=True),
+                                            main.build_search_index(document))),
+            ('search_query', lambda: [main.search_index(index, query) for query in SEARCH_QUERIES]),
+        ]
+        if include_pdf:
+            stages.append(('convert_to_pdf', lambda: main.convert_to_pdf(
+                main.markdown_file, main.pdf_file, None, None, document)))
+
+        mb = input_bytes / (1024 * 1024)
+        case = f"{mb:.3g}MB-c{chapters}-d{depth}"
+        for stage, func in stages:
+            seconds, peak = _measure(func, repeat)
+            results.append({
+                'case': case, 'stage': stage, 'input_mb': round(mb, 4), 'chapters': chapters, 'depth': depth,
+                'seconds': round(seconds, 6), 'mb_per_s': round(mb / seconds, 2) if seconds else None,
+                'peak_mb': round(peak / (1024 * 1024), 3)
+            })
+    return results
+
+MIN_COMPARE_SECONDS = 0.001
+
+def compare_to_baseline(results, baseline, threshold):
+    """같은 (case, stage)의 기준 시간 대비 비율을 출력하고, threshold배를 넘게 느려진 항목 수를 반환한다."""
+    base = {(r['case'], r['stage']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\n기준 결과와 비교 (느려짐 판정: {threshold:g}배 초과)")
+    for r in results:
+        old = base.get((r['case'], r['stage']))
+        if old is None or not old['seconds']:
+            continue
+        ratio = r['seconds'] / old['seconds']
+        # 1ms 미만 단계는 측정 잡음이 커서 판정에서 제외
+        flag = '  <- 느려짐' if ratio > threshold and old['seconds'] >= MIN_COMPARE_SECONDS else ''
+        regressions += bool(flag)
+        print(f"  {r['case']:<22} {r['stage']:<26} {old['seconds']:9.4f}s -> {r['seconds']:9.4f}s "
+              f"({ratio:5.2f}x){flag}")
+    return regressions
+
+def run_suite(args):
+    include_pdf = args.pdf and bool(shutil.which('pandoc')) and bool(shutil.which('xelatex'))
+    if args.pdf and not include_pdf:
+        print("pandoc 또는 xelatex이 없어 convert_to_pdf 측정을 생략합니다.")
+    results = []
+    print(f"{'경우':<22} {'단계':<26} {'시간(s)':>10} {'MB/s':>9} {'최대 메모리(MB)':>15}")
+    for size_mb in [float(s) for s in args.suite_sizes.split(',')]:
+        for r in bench_pipeline(int(size_mb * 1024 * 1024), args.chapters, args.depth, args.repeat, include_pdf):
+            print(f"{r['case']:<22} {r['stage']:<26} {r['seconds']:10.4f} {r['mb_per_s'] or 0:9.1f} "
+                  f"{r['peak_mb']:15.2f}")
+            results.append(r)
+
+    report = {
+        'version': 1,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'params': {'sizes_mb': args.suite_sizes, 'chapters': args.chapters, 'depth': args.depth,
+                   'repeat': args.repeat, 'pdf': include_pdf},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n느려진 단계 {regressions}개")
+            return 1
+    return 0
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='convert_markdown 벤치마크 (단일 패스 파서 vs 정규식 체인)')
+    parser.add_argument('--sizes', default='1,2,5,10', help='챕터 크기 목록 (MB, 쉼표 구분)')
+    parser.add_argument('--repeat', type=int, default=3, help='크기별 반복 횟수 (최솟값 사용)')
+    parser.add_argument('--skip-legacy', action='store_true', help='이전 정규식 구현 측정 생략')
+    parser.add_argument('--csv-rows', type=int, default=0, help='대기질 CSV 열 캐시 측정 행 수 (0이면 생략)')
+    parser.add_argument('--suite', action='store_true', help='합성 원고 트리로 빌드 단계별 벤치마크 실행')
+    parser.add_argument('--suite-sizes', default='0.01,0.1,1,10', help='--suite 원고 전체 크기 목록 (MB, 쉼표 구분)')
+    parser.add_argument('--chapters', type=int, default=6, help='--suite 본문 원고 파일 수')
+    parser.add_argument('--depth', type=int, default=3, help='--suite 제목 깊이 (1이면 절 제목만)')
+    parser.add_argument('--pdf', action='store_true', help='--suite에서 convert_to_pdf도 측정 (pandoc, xelatex 필요)')
+    parser.add_argument('--output', help='--suite 결과 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 이전 --suite 결과 JSON 파일')
+    parser.add_argument('--threshold', type=float, default=1.2, help='기준 대비 느려짐 판정 배수')
+    args = parser.parse_args()
+
+    if args.suite:
+        return run_suite(args)
+
+    print(f"{'크기(MB)':>8} {'파서(s)':>10} {'정규식(s)':>10} {'배속':>7} {'파서 MB/s':>10}")
+    for size_mb in [float(s) for s in args.sizes.split(',')]:
+        text = make_chapter(int(size_mb * 1024 * 1024))
+        mb = len(text.encode('utf-8')) / (1024 * 1024)
+        parser_time = time_call(main.convert_markdown, text, args.repeat)
+        if args.skip_legacy:
+            print(f"{mb:8.1f} {parser_time:10.3f} {'-':>10} {'-':>7} {mb / parser_time:10.1f}")
+            continue
+        legacy_time = time_call(legacy_convert_markdown, text, args.repeat)
+        print(f"{mb:8.1f} {parser_time:10.3f} {legacy_time:10.3f} {legacy_time / parser_time:6.1f}x "
+              f"{mb / parser_time:10.1f}")
+
+    if args.csv_rows:
+        bench_column_cache(args.csv_rows)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -1,32 +1,142 @@
 import os
 import re
+import sys
 import glob
+import json
+import argparse
+import contextlib
+import csv
 import yaml
 import html
-from datetime import datetime
+import hashlib
+import io
+import math
+from datetime import datetime, timezone
 import shutil
 import subprocess
+import threading
+import time
 import traceback
+import unicodedata
+import tracemalloc
 from pathlib import Path
 
+# 자식 프로세스 CPU 시간과 최대 메모리 측정 (Windows에는 없음)
+try:
+    import resource
+except ImportError:
+    resource = None
+
 # Pillow를 통한 이미지 생성 추가
 try:
     from PIL import Image, ImageDraw
+    from PIL import __version__ as PIL_VERSION
     PIL_AVAILABLE = True
 except ImportError:
+    PIL_VERSION = None
     PIL_AVAILABLE = False
 
+# matplotlib을 통한 그림 재생성 (없으면 analysis_plots의 기존 그림만 사용)
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    MATPLOTLIB_VERSION = matplotlib.__version__
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_VERSION = None
+    MATPLOTLIB_AVAILABLE = False
+
+# fontTools를 통한 글꼴 부분 집합 생성 (WOFF2 압축에는 brotli가 필요하며, 없으면 WOFF로 저장)
+try:
+    from fontTools import subset as font_subset
+    from fontTools import version as FONTTOOLS_VERSION
+    FONTTOOLS_AVAILABLE = True
+    # brotli는 fontTools가 WOFF2를 쓸 때 직접 불러오므로 설치 여부만 확인
+    import importlib.util
+    FONT_FLAVOR = 'woff2' if importlib.util.find_spec('brotli') is not None else 'woff'
+except ImportError:
+    FONTTOOLS_VERSION = None
+    FONTTOOLS_AVAILABLE = False
+    FONT_FLAVOR = None
+
 # 기본 경로 설정
 paper_dir = 'paper'
 results_dir = 'research_results'
 output_dir = 'output'
-plots_dir = os.path.join(results_dir, 'analysis_plots')
+fonts_dir = 'fonts'
+
+# 경로 설정 함수 (명령행 옵션으로 원고/결과/출력 디렉토리를 바꿀 수 있음)
+def configure_paths(paper=None, results=None, output=None, fonts=None, cache=None, create=True):
+    """원고, 연구 결과, 출력, 글꼴, 캐시 디렉토리를 지정하고 그에 딸린 파일 경로를 다시 계산하는 함수
+
+    cache를 주지 않으면 내용 주소 캐시(그림 변형, 분석 그림, 표, 글꼴, 검색/라벨 색인)는 <출력>/.cache에 둔다.
+    여러 프로젝트가 cache를 함께 쓰면 같은 자산은 한 번만 만든다. create가 False면 출력 디렉토리를 만들지 않는다.
+    """
+    global paper_dir, results_dir, output_dir, fonts_dir, cache_dir, plots_dir, generated_plots_dir
+    global markdown_file, pdf_file, html_file, site_dir, search_dir, stats_file, manifest_file, report_file
+    global image_cache_dir, data_cache_dir, table_cache_dir, figure_cache_dir, font_cache_dir, search_cache_dir
+    global label_cache_dir
+    paper_dir = paper or paper_dir
+    results_dir = results or results_dir
+    output_dir = output or output_dir
+    fonts_dir = fonts or fonts_dir
+    cache_dir = cache or os.path.join(output_dir, '.cache')
+    plots_dir = os.path.join(results_dir, 'analysis_plots')
+    # 데이터로부터 다시 그린 그림 (연구 결과의 원본 그림은 덮어쓰지 않고, 같은 이름이면 이쪽을 우선 사용)
+    generated_plots_dir = os.path.join(output_dir, 'figures')
+    
+    # 출력 디렉토리 생성
+    if create:
+        os.makedirs(output_dir, exist_ok=True)
+    markdown_file = os.path.join(output_dir, 'thesis.md')
+    pdf_file = os.path.join(output_dir, 'thesis.pdf')
+    html_file = os.path.join(output_dir, 'thesis.html')
+    site_dir = os.path.join(output_dir, 'site')
+    search_dir = os.path.join(output_dir, 'search')
+    stats_file = os.path.join(output_dir, 'air_quality_stats.csv')
+    manifest_file = os.path.join(output_dir, '.build_manifest.json')
+    report_file = os.path.join(output_dir, 'build_report.json')
+    # 열 캐시는 CSV 파일 이름으로 찾으므로 프로젝트마다 따로 둠
+    data_cache_dir = os.path.join(output_dir, '.cache', 'data')
+    image_cache_dir = os.path.join(cache_dir, 'images')
+    table_cache_dir = os.path.join(cache_dir, 'tables')
+    figure_cache_dir = os.path.join(cache_dir, 'figures')
+    font_cache_dir = os.path.join(cache_dir, 'fonts')
+    search_cache_dir = os.path.join(cache_dir, 'search')
+    label_cache_dir = os.path.join(cache_dir, 'labels')
 
-# 출력 디렉토리 생성
-os.makedirs(output_dir, exist_ok=True)
-markdown_file = os.path.join(output_dir, 'thesis.md')
-pdf_file = os.path.join(output_dir, 'thesis.pdf')
-html_file = os.path.join(output_dir, 'thesis.html')
+# 가져올 때는 경로만 정하고 디렉토리는 main에서 만듦
+configure_paths(create=False)
+
+# 내용 주소 캐시 항목 잠금 (여러 빌드 프로세스가 같은 항목을 동시에 만들지 않도록)
+@contextlib.contextmanager
+def cache_lock(cache_path):
+    """<캐시>/.locks의 잠금 파일로 캐시 항목 하나의 생성 권한을 얻는 컨텍스트 (fcntl이 없으면 잠그지 않음)
+
+    잠금을 얻은 뒤 항목이 이미 생겼는지 다시 확인해야 한다. 잠그지 못해도 항목은 임시 파일 교체로 쓰이므로 깨지지 않는다.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    lock_dir = os.path.join(cache_dir, '.locks')
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, os.path.basename(cache_path) + '.lock'), 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+# 그림 변형 설정 (web: HTML용 축소/재압축본, print: PDF용 DPI 상한 적용본)
+IMAGE_VARIANTS = {
+    'web': {'widths': [480, 800, 1200], 'formats': ['webp', 'png'], 'webp_quality': 80, 'png_colors': 256},
+    'print': {'dpi': 300, 'text_width_in': 6.1, 'formats': ['png']}
+}
+
+# 빌드 매니페스트 형식 버전 (형식이 바뀌면 올려서 기존 캐시를 무효화)
+MANIFEST_VERSION = 1
 
 # 파일 내용 읽기 함수
 def read_file_content(file_path):
@@ -37,44 +147,435 @@ def read_file_content(file_path):
         print(f"파일 읽기 오류 {file_path}: {e}")
         return ""
 
+# 임시 파일 경로 (교체 직전까지 쓰는 파일, 프로세스와 스레드마다 달라 동시에 같은 대상을 써도 겹치지 않음)
+def temp_path(path, suffix=''):
+    return f"{path}.tmp{os.getpid()}-{threading.get_ident()}{suffix}"
+
+# 내용이 바뀐 경우에만 파일 쓰기
+def write_if_changed(file_path, content):
+    """기존 파일과 내용이 다를 때만 파일을 쓰는 함수 (변경 여부 반환)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    write_chunks([content], file_path)
+    return True
+
+# 빌드 날짜 (캐시 키가 날짜에 따라 흔들리지 않도록 고정 가능)
+def get_build_date():
+    """THESIS_BUILD_DATE(YYYY-MM-DD) 또는 SOURCE_DATE_EPOCH 환경변수로 고정된 빌드 날짜를 반환하는 함수"""
+    pinned = os.environ.get('THESIS_BUILD_DATE')
+    if pinned:
+        return datetime.strptime(pinned, '%Y-%m-%d')
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), tz=timezone.utc)
+    return datetime.now()
+
+def format_build_date():
+    return get_build_date().strftime('%Y년 %m월 %d일')
+
+# 빌드 매니페스트 관련 함수
+def load_manifest():
+    """output/.build_manifest.json을 읽는 함수 (없거나 손상된 경우 빈 매니페스트 반환)"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'files': {}, 'stages': {}, 'image_meta': {}}
+
+def save_manifest(manifest):
+    """매니페스트를 임시 파일에 쓴 뒤 교체하여 저장하는 함수"""
+    tmp_path = temp_path(manifest_file)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_file)
+
+# 매니페스트 없이 호출될 때 쓰는 프로세스 내 해시 캐시
+_digest_memo = {}
+
+def file_digest(file_path, manifest=None):
+    """파일 내용의 SHA-256 해시 (크기와 mtime이 같으면 매니페스트에 기록된 해시를 재사용)"""
+    st = os.stat(file_path)
+    files = manifest['files'] if manifest is not None else _digest_memo
+    entry = files.get(file_path)
+    if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return entry['sha256']
+
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    files[file_path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+    return digest
+
+def compute_key(*parts):
+    """JSON으로 직렬화 가능한 값들로부터 캐시 키를 계산하는 함수"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def generator_digest(manifest=None):
+    """빌드 스크립트 자체의 해시 (코드가 바뀌면 모든 단계를 다시 실행)"""
+    return file_digest(os.path.abspath(__file__), manifest)
+
+def paper_digests(manifest=None):
+    """paper/ 아래 모든 마크다운 파일의 해시 목록"""
+    paper_files = sorted(glob.glob(os.path.join(paper_dir, '**', '*.md'), recursive=True))
+    return {path: file_digest(path, manifest) for path in paper_files}
+
+def data_digests(manifest=None):
+    """research_results/ 바로 아래 CSV 파일의 해시 목록 (표 지시문의 입력)"""
+    data_files = sorted(glob.glob(os.path.join(results_dir, '*.csv')))
+    return {path: file_digest(path, manifest) for path in data_files}
+
+def is_stage_fresh(manifest, stage, key, outputs):
+    """단계의 입력 키가 이전 빌드와 같고 출력 파일이 모두 남아 있는지 확인하는 함수"""
+    if manifest is None:
+        return False
+    entry = manifest['stages'].get(stage)
+    if not entry or entry.get('key') != key:
+        return False
+    return all(os.path.exists(p) for p in list(outputs) + entry.get('outputs', []))
+
+def recorded_stage_key(manifest, stage):
+    """단계가 마지막으로 기록한 입력 키 (없으면 None, 후속 단계의 키에 선행 단계 입력을 포함할 때 사용)"""
+    if manifest is None:
+        return None
+    return manifest['stages'].get(stage, {}).get('key')
+
+def record_stage(manifest, stage, key, outputs):
+    if manifest is None:
+        return
+    manifest['stages'][stage] = {
+        'key': key,
+        'outputs': list(outputs),
+        'built_at': datetime.now().isoformat(timespec='seconds')
+    }
+
+# 리눅스 FICLONE ioctl (btrfs/xfs 등에서 블록을 공유하는 reflink 복사)
+FICLONE = 0x40049409
+
+def _reflink_file(src_path, dst_path):
+    """reflink로 파일을 복제하는 함수 (지원하지 않는 파일시스템이면 OSError)"""
+    import fcntl
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+def _place_file(src_path, dst_path, link=True):
+    """하드링크 → reflink → 일반 복사 순으로 시도하여 파일을 배치하는 함수 (사용한 방식 반환)"""
+    tmp_path = f"{dst_path}.tmp-{os.getpid()}"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    method = 'copy'
+    if link and os.stat(src_path).st_dev == os.stat(os.path.dirname(dst_path) or '.').st_dev:
+        try:
+            os.link(src_path, tmp_path)
+            method = 'link'
+        except OSError:
+            pass
+    if method == 'copy':
+        try:
+            _reflink_file(src_path, tmp_path)
+            shutil.copystat(src_path, tmp_path)
+            method = 'reflink'
+        except (OSError, ImportError):
+            shutil.copy2(src_path, tmp_path)
+    # 임시 파일을 원자적으로 교체
+    os.replace(tmp_path, dst_path)
+    return method
+
+def _needs_sync(src_path, dst_path, verify_hash=False, manifest=None):
+    """크기와 mtime(선택적으로 해시)을 비교하여 복사가 필요한지 판단하는 함수"""
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src_path)
+    if src_stat.st_ino == dst_stat.st_ino and src_stat.st_dev == dst_stat.st_dev:
+        return False
+    if src_stat.st_size != dst_stat.st_size or src_stat.st_mtime_ns != dst_stat.st_mtime_ns:
+        return True
+    if verify_hash:
+        return file_digest(src_path, manifest) != file_digest(dst_path, manifest)
+    return False
+
+# 이미지 디렉토리 증분 동기화
+# 이 도구가 배치하거나 만든 그림 기록 (배치 경로 -> 원본 경로, 더미는 None)
+# 정리할 때는 여기에 있는 파일만 지우므로 저장소에 포함된 그림은 남는다
+_placed_memo = {}
+
+def placed_images(manifest=None):
+    """배치 기록 사전을 반환하는 함수 (매니페스트가 없으면 프로세스 내 기록)"""
+    return manifest.setdefault('placed_images', {}) if manifest is not None else _placed_memo
+
+def sync_images(src_paths, dst_dir, keep=(), verify_hash=False, link=True, workers=None, manifest=None):
+    """변경되었거나 새로 생긴 파일만 dst_dir로 배치하고, 이전에 배치했지만 더 이상 원본에 없는 파일은 삭제하는 함수"""
+    os.makedirs(dst_dir, exist_ok=True)
+    placed = placed_images(manifest)
+    stats = {'link': 0, 'reflink': 0, 'copy': 0, 'skipped': 0, 'removed': 0}
+    
+    pending = []
+    for src_path in src_paths:
+        dst_path = os.path.join(dst_dir, os.path.basename(src_path))
+        if _needs_sync(src_path, dst_path, verify_hash, manifest):
+            pending.append((src_path, dst_path))
+        else:
+            stats['skipped'] += 1
+    
+    # 남은 파일은 스레드 풀에서 병렬 배치
+    if pending:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+            methods = executor.map(lambda pair: _place_file(pair[0], pair[1], link), pending)
+            for (src_path, dst_path), method in zip(pending, methods):
+                stats[method] += 1
+                placed[dst_path] = src_path
+                print(f"이미지 {method}: {src_path} -> {dst_path}")
+    
+    # 원본에서 사라진 파일 정리 (직접 배치한 파일만, 그 밖의 파일은 건드리지 않음)
+    wanted = {os.path.join(dst_dir, os.path.basename(p)) for p in src_paths}
+    wanted |= {os.path.join(dst_dir, name) for name in keep}
+    for dst_path in sorted(placed):
+        if os.path.dirname(dst_path) != dst_dir or dst_path in wanted:
+            continue
+        if os.path.isfile(dst_path):
+            os.remove(dst_path)
+            stats['removed'] += 1
+            print(f"오래된 이미지 삭제: {dst_path}")
+        del placed[dst_path]
+    
+    return stats
+
+_image_meta_memo = {}
+
+# 그림 헤더에서 크기 읽기 (내용 해시별로 매니페스트에 캐시하여 다음 빌드에서는 파일을 열지 않음)
+def image_dimensions(image_path, manifest=None):
+    """(너비, 높이)를 반환하는 함수 (읽을 수 없으면 None)"""
+    if not PIL_AVAILABLE or not os.path.exists(image_path):
+        return None
+    digest = file_digest(image_path, manifest)
+    meta = manifest.setdefault('image_meta', {}) if manifest is not None else _image_meta_memo
+    if digest not in meta:
+        try:
+            # Image.open은 헤더만 읽고 픽셀 데이터는 디코딩하지 않음
+            with Image.open(image_path) as img:
+                meta[digest] = list(img.size)
+        except OSError:
+            return None
+    return tuple(meta[digest])
+
+# 그림 변형 파일 경로 (print 변형은 pandoc --resource-path용으로 images/ 구조를 유지)
+def variant_output_path(filename, variant, fmt, width=None):
+    stem = os.path.splitext(filename)[0]
+    if variant == 'print':
+        return os.path.join(output_dir, 'print', 'images', f'{stem}.{fmt}')
+    return os.path.join(output_dir, 'images', variant, f'{stem}-{width}.{fmt}')
+
+def variant_widths(src_path, variant, manifest=None):
+    """변형별로 만들 너비 목록 (원본보다 큰 너비는 원본 너비로 대체)"""
+    if variant == 'print':
+        return [None]
+    size = image_dimensions(src_path, manifest)
+    if size is None:
+        return []
+    return sorted({min(width, size[0]) for width in IMAGE_VARIANTS[variant]['widths']})
+
+def _render_variant(src_path, variant, fmt, dst_path, width=None):
+    """Pillow로 원본 그림을 축소/재압축하여 변형 파일을 만드는 함수"""
+    spec = IMAGE_VARIANTS[variant]
+    with Image.open(src_path) as img:
+        img.load()
+        source_dpi = (img.info.get('dpi') or (96, 96))[0]
+        
+        if variant == 'print':
+            # 투명도를 흰 배경에 합성 (xelatex가 알파 채널을 따로 임베드하지 않도록)
+            if img.mode in ('RGBA', 'LA', 'P'):
+                rgba = img.convert('RGBA')
+                img = Image.new('RGB', rgba.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.split()[-1])
+            max_width = int(spec['text_width_in'] * spec['dpi'])
+        else:
+            max_width = width
+        
+        if img.width > max_width:
+            img = img.resize((max_width, max(1, round(img.height * max_width / img.width))), Image.LANCZOS)
+        
+        tmp_path = f"{dst_path}.tmp-{os.getpid()}"
+        if fmt == 'webp':
+            img.save(tmp_path, 'WEBP', quality=spec['webp_quality'], method=6)
+        elif variant == 'print':
+            # 본문 폭을 넘지 않도록 DPI 메타데이터 지정 (기존 pandoc 배치와 같은 크기)
+            dpi = max(source_dpi, img.width / spec['text_width_in'])
+            img.save(tmp_path, 'PNG', optimize=True, dpi=(dpi, dpi))
+        else:
+            # 플롯 이미지는 색 수가 적으므로 팔레트 PNG로 줄임
+            img = img.quantize(colors=spec['png_colors'], method=Image.Quantize.FASTOCTREE)
+            img.save(tmp_path, 'PNG', optimize=True)
+        os.replace(tmp_path, dst_path)
+
+def optimize_image(src_path, variant, fmt, width=None, manifest=None):
+    """원본 해시와 변형 설정을 키로 하는 캐시에서 변형 파일을 찾거나 새로 만드는 함수"""
+    key = compute_key('image-variant', file_digest(src_path, manifest), variant, fmt, width,
+                      IMAGE_VARIANTS[variant], PIL_VERSION)
+    cache_path = os.path.join(image_cache_dir, key[:2], f'{key}.{fmt}')
+    if not os.path.exists(cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with cache_lock(cache_path):
+            if not os.path.exists(cache_path):
+                _render_variant(src_path, variant, fmt, cache_path, width)
+    
+    dst_path = variant_output_path(os.path.basename(src_path), variant, fmt, width)
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    if _needs_sync(cache_path, dst_path):
+        _place_file(cache_path, dst_path)
+    return dst_path
+
+def build_image_variants(image_paths, manifest=None, workers=None):
+    """모든 그림의 web(너비별)/print 변형을 스레드 풀에서 만드는 함수"""
+    if not PIL_AVAILABLE:
+        print("Pillow가 없어 그림 변형 생성을 건너뜁니다 (원본 이미지 사용).")
+        return []
+    
+    # 매니페스트 쓰기 경합을 피하기 위해 해시와 크기는 미리 계산
+    jobs = [(src_path, variant, fmt, width)
+            for src_path in image_paths
+            for variant, spec in IMAGE_VARIANTS.items()
+            for width in variant_widths(src_path, variant, manifest)
+            for fmt in spec['formats']]
+    
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        outputs = list(executor.map(lambda job: optimize_image(*job, manifest), jobs))
+    
+    print(f"그림 변형 준비 완료: {len(outputs)}개 (web/print)")
+    return outputs
+
+def web_image_sources(filename, manifest=None):
+    """HTML <img>에 쓸 크기와 srcset 정보를 반환하는 함수 (변형이 없으면 원본만 사용)"""
+    to_rel = lambda p: os.path.relpath(p, output_dir).replace(os.sep, '/')
+    src_path = os.path.join(output_dir, 'images', filename)
+    size = image_dimensions(src_path, manifest)
+    sources = {'src': f'images/{filename}', 'size': size, 'webp': [], 'png': []}
+    
+    widths = variant_widths(src_path, 'web', manifest) if size else []
+    paths = {(fmt, width): variant_output_path(filename, 'web', fmt, width)
+             for width in widths for fmt in IMAGE_VARIANTS['web']['formats']}
+    if not widths or not all(os.path.exists(p) for p in paths.values()):
+        return sources
+    
+    for (fmt, width), path in paths.items():
+        sources[fmt].append(f'{to_rel(path)} {width}w')
+    
+    # 가장 큰 축소본을 기본 src로 사용
+    largest = widths[-1]
+    sources['src'] = to_rel(paths[('png', largest)])
+    sources['size'] = (largest, round(size[1] * largest / size[0]))
+    return sources
+
+# 원고의 그림 참조 (![설명](경로)) 와 output/images 기준 경로로 바꾸는 규칙
+_IMAGE_LINK_RE = re.compile(r'!\[([^\]\n]*)\]\(([^()\s]+)\)')
+
+def resolve_image_target(alt, target):
+    """원고의 그림 경로를 HTML/PDF에서 쓰는 경로로 바꾸는 함수 (analysis_plots 아래 파일은 images/<파일명>)"""
+    # GitHub 주소나 상대/절대 경로의 analysis_plots 그림
+    if '/analysis_plots/' in target:
+        return 'images/' + target.split('/analysis_plots/', 1)[1]
+    # 이미 images/ 경로인 경우는 유지
+    if target.startswith('images/'):
+        return target
+    # 설명 없이 파일명만 있는 경우
+    if not alt and '/' not in target and target.endswith('.png'):
+        return 'images/' + target
+    # 기타 절대 경로
+    if target.startswith('/') and target.endswith('.png'):
+        return 'images/' + target.rsplit('/', 1)[1]
+    return target
+
+# 그림 참조 그래프 (어느 원고가 어떤 그림을 쓰고 그 그림이 어디서 오는지)
+def build_asset_graph():
+    """paper/ 원고를 한 번 훑어 그림 참조 그래프를 만드는 함수
+
+    반환값: {'assets': {파일명: {'path': 원본 경로(다시 그린 그림이 있으면 그 경로, 없으면 analysis_plots) 또는 None,
+                                'refs': [{'file', 'chapter', 'alt', 'target'}]}},
+             'missing': 원본이 없는 파일명, 'unused': 참조되지 않는 analysis_plots 그림}
+    """
+    assets = {}
+    for path in sorted(glob.glob(os.path.join(paper_dir, '**', '*.md'), recursive=True)):
+        rel_path = os.path.relpath(path, paper_dir)
+        content = read_file_content(path)
+        for match in _IMAGE_LINK_RE.finditer(content):
+            alt, target = match.groups()
+            resolved = resolve_image_target(alt, target)
+            if not resolved.startswith('images/'):
+                continue
+            name = os.path.basename(resolved)
+            asset = assets.setdefault(name, {'path': None, 'refs': []})
+            asset['refs'].append({'file': rel_path, 'chapter': Path(rel_path).parts[0], 'alt': alt, 'target': target})
+    
+    available = {os.path.basename(p): p for p in glob.glob(os.path.join(plots_dir, '*.png'))}
+    unused = set(available)
+    available.update((os.path.basename(p), p) for p in glob.glob(os.path.join(generated_plots_dir, '*.png')))
+    for name, asset in assets.items():
+        asset['path'] = available.get(name)
+    return {
+        'assets': assets,
+        'missing': sorted(name for name, asset in assets.items() if asset['path'] is None),
+        'unused': sorted(unused - set(assets))
+    }
+
+def print_asset_report(graph):
+    """참조된 그림 수와 원본이 없거나 쓰이지 않는 그림을 출력하는 함수"""
+    print(f"그림 참조: {len(graph['assets'])}개 (원본 없음 {len(graph['missing'])}개, "
+          f"참조되지 않음 {len(graph['unused'])}개)")
+    for name in graph['missing']:
+        files = sorted({ref['file'] for ref in graph['assets'][name]['refs']})
+        print(f"  원본 없는 그림: {name} ({', '.join(files)})")
+    if graph['unused']:
+        print(f"  참조되지 않아 건너뛴 그림: {', '.join(graph['unused'])}")
+
 # 이미지 처리 함수
-def prepare_images():
-    """원본 이미지 파일을 output/images로 복사하는 함수"""
+def prepare_images(manifest=None, verify_hash=False, link=True, graph=None):
+    """원고가 참조하는 그림만 output/images로 동기화하는 함수 (변경된 파일만 링크 또는 복사, 원본이 없으면 더미 생성)"""
     images_output_dir = os.path.join(output_dir, 'images')
     os.makedirs(images_output_dir, exist_ok=True)
     
-    # 복사할 이미지 파일 목록
-    image_filenames = [
-        "model_performance_comparison_plots_pm25.png",
-        "model_forecast_comparision_plot_pm25.png",
-        "model_forecast_comparision_plot_pm25_zoomin.png",
-        "ai_tuned_lstm_forecast_comparision_plot_pm25.png",
-        "timeseries_decomposition_plot_pm25.png",
-        "acf_pacf_plot_pm25.png",
-        "timeseries_corelation_heatmap_plot.png",
-        "timeseries_granger_plot_pm10_to_pm25.png"
-    ]
-    
-    # 원본 이미지 경로
-    original_plots_dir = plots_dir
-    
     copied_images = []
     
     try:
-        # 먼저 plots_dir에서 모든 PNG 파일을 찾아서 복사
-        all_plot_images = glob.glob(os.path.join(original_plots_dir, "*.png"))
-        for src_path in all_plot_images:
-            filename = os.path.basename(src_path)
-            dst_path = os.path.join(images_output_dir, filename)
-            shutil.copy2(src_path, dst_path)
-            copied_images.append(dst_path)
-            print(f"이미지 복사: {src_path} -> {dst_path}")
+        # 원고의 그림 참조에서 배치할 원본과 더미가 필요한 그림을 결정
+        graph = graph or build_asset_graph()
+        print_asset_report(graph)
+        referenced_images = [asset['path'] for _, asset in sorted(graph['assets'].items()) if asset['path']]
+        missing_images = graph['missing']
+        
+        # 참조하는 원본 이미지가 바뀌지 않았으면 복사 생략
+        stage_key = compute_key('images', {p: file_digest(p, manifest) for p in referenced_images}, missing_images,
+                                IMAGE_VARIANTS if PIL_AVAILABLE else None)
+        base_outputs = sorted(os.path.join(images_output_dir, name) for name in graph['assets'])
+        if is_stage_fresh(manifest, 'images', stage_key, base_outputs):
+            print("이미지 변경 없음: 복사를 건너뜁니다.")
+            return images_output_dir
         
-        # 지정된 이미지들이 없으면 더미 이미지 생성
-        for filename in image_filenames:
+        # 새로 생기거나 바뀐 이미지만 배치하고, 전에 배치했지만 더 이상 참조되지 않는 파일은 삭제
+        sync_stats = sync_images(referenced_images, images_output_dir, keep=missing_images,
+                                 verify_hash=verify_hash, link=link, manifest=manifest)
+        copied_images.extend(os.path.join(images_output_dir, os.path.basename(p)) for p in referenced_images)
+        print(f"이미지 동기화: 링크 {sync_stats['link']}개, reflink {sync_stats['reflink']}개, "
+              f"복사 {sync_stats['copy']}개, 유지 {sync_stats['skipped']}개, 삭제 {sync_stats['removed']}개")
+        
+        # 원본이 없는 그림은 더미 이미지 생성 (이미 있으면 다시 만들지 않음)
+        for filename in missing_images:
             dst_path = os.path.join(images_output_dir, filename)
             if not os.path.exists(dst_path):
                 print(f"지정된 이미지 파일 없음: {filename}, 더미 생성")
+                placed_images(manifest)[dst_path] = None
                 if PIL_AVAILABLE:
                     img = Image.new('RGB', (800, 600), color=(255, 255, 255))
                     draw = ImageDraw.Draw(img)
@@ -87,7 +588,16 @@ def prepare_images():
                         f.write(b'\x89PNG\r\n\x1a\n\x00\x00\x00\r\x49\x48\x44\x52\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\x0bIDAT\x08\xd7c\xf8\xff\xff?\x00\x05\xfe\x02\xfe\xdc\xcc\x59\xe7\x00\x00\x00\x00IEND\xaeB`\x82')
                     copied_images.append(dst_path)
         
+        # HTML/PDF용 그림 변형 생성 (캐시에 있으면 재사용), 더 이상 참조되지 않는 그림의 변형은 삭제
+        variant_outputs = build_image_variants(base_outputs, manifest)
+        wanted_variants = set(variant_outputs)
+        for variant_dir in (os.path.join(images_output_dir, 'web'), os.path.join(output_dir, 'print', 'images')):
+            for path in glob.glob(os.path.join(variant_dir, '*')):
+                if PIL_AVAILABLE and path not in wanted_variants and os.path.isfile(path):
+                    os.remove(path)
+        
         print(f"\n이미지 처리 완료: {len(copied_images)}개 이미지 준비됨")
+        record_stage(manifest, 'images', stage_key, base_outputs + variant_outputs)
         
     except Exception as e:
         print(f"이미지 처리 중 오류: {e}")
@@ -95,6 +605,726 @@ def prepare_images():
     
     return images_output_dir
 
+# 연구 데이터 열 캐시 (CSV를 한 번만 파싱해 열 단위 이진 파일로 저장하고, 이후에는 mmap으로 복사 없이 읽음)
+# 형식: 매직(8바이트) + 헤더 길이(uint32) + JSON 헤더 + 8바이트 정렬된 열 데이터
+AIR_QUALITY_POLLUTANTS = ['NO2', 'O3', 'CO', 'SO2', 'PM10', 'PM25']
+COLUMN_CACHE_MAGIC = b'THCOL1\0\0'
+COLUMN_CACHE_VERSION = 1
+
+def _align8(n):
+    return (n + 7) & ~7
+
+def _parse_timestamp(text, memo):
+    """'YYYY-MM-DD HH:MM:SS'를 1970-01-01 기준 초(int64, 시각대 변환 없음)로 바꾸는 함수 (같은 시각은 memo 재사용)"""
+    value = memo.get(text)
+    if value is None:
+        value = int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp())
+        memo[text] = value
+    return value
+
+def build_column_cache(csv_path, cache_path, time_column='MSRDT', category_column='MSRSTE_NM',
+                       value_columns=AIR_QUALITY_POLLUTANTS):
+    """CSV를 읽어 시각(int64), 범주 코드(uint16, 사전 인코딩), 값 열(float32)로 된 열 캐시 파일을 만드는 함수"""
+    from array import array
+    
+    st = os.stat(csv_path)
+    timestamps = array('q')
+    codes = array('H')
+    values = {name: array('f') for name in value_columns}
+    categories = {}
+    memo = {}
+    nan = float('nan')
+    
+    # BOM이 붙은 헤더도 처리
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        time_index = header.index(time_column)
+        category_index = header.index(category_column)
+        value_indexes = [(values[name], header.index(name)) for name in value_columns]
+        for row in reader:
+            if not row:
+                continue
+            timestamps.append(_parse_timestamp(row[time_index], memo))
+            code = categories.get(row[category_index])
+            if code is None:
+                code = categories[row[category_index]] = len(categories)
+            codes.append(code)
+            for column, index in value_indexes:
+                cell = row[index]
+                column.append(float(cell) if cell else nan)
+    
+    columns = [(time_column, 'q', timestamps), (category_column, 'H', codes)]
+    columns += [(name, 'f', values[name]) for name in value_columns]
+    meta = {
+        'version': COLUMN_CACHE_VERSION,
+        'byteorder': sys.byteorder,
+        'source': {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_digest(csv_path)},
+        'rows': len(timestamps),
+        'time_column': time_column,
+        'category_column': category_column,
+        'categories': list(categories),
+        'columns': []
+    }
+    # 헤더 길이가 정해져야 열 위치를 알 수 있으므로 위치를 채운 뒤 길이가 같아질 때까지 반복
+    data_start = 0
+    while True:
+        offset = data_start
+        meta['columns'] = []
+        for name, typecode, column in columns:
+            meta['columns'].append({'name': name, 'type': typecode, 'offset': offset})
+            offset = _align8(offset + column.itemsize * len(column))
+        header_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+        needed = _align8(len(COLUMN_CACHE_MAGIC) + 4 + len(header_bytes))
+        if needed == data_start:
+            break
+        data_start = needed
+    
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    tmp_path = temp_path(cache_path)
+    with open(tmp_path, 'wb') as f:
+        f.write(COLUMN_CACHE_MAGIC)
+        f.write(len(header_bytes).to_bytes(4, 'little'))
+        f.write(header_bytes)
+        for entry, (name, typecode, column) in zip(meta['columns'], columns):
+            f.write(b'\0' * (entry['offset'] - f.tell()))
+            column.tofile(f)
+    os.replace(tmp_path, cache_path)
+    return meta
+
+def _refresh_column_cache_source(cache_path, meta, st):
+    """열 캐시 헤더의 원본 크기와 mtime을 st로 바꿔 제자리에서 다시 쓰는 함수
+
+    열 위치는 그대로 두므로 새 헤더가 첫 열 앞의 자리에 들어가야 하며, 들어가지 않으면 None (다시 만들어야 함).
+    """
+    meta = dict(meta, source=dict(meta['source'], size=st.st_size, mtime_ns=st.st_mtime_ns))
+    header_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    data_start = meta['columns'][0]['offset'] if meta['columns'] else 0
+    if len(COLUMN_CACHE_MAGIC) + 4 + len(header_bytes) > data_start:
+        return None
+    with open(cache_path, 'r+b') as f:
+        f.write(COLUMN_CACHE_MAGIC)
+        f.write(len(header_bytes).to_bytes(4, 'little'))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+    return meta
+
+def _read_column_cache(cache_path):
+    """열 캐시를 mmap으로 열어 (헤더, mmap)을 반환하는 함수 (형식이 맞지 않으면 None)"""
+    import mmap
+    try:
+        with open(cache_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    prefix = len(COLUMN_CACHE_MAGIC)
+    meta = None
+    if mapped[:prefix] == COLUMN_CACHE_MAGIC:
+        header_len = int.from_bytes(mapped[prefix:prefix + 4], 'little')
+        try:
+            meta = json.loads(mapped[prefix + 4:prefix + 4 + header_len].decode('utf-8'))
+        except ValueError:
+            pass
+    if not isinstance(meta, dict) or meta.get('version') != COLUMN_CACHE_VERSION or meta.get('byteorder') != sys.byteorder:
+        # 쓸 수 없는 캐시는 매핑을 닫아 다시 만들 때 파일이 열린 채로 남지 않게 함
+        mapped.close()
+        return None
+    return meta, mapped
+
+def load_air_quality(csv_path=None, rebuild=False):
+    """서울시 대기질 CSV를 열 캐시로 읽는 함수 (원본 해시가 바뀌었거나 캐시가 없으면 다시 만듦)
+
+    반환 dict의 'timestamps'(int64 초), 'station_codes'(uint16), 'columns'[오염물질](float32, 결측은 NaN)는
+    캐시 파일을 가리키는 memoryview이므로 복사 없이 읽힌다. 관측소 이름은 'stations'[코드]로 찾는다.
+    """
+    csv_path = csv_path or os.path.join(results_dir, 'seoul_air_quality_data.csv')
+    cache_path = os.path.join(data_cache_dir, Path(csv_path).stem + '.col')
+    
+    cached = None if rebuild else _read_column_cache(cache_path)
+    if cached is not None:
+        # 크기와 mtime이 같으면 원본을 다시 해시하지 않음
+        meta, mapped = cached
+        st = os.stat(csv_path)
+        source = meta['source']
+        if (source['size'], source['mtime_ns']) != (st.st_size, st.st_mtime_ns):
+            # 내용이 같으면 기록된 크기와 mtime만 고쳐 다음부터 다시 해시하지 않음
+            if source['sha256'] == file_digest(csv_path):
+                meta = _refresh_column_cache_source(cache_path, meta, st)
+            else:
+                meta = None
+            if meta is None:
+                mapped.close()
+                cached = None
+    if cached is None:
+        print(f"데이터 열 캐시 생성 중: {csv_path}")
+        build_column_cache(csv_path, cache_path)
+        meta, mapped = _read_column_cache(cache_path)
+    
+    view = memoryview(mapped)
+    columns = {}
+    for entry in meta['columns']:
+        size = meta['rows'] * {'q': 8, 'H': 2, 'f': 4}[entry['type']]
+        columns[entry['name']] = view[entry['offset']:entry['offset'] + size].cast(entry['type'])
+    return {
+        'source': csv_path,
+        'rows': meta['rows'],
+        'timestamps': columns.pop(meta['time_column']),
+        'station_codes': columns.pop(meta['category_column']),
+        'stations': meta['categories'],
+        'columns': columns
+    }
+
+# 대기질 데이터 스트리밍 집계 (측정소 x 시간 구간별 통계)
+# 시간 구간은 'YYYY-MM-DD HH:MM:SS' 시각 문자열의 앞부분 길이로 정함
+AGGREGATE_BUCKETS = {'none': 0, 'year': 4, 'month': 7, 'day': 10, 'hour': 13}
+AGGREGATE_QUANTILES = (0.25, 0.5, 0.75)
+AGGREGATE_CHUNK_BYTES = 8 << 20  # 작업 하나가 맡는 CSV 구간 크기
+
+# 근사 분위수 스케치 (로그 간격 구간별 개수, 상대 오차 SKETCH_RELATIVE_ACCURACY 이내)
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MIN_VALUE = 1e-9  # 절댓값이 이보다 작으면 0으로 셈
+_SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_SKETCH_LOG_GAMMA = math.log(_SKETCH_GAMMA)
+
+def new_accumulator():
+    """빈 누적기 (개수, 결측 수, 평균, 편차 제곱합, 최솟값/최댓값, 분위수 스케치)"""
+    return {'count': 0, 'missing': 0, 'mean': 0.0, 'm2': 0.0, 'min': math.inf, 'max': -math.inf,
+            'zeros': 0, 'positive': {}, 'negative': {}}
+
+def _sketch_bucket(value):
+    """값이 들어갈 스케치 구간 (저장소 이름, 구간 번호), 0에 가까우면 (None, None)"""
+    if value > SKETCH_MIN_VALUE:
+        return 'positive', math.ceil(math.log(value) / _SKETCH_LOG_GAMMA)
+    if value < -SKETCH_MIN_VALUE:
+        return 'negative', math.ceil(math.log(-value) / _SKETCH_LOG_GAMMA)
+    return None, None
+
+def accumulate(acc, value, bucket=None):
+    """누적기에 값 하나를 더하는 함수 (None/NaN은 결측, bucket은 미리 계산해 둔 스케치 구간)"""
+    if value is None or value != value:
+        acc['missing'] += 1
+        return
+    # Welford 방식으로 평균과 편차 제곱합 갱신
+    acc['count'] += 1
+    delta = value - acc['mean']
+    acc['mean'] += delta / acc['count']
+    acc['m2'] += delta * (value - acc['mean'])
+    if value < acc['min']:
+        acc['min'] = value
+    if value > acc['max']:
+        acc['max'] = value
+    store, index = bucket or _sketch_bucket(value)
+    if store is None:
+        acc['zeros'] += 1
+    else:
+        acc[store][index] = acc[store].get(index, 0) + 1
+
+def merge_accumulators(target, other):
+    """other 누적기를 target에 합치는 함수 (두 구간을 차례로 누적한 것과 같은 결과)"""
+    total = target['count'] + other['count']
+    if other['count']:
+        delta = other['mean'] - target['mean']
+        target['m2'] += other['m2'] + delta * delta * target['count'] * other['count'] / total
+        target['mean'] += delta * other['count'] / total
+    target['count'] = total
+    target['missing'] += other['missing']
+    target['min'] = min(target['min'], other['min'])
+    target['max'] = max(target['max'], other['max'])
+    target['zeros'] += other['zeros']
+    for store in ('positive', 'negative'):
+        counts = target[store]
+        for index, count in other[store].items():
+            counts[index] = counts.get(index, 0) + count
+    return target
+
+def accumulator_quantile(acc, q):
+    """스케치로부터 q 분위수를 근사하는 함수 (최솟값/최댓값 범위로 제한)"""
+    if not acc['count']:
+        return math.nan
+    rank = q * (acc['count'] - 1)
+    value_of = lambda index: 2 * _SKETCH_GAMMA ** index / (_SKETCH_GAMMA + 1)
+    seen = 0
+    # 음수는 절댓값이 큰 구간부터, 그다음 0, 양수는 작은 구간부터
+    for index in sorted(acc['negative'], reverse=True):
+        seen += acc['negative'][index]
+        if seen > rank:
+            return min(acc['max'], max(acc['min'], -value_of(index)))
+    seen += acc['zeros']
+    if seen > rank:
+        return 0.0
+    for index in sorted(acc['positive']):
+        seen += acc['positive'][index]
+        if seen > rank:
+            return min(acc['max'], max(acc['min'], value_of(index)))
+    return acc['max']
+
+def summarize_accumulator(acc):
+    """누적기를 basic_statistics_pm25.csv와 같은 항목(count, mean, std, min, 분위수, max)과 결측 수로 정리하는 함수"""
+    count = acc['count']
+    summary = {
+        'count': count,
+        'missing': acc['missing'],
+        'mean': acc['mean'] if count else math.nan,
+        'std': math.sqrt(acc['m2'] / (count - 1)) if count > 1 else math.nan,
+        'min': acc['min'] if count else math.nan
+    }
+    for q in AGGREGATE_QUANTILES:
+        summary[f"{q * 100:g}%"] = accumulator_quantile(acc, q)
+    summary['max'] = acc['max'] if count else math.nan
+    return summary
+
+def _chunk_ranges(csv_path, chunk_bytes):
+    """헤더 다음부터 파일을 약 chunk_bytes 크기의 줄 경계 구간 [start, end)로 나누는 함수 (헤더 줄도 반환)"""
+    size = os.path.getsize(csv_path)
+    ranges = []
+    with open(csv_path, 'rb') as f:
+        header = f.readline().decode('utf-8-sig')
+        start = f.tell()
+        while start < size:
+            if start + chunk_bytes >= size:
+                end = size
+            else:
+                f.seek(start + chunk_bytes - 1)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+def _aggregate_chunk(csv_path, start, end, layout):
+    """CSV의 [start, end) 구간을 한 줄씩 읽어 (측정소, 시간 구간)별 누적기를 만드는 함수 (프로세스 풀 작업 단위)
+
+    메모리는 그룹 수에만 비례한다. 따옴표 안에 줄바꿈이 있는 CSV는 지원하지 않는다.
+    """
+    time_index, station_index, value_indexes, prefix = layout
+    groups = {}
+    parsed = {}  # 칸 문자열 -> (값, 스케치 구간), 측정값은 자릿수가 정해져 있어 반복이 많음
+    
+    def lines():
+        with open(csv_path, 'rb') as f:
+            f.seek(start)
+            position = start
+            while position < end:
+                line = f.readline()
+                if not line:
+                    break
+                position += len(line)
+                yield line.decode('utf-8')
+    
+    for row in csv.reader(lines()):
+        if not row:
+            continue
+        key = (row[station_index] if station_index is not None else '', row[time_index][:prefix])
+        accs = groups.get(key)
+        if accs is None:
+            accs = groups[key] = [new_accumulator() for _ in value_indexes]
+        for acc, index in zip(accs, value_indexes):
+            cell = row[index] if index < len(row) else ''
+            entry = parsed.get(cell)
+            if entry is None:
+                try:
+                    value = float(cell)
+                except ValueError:
+                    value = None
+                entry = (value, None if value is None or value != value else _sketch_bucket(value))
+                if len(parsed) >= 1 << 16:
+                    parsed.clear()
+                parsed[cell] = entry
+            accumulate(acc, *entry)
+    return groups
+
+def aggregate_air_quality(csv_path=None, bucket='month', by_station=True, chunk_bytes=AGGREGATE_CHUNK_BYTES,
+                          workers=None, time_column='MSRDT', category_column='MSRSTE_NM',
+                          value_columns=AIR_QUALITY_POLLUTANTS):
+    """대기질 CSV를 구간별로 나누어 여러 프로세스에서 집계한 뒤 합치는 함수
+
+    파일 전체를 메모리에 올리지 않으며, 동시에 처리 중인 구간 수도 작업자 수의 두 배로 제한한다.
+    반환값의 groups는 {(측정소, 시간 구간): [오염물질별 누적기]} 형식이다
+    (by_station=False이면 측정소는 '', bucket='none'이면 시간 구간은 '').
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    
+    csv_path = csv_path or os.path.join(results_dir, 'seoul_air_quality_data.csv')
+    header_line, ranges = _chunk_ranges(csv_path, chunk_bytes)
+    header = next(csv.reader([header_line]))
+    layout = (header.index(time_column), header.index(category_column) if by_station else None,
+              [header.index(name) for name in value_columns], AGGREGATE_BUCKETS[bucket])
+    
+    groups = {}
+    def merge(partial):
+        for key, accs in partial.items():
+            if key in groups:
+                for target, other in zip(groups[key], accs):
+                    merge_accumulators(target, other)
+            else:
+                groups[key] = accs
+    
+    workers = min(workers or os.cpu_count() or 1, len(ranges))
+    if workers <= 1:
+        for start, end in ranges:
+            merge(_aggregate_chunk(csv_path, start, end, layout))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            todo = iter(ranges)
+            running = set()
+            while True:
+                while len(running) < workers * 2:
+                    chunk = next(todo, None)
+                    if chunk is None:
+                        break
+                    running.add(executor.submit(_aggregate_chunk, csv_path, *chunk, layout))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(future.result())
+    
+    return {'source': csv_path, 'bucket': bucket, 'columns': list(value_columns), 'groups': groups}
+
+def write_aggregate_csv(result, csv_path):
+    """aggregate_air_quality 결과를 측정소, 시간 구간, 오염물질별 한 줄씩 CSV로 저장하는 함수"""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    fields = None
+    for (station, bucket), accs in sorted(result['groups'].items()):
+        for name, acc in zip(result['columns'], accs):
+            summary = summarize_accumulator(acc)
+            if fields is None:
+                fields = list(summary)
+                writer.writerow(['station', 'bucket', 'pollutant'] + fields)
+            writer.writerow([station or '전체', bucket or '전체', name] + [summary[field] for field in fields])
+    write_chunks([out.getvalue()], csv_path, encoding='utf-8-sig')
+    return csv_path
+
+# 데이터로부터 다시 그릴 수 있는 분석 그림의 명세
+# (모델 예측 결과가 필요한 그림은 저장소에 원자료가 없으므로 analysis_plots의 파일을 그대로 사용)
+FIGURE_SPECS = {
+    'timeseries_plot_pm25.png': {
+        'kind': 'line', 'source': 'seoul_air_quality_data.csv', 'column': 'PM25',
+        'title': 'PM2.5 Concentration (Seoul average)', 'ylabel': 'PM2.5 (ug/m3)', 'size': [10, 4]
+    },
+    'timeseries_segment_avg_plot_pm25.png': {
+        'kind': 'segment_avg', 'source': 'seoul_air_quality_data.csv', 'column': 'PM25',
+        'change_points': 'change_point_analysis.txt',
+        'title': 'PM2.5 Segment Averages between Change Points', 'ylabel': 'PM2.5 (ug/m3)', 'size': [18.5, 5]
+    },
+    'timeseries_corelation_heatmap_plot.png': {
+        'kind': 'heatmap', 'source': 'seoul_air_quality_data.csv', 'columns': AIR_QUALITY_POLLUTANTS,
+        'title': 'Correlation between Pollutants (Seoul average)', 'size': [8, 6.5]
+    },
+    'acf_pacf_plot_pm25.png': {
+        'kind': 'acf', 'source': 'seoul_air_quality_data.csv', 'column': 'PM25', 'lags': 48,
+        'title': 'PM2.5', 'size': [10, 4]
+    }
+}
+
+# 그림 렌더러 버전 (그리는 방식이 바뀌면 올려서 캐시된 그림을 무효화)
+FIGURE_RENDERER_VERSION = 1
+
+def figure_inputs(spec):
+    """그림 명세가 읽는 입력 파일 목록 (research_results/ 기준)"""
+    inputs = [os.path.join(results_dir, spec['source'])]
+    if spec.get('change_points'):
+        inputs.append(os.path.join(results_dir, spec['change_points']))
+    return inputs
+
+def _citywide_series(np, data, column):
+    """측정소 평균 시계열 (시각별로 결측을 뺀 평균)"""
+    times = np.asarray(data['timestamps'])
+    values = np.asarray(data['columns'][column], dtype=np.float64)
+    hours, inverse = np.unique(times, return_inverse=True)
+    valid = ~np.isnan(values)
+    sums = np.bincount(inverse[valid], weights=values[valid], minlength=len(hours))
+    counts = np.bincount(inverse[valid], minlength=len(hours))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return hours.astype('datetime64[s]'), sums / counts
+
+def _plot_line(plt, np, data, spec):
+    times, series = _citywide_series(np, data, spec['column'])
+    fig, ax = plt.subplots(figsize=spec['size'])
+    ax.plot(times, series, linewidth=1)
+    ax.set_title(spec['title'])
+    ax.set_xlabel('Date')
+    ax.set_ylabel(spec['ylabel'])
+    ax.grid(alpha=0.3)
+    fig.autofmt_xdate()
+    return fig
+
+def _plot_segment_avg(plt, np, data, spec):
+    times, series = _citywide_series(np, data, spec['column'])
+    with open(os.path.join(results_dir, spec['change_points']), 'r', encoding='utf-8') as f:
+        points = re.findall(r'변화점 \d+: (\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)', f.read())
+    bounds = [times[0]] + sorted(np.datetime64(point.replace(' ', 'T')) for point in points) + [times[-1] + np.timedelta64(1, 's')]
+    fig, ax = plt.subplots(figsize=spec['size'])
+    ax.plot(times, series, linewidth=1, alpha=0.6, label=spec['column'])
+    for k, (start, end) in enumerate(zip(bounds, bounds[1:])):
+        mask = (times >= start) & (times < end)
+        if mask.any():
+            ax.hlines(np.nanmean(series[mask]), times[mask][0], times[mask][-1], colors='red', linewidth=2,
+                      label='Segment average' if k == 0 else None)
+    for point in bounds[1:-1]:
+        ax.axvline(point, color='gray', linestyle='--', linewidth=1)
+    ax.set_title(spec['title'])
+    ax.set_xlabel('Date')
+    ax.set_ylabel(spec['ylabel'])
+    ax.legend()
+    ax.grid(alpha=0.3)
+    fig.autofmt_xdate()
+    return fig
+
+def _plot_heatmap(plt, np, data, spec):
+    matrix = np.vstack([_citywide_series(np, data, column)[1] for column in spec['columns']])
+    matrix = matrix[:, ~np.isnan(matrix).any(axis=0)]
+    corr = np.corrcoef(matrix)
+    fig, ax = plt.subplots(figsize=spec['size'])
+    image = ax.imshow(corr, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(spec['columns'])), spec['columns'])
+    ax.set_yticks(range(len(spec['columns'])), spec['columns'])
+    for i in range(len(corr)):
+        for j in range(len(corr)):
+            ax.text(j, i, f"{corr[i, j]:.2f}", ha='center', va='center', fontsize=9)
+    fig.colorbar(image, ax=ax)
+    ax.set_title(spec['title'])
+    return fig
+
+def _plot_acf(plt, np, data, spec):
+    series = _citywide_series(np, data, spec['column'])[1]
+    x = series[~np.isnan(series)]
+    x = x - x.mean()
+    lags = min(spec['lags'], len(x) - 1)
+    acf = np.array([1.0] + [np.dot(x[:-k], x[k:]) / np.dot(x, x) for k in range(1, lags + 1)])
+    # Durbin-Levinson 재귀로 편자기상관 계산
+    pacf = [1.0]
+    phi = []
+    for k in range(1, lags + 1):
+        if phi:
+            a = (acf[k] - sum(phi[j] * acf[k - 1 - j] for j in range(k - 1))) / \
+                (1 - sum(phi[j] * acf[j + 1] for j in range(k - 1)))
+            phi = [phi[j] - a * phi[k - 2 - j] for j in range(k - 1)] + [a]
+        else:
+            phi = [acf[1]]
+        pacf.append(phi[-1])
+    bound = 1.96 / math.sqrt(len(x))
+    fig, axes = plt.subplots(1, 2, figsize=spec['size'])
+    for ax, values, name in zip(axes, (acf, np.array(pacf)), ('Autocorrelation', 'Partial Autocorrelation')):
+        ax.stem(range(lags + 1), values)
+        ax.axhspan(-bound, bound, alpha=0.2)
+        ax.set_title(f"{name} ({spec['title']})")
+        ax.set_xlabel('Lag')
+    return fig
+
+FIGURE_RENDERERS = {
+    'line': _plot_line,
+    'segment_avg': _plot_segment_avg,
+    'heatmap': _plot_heatmap,
+    'acf': _plot_acf
+}
+
+def render_figure(spec, dst_path):
+    """명세대로 그림 하나를 그려 dst_path에 PNG로 저장하는 함수 (프로세스 풀 작업 단위)"""
+    import numpy as np
+    import matplotlib.pyplot as plt
+    
+    data = load_air_quality(os.path.join(results_dir, spec['source']))
+    fig = FIGURE_RENDERERS[spec['kind']](plt, np, data, spec)
+    try:
+        fig.tight_layout()
+        tmp_path = temp_path(dst_path, '.png')
+        fig.savefig(tmp_path, dpi=spec.get('dpi', 100), metadata={'Software': None})
+        os.replace(tmp_path, dst_path)
+    finally:
+        plt.close(fig)
+    return dst_path
+
+def render_figure_once(spec, dst_path):
+    """캐시 잠금을 잡고 그림이 아직 없을 때만 그리는 함수 (다른 빌드가 같은 그림을 그리는 중이면 기다렸다가 재사용)"""
+    with cache_lock(dst_path):
+        if not os.path.exists(dst_path):
+            render_figure(spec, dst_path)
+    return dst_path
+
+def regenerate_figures(manifest=None, workers=None):
+    """FIGURE_SPECS의 그림 중 입력 데이터, 명세, 렌더러 버전이 바뀐 것만 프로세스 풀에서 다시 그려 output/figures에 배치하는 함수
+
+    research_results/analysis_plots의 원본 그림은 건드리지 않으며, 이미지 준비 단계가 같은 이름의 다시 그린 그림을 우선 사용한다.
+
+    그림은 캐시 디렉토리(기본 output/.cache)의 figures/<키>.png에 내용 주소 방식으로 저장되므로, 같은 입력의 그림은 다시 그리지 않는다.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    if not MATPLOTLIB_AVAILABLE:
+        print("matplotlib이 없어 그림 재생성을 건너뜁니다 (analysis_plots의 기존 그림 사용)")
+        return plots_dir
+    
+    os.makedirs(figure_cache_dir, exist_ok=True)
+    placements = []
+    jobs = []
+    for name, spec in FIGURE_SPECS.items():
+        digests = [file_digest(path, manifest) for path in figure_inputs(spec)]
+        key = compute_key('figure', FIGURE_RENDERER_VERSION, MATPLOTLIB_VERSION, digests, spec)
+        cached = os.path.join(figure_cache_dir, key + '.png')
+        placements.append((name, cached))
+        if not os.path.exists(cached):
+            jobs.append((name, spec, cached))
+    
+    failed = set()
+    if jobs:
+        # 열 캐시는 부모 프로세스에서 미리 만들어 두고, 작업 프로세스는 mmap으로 읽기만 함
+        for source in sorted({spec['source'] for _, spec, _ in jobs}):
+            load_air_quality(os.path.join(results_dir, source))
+        print(f"그림 {len(jobs)}개 다시 그리는 중 (변경 없음 {len(placements) - len(jobs)}개)...")
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers <= 1:
+            for name, spec, cached in jobs:
+                try:
+                    render_figure_once(spec, cached)
+                except Exception as e:
+                    print(f"그림 생성 오류 {name}: {e}")
+                    failed.add(name)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=configure_paths,
+                                     initargs=(paper_dir, results_dir, output_dir, fonts_dir, cache_dir)) as executor:
+                futures = {executor.submit(render_figure_once, spec, cached): name for name, spec, cached in jobs}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"그림 생성 오류 {futures[future]}: {e}")
+                        failed.add(futures[future])
+    else:
+        print("그림 입력 변경 없음: 다시 그리지 않습니다.")
+    
+    # 내용이 달라진 그림만 output/figures에 덮어쓰고, 명세에서 빠진 그림은 정리
+    os.makedirs(generated_plots_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(generated_plots_dir, '*.png')):
+        if os.path.basename(path) not in FIGURE_SPECS:
+            os.remove(path)
+    placed = 0
+    for name, cached in placements:
+        dst_path = os.path.join(generated_plots_dir, name)
+        if name in failed:
+            continue
+        if os.path.exists(dst_path) and file_digest(dst_path, manifest) == file_digest(cached, manifest):
+            continue
+        tmp_path = temp_path(dst_path)
+        shutil.copyfile(cached, tmp_path)
+        os.replace(tmp_path, dst_path)
+        placed += 1
+    print(f"그림 재생성 완료: 갱신 {placed}개, 실패 {len(failed)}개")
+    return False if failed else generated_plots_dir
+
+# 연구 결과 CSV를 표로 끌어오는 지시문 (원고 안의 csv-table 코드 블록, 본문은 YAML)
+#   ```csv-table
+#   source: model_performance_by_metric.csv   # research_results/ 기준 경로
+#   columns: ["", MSE, RMSE]                 # 표시할 열과 순서 (생략하면 전체)
+#   rows: [arima, lstm]                      # 첫 열 값으로 고른 행과 순서 (생략하면 전체)
+#   rename: {"": 모델}                        # 열 머리글 바꾸기
+#   format: ".2f"                            # 숫자 칸의 기본 서식
+#   formats: {MAPE: ".1f"}                   # 열별 서식
+#   caption: 모델별 예측 성능                  # 표 캡션 (HTML/PDF에서 번호가 붙음)
+#   ```
+_TABLE_DIRECTIVE_RE = re.compile(r'^```csv-table[ \t]*\n(.*?)^```[ \t]*$', re.MULTILINE | re.DOTALL)
+TABLE_DIRECTIVE_KEYS = {'source', 'columns', 'rows', 'rename', 'format', 'formats', 'caption'}
+
+# 표 출력 형식 버전 (형식이 바뀌면 올려서 기존 표 캐시를 무효화)
+TABLE_CACHE_VERSION = 1
+
+# 같은 CSV와 설정으로 만든 표의 프로세스 내 캐시
+_table_memo = {}
+
+def _format_cell(value, spec):
+    """CSV 칸 값을 서식에 맞춰 문자열로 바꾸고 숫자 여부를 함께 반환하는 함수"""
+    try:
+        number = float(value)
+    except ValueError:
+        return value, False
+    return (format(number, spec) if spec else value), True
+
+def render_csv_table(spec):
+    """지시문 설정에 따라 CSV를 마크다운 파이프 테이블(캡션이 있으면 pandoc 캡션 줄 포함)로 만드는 함수"""
+    if not isinstance(spec, dict) or not spec.get('source'):
+        raise ValueError("source가 지정되지 않았습니다")
+    unknown = set(spec) - TABLE_DIRECTIVE_KEYS
+    if unknown:
+        raise ValueError(f"알 수 없는 키: {', '.join(sorted(unknown))}")
+    
+    # CSV 해시와 설정이 같으면 디스크에 캐시된 표를 그대로 사용
+    csv_path = os.path.join(results_dir, spec['source'])
+    key = compute_key('csv-table', TABLE_CACHE_VERSION, file_digest(csv_path), spec)
+    if key in _table_memo:
+        return _table_memo[key]
+    cache_path = os.path.join(table_cache_dir, key + '.md')
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            _table_memo[key] = f.read()
+        return _table_memo[key]
+    except OSError:
+        pass
+    
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        records = [row for row in csv.reader(f) if row]
+    if not records:
+        raise ValueError(f"빈 CSV 파일입니다: {csv_path}")
+    header, body = records[0], records[1:]
+    
+    # 열 선택 (첫 열은 행 이름으로 간주)
+    names = [str(name) for name in spec.get('columns') or header]
+    missing = [name for name in names if name not in header]
+    if missing:
+        raise ValueError(f"CSV에 없는 열: {', '.join(missing)} (사용 가능: {', '.join(header)})")
+    indices = [header.index(name) for name in names]
+    
+    # 행 선택
+    if spec.get('rows'):
+        by_label = {row[0]: row for row in body}
+        labels = [str(label) for label in spec['rows']]
+        missing = [label for label in labels if label not in by_label]
+        if missing:
+            raise ValueError(f"CSV에 없는 행: {', '.join(missing)}")
+        body = [by_label[label] for label in labels]
+    
+    formats = spec.get('formats') or {}
+    cells = []
+    numeric = [True] * len(names)
+    for row in body:
+        line = []
+        for k, (name, index) in enumerate(zip(names, indices)):
+            value = row[index].strip() if index < len(row) else ''
+            text, is_number = _format_cell(value, formats.get(name, spec.get('format')))
+            if value and not is_number:
+                numeric[k] = False
+            line.append(text)
+        cells.append(line)
+    
+    # 숫자 열은 오른쪽 정렬
+    rename = {str(k): str(v) for k, v in (spec.get('rename') or {}).items()}
+    escape = lambda text: text.replace('|', '\\|')
+    lines = ['| ' + ' | '.join(escape(rename.get(name, name)) for name in names) + ' |',
+             '|' + '|'.join('---:' if flag and body else '---' for flag in numeric) + '|']
+    lines += ['| ' + ' | '.join(escape(text) for text in line) + ' |' for line in cells]
+    if spec.get('caption'):
+        lines += ['', f": {spec['caption']}"]
+    table = '\n'.join(lines)
+    
+    os.makedirs(table_cache_dir, exist_ok=True)
+    write_chunks([table], cache_path)
+    _table_memo[key] = table
+    return table
+
+def expand_table_directives(text):
+    """원고의 csv-table 지시문을 마크다운 표로 펼치는 함수 (오류는 본문에 드러나도록 표시)"""
+    if '```csv-table' not in text:
+        return text
+    
+    def expand(match):
+        try:
+            return render_csv_table(yaml.safe_load(match.group(1)))
+        except (OSError, ValueError, csv.Error, yaml.YAMLError) as e:
+            print(f"표 지시문 처리 오류: {e}")
+            return f"**표 지시문 오류**: `{str(e).replace('`', "'")}`"
+    
+    return _TABLE_DIRECTIVE_RE.sub(expand, text)
+
 # 논문 각 섹션 내용 수집
 def collect_sections():
     sections = {}
@@ -156,49 +1386,21 @@ def collect_sections():
     else:
         sections['references'] = "참고문헌 내용이 없습니다."
     
-    return sections
+    # 연구 결과 CSV 표 지시문 펼치기
+    return {key: expand_table_directives(value) for key, value in sections.items()}
 
 # 마크다운 이미지 경로 수정 함수
 def fix_image_paths(content, image_dir):
-    """마크다운 내 이미지 경로를 수정하는 함수"""
-    # 이미지 디렉토리 절대 경로
-    image_dir_abs = os.path.abspath(image_dir).replace('\\', '/')
-    
-    # 다양한 이미지 패턴에 대한 정규식 처리
-    patterns = [
-        # GitHub 경로
-        (r'!\[(.*?)\]\((https://github\.com/.*?/blob/.*?/research_results/analysis_plots/(.*?))\)', 
-         r'![\1](images/\3)'),
-        
-        # 상대 경로
-        (r'!\[(.*?)\]\((.*?/analysis_plots/(.*?))\)', 
-         r'![\1](images/\3)'),
-        
-        # 이미 images/ 경로인 경우는 유지
-        (r'!\[(.*?)\]\(images/(.*?)\)', 
-         r'![\1](images/\2)'),
-        
-        # 직접 파일명만 있는 경우
-        (r'!\[\]\(([^/]+\.png)\)', 
-         r'![](images/\1)'),
-         
-        # 기타 절대 경로
-        (r'!\[(.*?)\]\(/.*?/([^/]+\.png)\)', 
-         r'![\1](images/\2)')
-    ]
-    
-    updated_content = content
-    for pattern, replacement in patterns:
-        updated_content = re.sub(pattern, replacement, updated_content)
-    
-    return updated_content
+    """마크다운 내 이미지 경로를 output/images 기준으로 수정하는 함수 (참조 하나당 한 번만 검사)"""
+    return _IMAGE_LINK_RE.sub(
+        lambda m: f'![{m.group(1)}]({resolve_image_target(m.group(1), m.group(2))})', content)
 
 # 논문 메타데이터 생성
 def generate_metadata(sections):
     return {
         'title': sections.get('title', '생성형 인공지능 기반 시계열 예측 자동화 연구'),
         'author': '이루오',
-        'date': datetime.now().strftime('%Y년 %m월 %d일'),
+        'date': format_build_date(),
         'lang': 'ko',
         'documentclass': 'report',
         'papersize': 'a4',
@@ -235,110 +1437,1016 @@ def generate_metadata(sections):
         ]
     }
 
+# 문서 모델의 챕터 구성 (섹션 키, 번호, 제목, 번호 매김 여부)
+DOCUMENT_CHAPTERS = [
+    ('introduction', '1', '서론', True),
+    ('background', '2', '이론적 배경', True),
+    ('method', '3', '연구 방법', True),
+    ('results', '4', '실험 및 결과', True),
+    ('conclusion', '5', '결론 및 향후 연구', True),
+    ('references', '6', '참고 문헌', False),
+]
+
+# 그림/표 번호와 상호 참조 색인 (문서를 한 번 훑어 챕터별로 번호를 매기고 @fig:/@tbl: 참조를 앵커로 연결)
+# 라벨은 pandoc-crossref 표기를 따름: ![설명](그림.png){#fig:라벨}, 표 캡션 끝의 {#tbl:라벨}
+LABEL_INDEX_VERSION = 2
+LABEL_KINDS = {'figure': ('fig', '그림'), 'table': ('tbl', '표')}
+_LABEL_ATTR_RE = re.compile(r'\s*\{#((?:fig|tbl):[\w-]+)\}\s*$')
+# 코드 스팬/블록(백틱 묶음) 안은 건너뛰고 [@fig:라벨] 또는 @fig:라벨을 찾음
+_REFERENCE_RE = re.compile(r'(`+)[\s\S]*?\1|\[@((?:fig|tbl):[\w-]+)\]|(?<![\w@])@((?:fig|tbl):[\w-]+)')
+_CAPTION_LABEL_LINE_RE = re.compile(r'^((?:Table)?:\s+.*?)\s*\{#(tbl:[\w-]+)\}[ \t]*$', re.MULTILINE)
+_label_memo = {}
+
+def split_label(caption):
+    """캡션 끝의 {#fig:라벨}/{#tbl:라벨}을 떼어 (캡션, 라벨 또는 None)으로 반환하는 함수"""
+    match = _LABEL_ATTR_RE.search(caption)
+    if not match:
+        return caption, None
+    return caption[:match.start()], match.group(1)
+
+def next_label_number(counters, kind):
+    """counters의 kind(figure/table) 번호를 하나 올리고 (번호 문자열, 기본 앵커)를 반환하는 함수 (챕터 안에서는 '장-순번')"""
+    counters[kind] = counters.get(kind, 0) + 1
+    chapter = counters.get('chapter')
+    number = f"{chapter}-{counters[kind]}" if chapter else str(counters[kind])
+    return number, f"{LABEL_KINDS[kind][0]}-{number}"
+
+def _iter_numbered_blocks(blocks):
+    """번호가 매겨지는 블록을 render_blocks와 같은 순서로 (kind, 캡션, 라벨)로 내보내는 제너레이터
+
+    pandoc처럼 설명(캡션)이 있는 그림만 번호를 매긴다 (설명 없는 그림은 LaTeX에서도 번호 없는 이미지).
+    """
+    for block in blocks:
+        if block[0] == 'figure':
+            if block[1]:
+                yield 'figure', block[1], block[3]
+        elif block[0] == 'table' and block[2] is not None:
+            yield ('table',) + split_label(block[2])
+        elif block[0] == 'quote':
+            yield from _iter_numbered_blocks(block[1])
+
+def chapter_spans(chapter):
+    """챕터 본문을 iter_chapter_html과 같은 (시작, 끝) 구간으로 나누는 함수 (첫 제목 앞 도입부, 제목별 본문)"""
+    content = chapter['content']
+    headings = chapter.get('headings')
+    if headings is None:
+        headings = build_heading_index(content, chapter['number'])
+    spans = [(0, headings[0]['start'] if headings else len(content))]
+    return spans + [(heading['body_start'], heading['end']) for heading in headings]
+
+def scan_chapter_labels(chapter):
+    """챕터의 그림/표 항목과 참조 라벨을 모으는 함수 (챕터 내용이 그대로면 메모리 또는 디스크 캐시 사용)
+
+    반환값: {'entries': [{'kind', 'number', 'anchor', 'label', 'caption', 'chapter'}], 'refs': [라벨, ...]}
+    """
+    content = chapter['content']
+    key = compute_key('labels', LABEL_INDEX_VERSION, chapter['number'], content)
+    if key in _label_memo:
+        return _label_memo[key]
+    cache_path = os.path.join(label_cache_dir, f'{key}.json')
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            _label_memo[key] = json.load(f)
+        return _label_memo[key]
+    except (OSError, ValueError):
+        pass
+    
+    counters = {'chapter': chapter['number']}
+    entries = []
+    for start, end in chapter_spans(chapter):
+        for kind, caption, label in _iter_numbered_blocks(parse_blocks(content[start:end].strip())):
+            number, anchor = next_label_number(counters, kind)
+            entries.append({'kind': kind, 'number': number, 'anchor': label or anchor, 'label': label,
+                            'caption': caption.strip(), 'chapter': chapter['number']})
+    refs = [match.group(2) or match.group(3) for match in _REFERENCE_RE.finditer(content) if not match.group(1)]
+    result = {'entries': entries, 'refs': refs}
+    
+    os.makedirs(label_cache_dir, exist_ok=True)
+    write_chunks([json.dumps(result, ensure_ascii=False)], cache_path)
+    _label_memo[key] = result
+    return result
+
+def build_label_index(chapters):
+    """챕터별 그림/표 항목을 합쳐 라벨 색인을 만드는 함수
+
+    반환값: {'labels': {라벨: 항목}, 'figures': [항목], 'tables': [항목]} (참조 해석은 라벨 dict 조회 한 번)
+    """
+    index = {'labels': {}, 'figures': [], 'tables': []}
+    refs = []
+    for chapter in chapters:
+        scanned = scan_chapter_labels(chapter)
+        for entry in scanned['entries']:
+            index['figures' if entry['kind'] == 'figure' else 'tables'].append(entry)
+            if entry['label']:
+                if entry['label'] in index['labels']:
+                    print(f"경고: 라벨이 중복되었습니다: {entry['label']} ({entry['number']})")
+                index['labels'].setdefault(entry['label'], entry)
+        refs += scanned['refs']
+    
+    missing = sorted(set(refs) - set(index['labels']))
+    if missing:
+        print(f"경고: 정의되지 않은 참조 {len(missing)}개: {', '.join('@' + label for label in missing)}")
+    return index
+
+def resolve_references(text, labels, link=True, latex=False):
+    """@fig:/@tbl: 참조를 '그림 3-1' 형태로 바꾸는 함수 (link면 앵커로 가는 마크다운 링크, 모르는 라벨은 그대로)
+
+    latex면 번호를 직접 쓰지 않고 '그림 \\ref{라벨}'로 바꿔 LaTeX가 매긴 캡션 번호(3.1 형식)와 같게 한다.
+    """
+    def replace(match):
+        label = match.group(2) or match.group(3)
+        entry = labels.get(label) if label else None
+        if entry is None:
+            return match.group(0)
+        if latex:
+            # 줄바꿈 없는 공백은 pandoc이 LaTeX의 ~로 출력
+            return f"{LABEL_KINDS[entry['kind']][1]}\u00a0\\ref{{{entry['anchor']}}}"
+        name = f"{LABEL_KINDS[entry['kind']][1]} {entry['number']}"
+        return f"[{name}](#{entry['anchor']})" if link else name
+    return _REFERENCE_RE.sub(replace, text) if '@' in text else text
+
+# 논문 문서 모델 생성 (빌드마다 한 번 만들어 마크다운, HTML, PDF 단계가 함께 사용)
+def build_document(sections, images_dir):
+    """메타데이터, 챕터(본문과 제목 색인), 그림 참조, 그림/표 라벨 색인을 담은 문서 dict를 만드는 함수 (sections는 수정하지 않음)"""
+    fixed = {key: fix_image_paths(value, images_dir) for key, value in sections.items()}
+    
+    chapters = []
+    for key, number, title, numbered in DOCUMENT_CHAPTERS:
+        # 챕터 번호가 이미 있는 제목 줄은 제거
+        content = _CHAPTER_TITLE_RE.sub('', fixed.get(key, '')).strip()
+        chapters.append({
+            'key': key,
+            'number': number,
+            'title': title,
+            'numbered': numbered,
+            'content': content,
+            'headings': build_heading_index(content, number),
+        })
+    
+    # 본문에서 참조하는 그림 목록 (fix_image_paths, build_asset_graph와 같은 규칙으로 경로 해석)
+    assets = [{'section': key, 'alt': match.group(1), 'path': resolve_image_target(*match.groups())}
+              for key, value in fixed.items() for match in _IMAGE_LINK_RE.finditer(value)]
+    
+    return {
+        'metadata': generate_metadata(fixed),
+        'title': fixed.get('title', ''),
+        'author': fixed.get('author', ''),
+        'abstract': fixed.get('abstract', ''),
+        'chapters': chapters,
+        'assets': assets,
+        'labels': build_label_index(chapters),
+    }
+
+# 논문 앞부분(메타데이터, 표지, 초록, 목차) 마크다운 쓰기
+def write_front_matter(f, document):
+    """본문 챕터 앞까지의 마크다운을 파일 객체 f에 쓰는 함수"""
+    # YAML 메타데이터
+    f.write('---\n')
+    yaml.dump(document['metadata'], f, allow_unicode=True, default_flow_style=False)
+    f.write('---\n\n')
+    
+    # 표지
+    f.write('\\begin{titlepage}\n')
+    f.write('\\begin{center}\n')
+    f.write('\\vspace*{2cm}\n\n')
+    f.write(f'\\Huge\\textbf{{{document["title"]}}}\\\\\n\n')
+    f.write('\\vspace{1.5cm}\n\n')
+    f.write('\\LARGE 석사학위 논문\\\\\n\n')
+    f.write('\\vspace{2cm}\n\n')
+    
+    # 저자 정보 처리
+    author_info = document['author'].split('\n')
+    for line in author_info:
+        if line.strip():
+            parts = line.split(':')
+            if len(parts) > 1:
+                f.write(f'\\large {parts[0].strip()}: {parts[1].strip()}\\\\\n')
+            else:
+                f.write(f'\\large {line.strip()}\\\\\n')
+    
+    f.write('\\vspace{3cm}\n\n')
+    f.write('\\large\\today\\\\\n\n')
+    f.write('\\vspace{2cm}\n\n')
+    f.write('\\large aSSIST(서울과학종합대학원)\\\\\n')
+    f.write('\\end{center}\n')
+    f.write('\\end{titlepage}\n\n')
+    
+    # 초록 (새 페이지)
+    f.write('\\chapter*{초록}\n\\addcontentsline{toc}{chapter}{초록}\n\n')
+    f.write(document['abstract'])
+    f.write('\n\n')
+    
+    # 목차 페이지
+    f.write('\\newpage\n')
+    f.write('\\tableofcontents\n')
+    f.write('\\newpage\n\n')
+    
+    # 그림 목차 추가
+    f.write('\\listoffigures\n')
+    f.write('\\newpage\n\n')
+    
+    # 표 목차 추가
+    f.write('\\listoftables\n')
+    f.write('\\newpage\n\n')
+
+# 챕터 하나의 마크다운 (챕터 명령 + 본문)
+def chapter_markdown(chapter, labels=None):
+    """챕터 제목 LaTeX 명령과 본문을 이어 붙인 마크다운을 반환하는 함수 (참고문헌은 번호 없는 챕터)
+
+    labels가 있으면 @fig:/@tbl: 참조를 \\ref로 바꾸고, 표 캡션 라벨은 pandoc이 글자 그대로 출력하므로 캡션 안의 \\label로 옮긴다.
+    그림 라벨({#fig:라벨})은 pandoc이 \\label로 출력한다.
+    """
+    content = chapter['content']
+    if labels is not None:
+        content = _CAPTION_LABEL_LINE_RE.sub(r'\1 \\label{\2}', resolve_references(content, labels, latex=True))
+    if chapter['numbered']:
+        header = f"\\chapter{{{chapter['title']}}}\n\n"
+    else:
+        header = f"\\chapter*{{{chapter['title']}}}\n\\addcontentsline{{toc}}{{chapter}}{{{chapter['title']}}}\n\n"
+    return header + content
+
 # 논문 마크다운 생성
-def generate_thesis_markdown(sections, images_dir):
-    """논문 마크다운 생성 함수"""
-    # 이미지 경로 수정
-    for key in sections:
-        sections[key] = fix_image_paths(sections[key], images_dir)
-    
-    # 메타데이터
-    metadata = generate_metadata(sections)
-    
-    with open(markdown_file, 'w', encoding='utf-8') as f:
-        # YAML 메타데이터
-        f.write('---\n')
-        yaml.dump(metadata, f, allow_unicode=True, default_flow_style=False)
-        f.write('---\n\n')
-        
-        # 표지
-        f.write('\\begin{titlepage}\n')
-        f.write('\\begin{center}\n')
-        f.write('\\vspace*{2cm}\n\n')
-        f.write(f'\\Huge\\textbf{{{sections.get("title", "")}}}\\\\\n\n')
-        f.write('\\vspace{1.5cm}\n\n')
-        f.write('\\LARGE 석사학위 논문\\\\\n\n')
-        f.write('\\vspace{2cm}\n\n')
-        
-        # 저자 정보 처리
-        author_info = sections.get('author', '').split('\n')
-        for line in author_info:
-            if line.strip():
-                parts = line.split(':')
-                if len(parts) > 1:
-                    f.write(f'\\large {parts[0].strip()}: {parts[1].strip()}\\\\\n')
-                else:
-                    f.write(f'\\large {line.strip()}\\\\\n')
+def generate_thesis_markdown(document):
+    """문서 모델을 pandoc용 마크다운 파일로 쓰는 함수 (임시 파일에 쓴 뒤 교체)"""
+    tmp_path = temp_path(markdown_file)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        write_front_matter(f, document)
         
-        f.write('\\vspace{3cm}\n\n')
-        f.write('\\large\\today\\\\\n\n')
-        f.write('\\vspace{2cm}\n\n')
-        f.write('\\large aSSIST(서울과학종합대학원)\\\\\n')
-        f.write('\\end{center}\n')
-        f.write('\\end{titlepage}\n\n')
+        # 본문 챕터들
+        chapters = document['chapters']
+        for k, chapter in enumerate(chapters):
+            f.write(chapter_markdown(chapter, document['labels']['labels']))
+            if k + 1 < len(chapters):
+                f.write('\n\n')
+    os.replace(tmp_path, markdown_file)
+    
+    print(f"마크다운 파일이 생성되었습니다: {markdown_file}")
+    return markdown_file
+
+# 마크다운 → HTML 변환기 (블록/인라인 단일 패스 파서)
+# 블록 단계는 줄 단위로 한 번, 인라인 단계는 문자 단위로 한 번만 훑으므로 문서 크기에 선형으로 동작한다.
+_FENCE_RE = re.compile(r'^\s{0,3}(`{3,}|~{3,})\s*([\w+#.-]*)')
+_HEADING_RE = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$')
+_LIST_ITEM_RE = re.compile(r'^(\s*)([*+-]|\d+\.)\s+(.*)$')
+_TABLE_SEP_RE = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+_HR_RE = re.compile(r'^\s{0,3}([*_-])(\s*\1){2,}\s*$')
+_QUOTE_RE = re.compile(r'^\s{0,3}>\s?')
+_TABLE_CAPTION_RE = re.compile(r'(?:Table)?:\s+(.+)', re.DOTALL)
+_BLOCK_START_RE = re.compile(r'\s{0,3}(?:`{3,}|~{3,}|#{1,6}\s|>)|\s*(?:[*+-]|\d+\.)\s|\s{0,3}([*_-])(\s*\1){2,}\s*$')
+# 인라인 특수 문자 (단일 문자 집합이라 정규식 엔진이 빠르게 건너뜀, 묶음 길이는 파서에서 계산)
+_INLINE_TOKEN_RE = re.compile(r'[`$*_!\[\]<&\\]')
+_LINK_TAIL_RE = re.compile(r'\(([^\s()]{0,2048})\)')
+_ENTITY_RE = re.compile(r'&(#\d+|#x[0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);')
+_PUNCTUATION = set('!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~')
+
+def _is_table_start(lines, i):
+    return '|' in lines[i] and i + 1 < len(lines) and '|' in lines[i + 1] and bool(_TABLE_SEP_RE.match(lines[i + 1]))
+
+def _starts_block(lines, i):
+    """단락을 끊고 새 블록을 시작하는 줄인지 확인하는 함수"""
+    line = lines[i]
+    return bool(_BLOCK_START_RE.match(line)) or ('|' in line and _is_table_start(lines, i))
+
+def parse_blocks(text):
+    """마크다운을 블록 목록으로 나누는 함수 (code, heading, table, list, quote, hr, figure, para)"""
+    lines = text.split('\n')
+    blocks = []
+    i, n = 0, len(lines)
+
+    while i < n:
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        # 코드 블록
+        fence = _FENCE_RE.match(line)
+        if fence:
+            marker = fence.group(1)
+            body = []
+            i += 1
+            while i < n and not lines[i].lstrip().startswith(marker):
+                body.append(lines[i])
+                i += 1
+            blocks.append(('code', fence.group(2), '\n'.join(body) + ('\n' if body else '')))
+            i += 1
+            continue
+
+        # 제목
+        heading = _HEADING_RE.match(line)
+        if heading:
+            blocks.append(('heading', len(heading.group(1)), heading.group(2)))
+            i += 1
+            continue
+
+        # 구분선
+        if _HR_RE.match(line):
+            blocks.append(('hr',))
+            i += 1
+            continue
+
+        # 테이블 (헤더 행 + 구분 행 + 본문 행)
+        if _is_table_start(lines, i):
+            start = i
+            i += 2
+            while i < n and '|' in lines[i] and lines[i].strip():
+                i += 1
+            blocks.append(('table', '\n'.join(lines[start:i]), None))
+            continue
+
+        # 인용문 (내부는 한 번만 다시 파싱)
+        if _QUOTE_RE.match(line):
+            inner = []
+            while i < n and lines[i].strip() and (_QUOTE_RE.match(lines[i]) or not _starts_block(lines, i)):
+                inner.append(_QUOTE_RE.sub('', lines[i], count=1))
+                i += 1
+            blocks.append(('quote', parse_blocks('\n'.join(inner))))
+            continue
+
+        # 목록
+        if _LIST_ITEM_RE.match(line):
+            entries = []
+            while i < n:
+                item = _LIST_ITEM_RE.match(lines[i])
+                if item:
+                    entries.append([len(item.group(1).expandtabs(4)), item.group(2), [item.group(3)]])
+                    i += 1
+                elif lines[i].strip():
+                    if _starts_block(lines, i):
+                        break
+                    # 이어지는 줄은 직전 항목에 붙임
+                    entries[-1][2].append(lines[i].strip())
+                    i += 1
+                else:
+                    # 빈 줄 다음에 들여쓴 항목이 오면 같은 목록으로 계속
+                    j = i
+                    while j < n and not lines[j].strip():
+                        j += 1
+                    if j < n and _LIST_ITEM_RE.match(lines[j]) and lines[j][:1].isspace():
+                        i = j
+                    else:
+                        break
+            blocks.append(('list', _build_list_tree(entries)))
+            continue
+
+        # 단락 (그림 하나만 있는 단락은 figure로 처리)
+        para = [line]
+        i += 1
+        while i < n and lines[i].strip() and not _starts_block(lines, i):
+            para.append(lines[i])
+            i += 1
+        content = '\n'.join(para).strip()
+        image = re.fullmatch(r'!\[([^\]\n]*)\]\(([^()\s]+)\)(?:\{#(fig:[\w-]+)\})?', content)
+        caption = _TABLE_CAPTION_RE.fullmatch(content)
+        if image:
+            blocks.append(('figure', image.group(1), image.group(2), image.group(3)))
+        elif caption and blocks and blocks[-1][0] == 'table' and blocks[-1][2] is None:
+            # 테이블 바로 뒤의 ': 캡션' 단락은 그 테이블의 캡션 (pandoc 표기)
+            blocks[-1] = ('table', blocks[-1][1], caption.group(1).strip())
+        else:
+            blocks.append(('para', content))
+
+    return blocks
+
+def _build_list_tree(entries):
+    """(들여쓰기, 기호, 줄 목록) 항목들을 들여쓰기 기준으로 중첩 목록 트리로 만드는 함수"""
+    def new_list(marker, indent):
+        return {'ordered': marker[0].isdigit(), 'indent': indent, 'items': []}
+
+    root = new_list(entries[0][1], entries[0][0])
+    stack = [root]
+    for indent, marker, item_lines in entries:
+        while len(stack) > 1 and indent < stack[-1]['indent']:
+            stack.pop()
+        current = stack[-1]
+        if indent > current['indent'] and current['items']:
+            child = new_list(marker, indent)
+            current['items'][-1]['children'].append(child)
+            stack.append(child)
+            current = child
+        current['items'].append({'text': '\n'.join(item_lines), 'children': []})
+    return root
+
+def _resolve_emphasis(out, delims, bottom):
+    """delims[bottom:]의 *, _ 구분자를 짝지어 <em>/<strong>으로 바꾸는 함수 (CommonMark 방식, 선형)
+
+    각 구분자는 [문자, 남은 개수, out 위치, 여는 가능, 닫는 가능, 여는 태그 목록, 닫는 태그 목록] 형태다.
+    """
+    openers = []
+    openers_bottom = {}
+    for d in delims[bottom:]:
+        if d[4]:
+            floor = openers_bottom.get(d[0], 0)
+            j = len(openers) - 1
+            while d[1] > 0 and j >= floor:
+                opener = openers[j]
+                if opener[0] != d[0] or opener[1] == 0:
+                    j -= 1
+                    continue
+                use = 2 if opener[1] >= 2 and d[1] >= 2 else 1
+                tag = 'strong' if use == 2 else 'em'
+                opener[1] -= use
+                d[1] -= use
+                opener[5].append(f'<{tag}>')
+                d[6].append(f'</{tag}>')
+                # 사이에 남은 여는 구분자는 더 이상 짝지을 수 없음
+                del openers[j + 1:]
+                for char in openers_bottom:
+                    openers_bottom[char] = min(openers_bottom[char], len(openers))
+                if opener[1] == 0:
+                    openers.pop()
+                    j -= 1
+            if d[1] > 0:
+                openers_bottom[d[0]] = len(openers)
+        if d[3] and d[1] > 0:
+            openers.append(d)
+
+    for d in delims[bottom:]:
+        # 닫는 태그는 짝지은 순서대로, 여는 태그는 안쪽 태그가 내용에 붙도록 역순으로 배치
+        if d[5] or d[6]:
+            out[d[2]] = ''.join(d[6]) + d[0] * d[1] + ''.join(reversed(d[5]))
+    del delims[bottom:]
+
+def _match_runs(text, char):
+    """같은 길이의 다음 백틱/달러 묶음 위치를 한 번의 역방향 스캔으로 미리 계산하는 함수"""
+    runs = [(m.start(), m.end()) for m in re.finditer(re.escape(char) + '+', text)]
+    closer = {}
+    next_by_length = {}
+    for start, end in reversed(runs):
+        closer[start] = next_by_length.get(end - start)
+        next_by_length[end - start] = (start, end)
+    return closer
+
+def render_inline(text, image_renderer=None):
+    """인라인 요소(코드, 수식, 이미지, 링크, 강조)를 한 번의 스캔으로 HTML로 바꾸는 함수"""
+    out = []
+    delims = []
+    brackets = []
+    code_closers = _match_runs(text, '`') if '`' in text else {}
+    math_closers = _match_runs(text, '$') if '$' in text else {}
+    pos, n = 0, len(text)
+
+    for token in _INLINE_TOKEN_RE.finditer(text):
+        i = token.start()
+        if i < pos:
+            # 구분자 묶음, 코드 스팬, 링크로 이미 소비된 구간
+            continue
+        c = text[i]
+        end = i + 1
+        if c == '_' and i > 0 and end < n and text[i - 1].isalnum() and text[end].isalnum():
+            # 단어 내부의 밑줄(파일명, 변수명 등)은 강조가 아니므로 일반 텍스트로 남김
+            continue
+        if c in '`$*_':
+            while end < n and text[end] == c:
+                end += 1
+        elif c == '!':
+            if end >= n or text[end] != '[':
+                continue
+            end += 1
+        if i > pos:
+            out.append(text[pos:i])
+        pos = end
+
+        if c == '`' or c == '$':
+            # 코드 스팬 / 수식 ($...$ 안의 _ 등은 강조로 처리하지 않음)
+            match = (code_closers if c == '`' else math_closers).get(i)
+            if match:
+                if c == '`':
+                    out.append(f'<code>{html.escape(text[end:match[0]].strip())}</code>')
+                else:
+                    out.append(html.escape(text[i:match[1]], quote=False))
+                pos = match[1]
+            else:
+                out.append(text[i:end])
+
+        elif c == '*' or c == '_':
+            # 구분자 앞뒤 문자로 left/right-flanking 판정 (CommonMark 규칙)
+            before = text[i - 1] if i > 0 else ' '
+            after = text[end] if end < n else ' '
+            if c == '_' and before.isalnum() and after.isalnum():
+                out.append(text[i:end])
+                continue
+            before_p, after_p = before in _PUNCTUATION, after in _PUNCTUATION
+            left = not after.isspace() and (not after_p or before.isspace() or before_p)
+            right = not before.isspace() and (not before_p or after.isspace() or after_p)
+            if c == '_':
+                left, right = left and (not right or before_p), right and (not left or after_p)
+            if left or right:
+                delims.append([c, end - i, len(out), left, right, [], []])
+            out.append(text[i:end])
+
+        elif c == '!' or c == '[':
+            # [out 위치, 이미지 여부, 당시 구분자 수, 내용 시작 위치]
+            brackets.append((len(out), c == '!', len(delims), end))
+            out.append(text[i:end])
+
+        elif c == ']':
+            tail = _LINK_TAIL_RE.match(text, end) if brackets else None
+            if tail is None:
+                out.append(']')
+                continue
+
+            opener = brackets.pop()
+            url = tail.group(1)
+            if opener[1]:
+                alt = text[opener[3]:i]
+                del delims[opener[2]:]
+                rendered = image_renderer(alt, url) if image_renderer else \
+                    f'<img src="{html.escape(url)}" alt="{html.escape(alt)}">'
+            else:
+                _resolve_emphasis(out, delims, opener[2])
+                label = ''.join(out[opener[0] + 1:])
+                rendered = f'<a href="{html.escape(url)}">{label}</a>'
+            del out[opener[0]:]
+            out.append(rendered)
+            pos = tail.end()
+
+        elif c == '<':
+            # 원시 HTML 태그는 그대로, 그 외의 < 는 이스케이프
+            nxt = text[end] if end < n else ''
+            out.append('<' if nxt.isascii() and (nxt.isalpha() or nxt in '/!?') else '&lt;')
+
+        elif c == '&':
+            out.append('&' if _ENTITY_RE.match(text, i) else '&amp;')
+
+        else:  # 백슬래시 이스케이프
+            if end < n and text[end] in _PUNCTUATION:
+                out.append(html.escape(text[end], quote=False))
+                pos = end + 1
+            else:
+                out.append('\\')
+
+    if pos == 0:
+        return text
+    if pos < n:
+        out.append(text[pos:])
+    _resolve_emphasis(out, delims, 0)
+    return ''.join(out)
+
+def render_image_html(alt, path, manifest=None, figure=True, number=None, anchor=None):
+    """이미지를 <figure>(또는 인라인 <img>)로 렌더링하는 함수 (크기 지정, 지연 로딩, web 변형 srcset, 그림 번호와 앵커)"""
+    alt_text = html.escape(alt or "그림")
+    if path.startswith(('http://', 'https://')):
+        img = f'<img src="{html.escape(path)}" alt="{alt_text}" loading="lazy" decoding="async">'
+    else:
+        filename = os.path.basename(path)
+        sources = web_image_sources(filename, manifest)
+        attrs = f'src="{sources["src"]}" alt="{alt_text}" loading="lazy" decoding="async"'
+        if sources['size']:
+            attrs += f' width="{sources["size"][0]}" height="{sources["size"][1]}"'
+        if not sources['png']:
+            img = f'<img {attrs}>'
+        else:
+            sizes = 'sizes="(max-width: 210mm) 100vw, 150mm"'
+            img = (f'<picture>'
+                   f'<source type="image/webp" srcset="{", ".join(sources["webp"])}" {sizes}>'
+                   f'<img {attrs} srcset="{", ".join(sources["png"])}" {sizes}>'
+                   f'</picture>')
+    if not figure:
+        return img
+    id_attr = f' id="{anchor}"' if anchor else ''
+    caption = f'[그림 {number}] {alt_text}' if number else alt_text
+    return f'<figure{id_attr}>{img}<figcaption>{caption}</figcaption></figure>'
+
+def _split_table_row(row):
+    """테이블 행을 셀 목록으로 나누는 함수 (양 끝의 | 와 \\| 이스케이프 처리)"""
+    row = row.strip()
+    if row.startswith('|'):
+        row = row[1:]
+    if row.endswith('|') and not row.endswith('\\|'):
+        row = row[:-1]
+    return [cell.strip().replace('\\|', '|') for cell in re.split(r'(?<!\\)\|', row)]
+
+# 마크다운 테이블을 행 단위 HTML 청크로 내보내는 제너레이터
+def iter_table_html(table_md, table_num=None, manifest=None, caption=None, anchor=None):
+    rows = [row for row in table_md.strip().split('\n') if row.strip()]
+
+    if len(rows) < 2:
+        yield f"<p>테이블 형식 오류: {html.escape(table_md)}</p>"
+        return
+
+    # 구분 행의 : 위치로 열 정렬 결정
+    aligns = []
+    for spec in _split_table_row(rows[1]):
+        if spec.startswith(':') and spec.endswith(':'):
+            aligns.append(' style="text-align: center"')
+        elif spec.endswith(':'):
+            aligns.append(' style="text-align: right"')
+        elif spec.startswith(':'):
+            aligns.append(' style="text-align: left"')
+        else:
+            aligns.append('')
+
+    def cell_html(tag, cells):
+        return ''.join(f'<{tag}{aligns[k] if k < len(aligns) else ""}>{render_inline(cell)}</{tag}>\n'
+                       for k, cell in enumerate(cells))
+
+    table_tag = f'<table id="{anchor}">' if anchor else '<table>'
+    if caption:
+        caption = split_label(caption)[0]
+    if table_num or caption:
+        label = f'&lt;표 {table_num}&gt;' if table_num else ''
+        text = render_inline(caption) if caption else ''
+        yield f'{table_tag}\n<caption>{" ".join(part for part in (label, text) if part)}</caption>\n'
+    else:
+        yield f'{table_tag}\n'
+    yield '<thead>\n<tr>\n' + cell_html('th', _split_table_row(rows[0])) + '</tr>\n</thead>\n<tbody>\n'
+    for row in rows[2:]:  # 첫 행(헤더)과 두 번째 행(구분선)을 건너뜀
+        yield '<tr>\n' + cell_html('td', _split_table_row(row)) + '</tr>\n'
+    yield '</tbody>\n</table>'
+
+# 마크다운 테이블을 HTML로 변환하는 함수
+def convert_table_to_html(table_md, table_num=None, manifest=None):
+    return ''.join(iter_table_html(table_md, table_num, manifest))
+
+def _render_list(node, image_renderer):
+    tag = 'ol' if node['ordered'] else 'ul'
+    yield f'<{tag}>\n'
+    for item in node['items']:
+        yield f'  <li>{render_inline(item["text"], image_renderer)}'
+        for child in item['children']:
+            yield '\n'
+            yield from _render_list(child, image_renderer)
+        yield '</li>\n'
+    yield f'</{tag}>'
+
+def render_blocks(blocks, manifest=None, counters=None):
+    """parse_blocks 결과를 HTML 청크로 내보내는 제너레이터 (블록 사이에 빈 줄, counters로 챕터 안의 그림/표 번호를 이어 매김)"""
+    image_renderer = lambda alt, path: render_image_html(alt, path, manifest, figure=False)
+    for k, block in enumerate(blocks):
+        if k:
+            yield '\n\n'
+        kind = block[0]
+        if kind == 'code':
+            yield f'<pre><code class="language-{block[1]}">{html.escape(block[2])}</code></pre>'
+        elif kind == 'heading':
+            yield f'<h{block[1]}>{render_inline(block[2], image_renderer)}</h{block[1]}>'
+        elif kind == 'hr':
+            yield '<hr>'
+        elif kind == 'table':
+            table_num = anchor = None
+            if block[2] is not None and counters is not None:
+                table_num, anchor = next_label_number(counters, 'table')
+                anchor = split_label(block[2])[1] or anchor
+            yield from iter_table_html(block[1], table_num, manifest, block[2], anchor)
+        elif kind == 'quote':
+            yield '<blockquote>\n'
+            yield from render_blocks(block[1], manifest, counters)
+            yield '\n</blockquote>'
+        elif kind == 'list':
+            yield from _render_list(block[1], image_renderer)
+        elif kind == 'figure':
+            number = anchor = None
+            if counters is not None and block[1]:
+                number, anchor = next_label_number(counters, 'figure')
+            yield render_image_html(block[1], block[2], manifest, number=number, anchor=block[3] or anchor)
+        else:
+            # 단락 내 줄바꿈은 <br>로 유지
+            paragraph = render_inline(block[1], image_renderer).replace('\n', '<br>')
+            yield f'<p>{paragraph}</p>'
+
+def convert_markdown(text, manifest=None):
+    """마크다운 텍스트를 HTML로 변환하는 함수"""
+    return ''.join(render_blocks(parse_blocks(text), manifest))
+
+# HTML 청크를 파일이나 스트림에 순서대로 기록하는 함수
+def write_chunks(chunks, target, encoding='utf-8'):
+    """문자열 청크를 경로(임시 파일 후 교체), 쓰기 가능한 객체, 소켓에 기록하고 기록한 바이트 수를 반환하는 함수"""
+    written = 0
+    if hasattr(target, 'sendall'):
+        for chunk in chunks:
+            data = chunk.encode(encoding)
+            target.sendall(data)
+            written += len(data)
+        return written
+    if hasattr(target, 'write'):
+        binary = not isinstance(target, io.TextIOBase)
+        for chunk in chunks:
+            data = chunk.encode(encoding)
+            target.write(data if binary else chunk)
+            written += len(data)
+        return written
+    # 중간에 실패해도 이전 결과가 반쯤 덮어써지지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = temp_path(target)
+    try:
+        with open(tmp_path, 'w', encoding=encoding) as f:
+            written = write_chunks(chunks, f, encoding)
+        # 제한 시간을 넘긴 단계는 이전 결과를 덮어쓰지 않음
+        check_stage_deadline()
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+# 챕터 제목 줄 (# 1. 서론) 과 제목 앞에 이미 붙어 있는 절 번호
+_CHAPTER_TITLE_RE = re.compile(r'^#\s+\d+\.\s+.+$', re.MULTILINE)
+_SECTION_NUMBER_RE = {2: re.compile(r'^\d+\.\d+\s+'), 3: re.compile(r'^\d+\.\d+\.\d+\s+')}
+
+# 챕터의 절(H2)/항(H3) 제목 색인을 한 번의 줄 단위 탐색으로 만드는 함수
+def build_heading_index(content, chapter_num):
+    """제목마다 level, title, number, id, start(제목 줄 시작), body_start(본문 시작), end(다음 제목 전) 오프셋을 담은 목록을 반환하는 함수
+
+    코드 블록 안의 # 줄은 parse_blocks와 같은 규칙으로 건너뛰고,
+    번호와 id는 위치로 정해지므로 제목이 같은 절이 여러 개여도 서로 구분된다.
+    """
+    headings = []
+    counters = [0, 0]
+    offset = 0
+    fence = None
+    for line in content.split('\n'):
+        start = offset
+        offset += len(line) + 1
+        if fence:
+            if line.lstrip().startswith(fence):
+                fence = None
+            continue
+        if line.startswith('`') or line.startswith('~') or line.startswith(' '):
+            match = _FENCE_RE.match(line)
+            if match:
+                fence = match.group(1)
+                continue
+        if not line.startswith('##'):
+            continue
+        match = _HEADING_RE.match(line)
+        if not match or len(match.group(1)) > 3:
+            continue
+        level = len(match.group(1))
+        if level == 2:
+            counters = [counters[0] + 1, 0]
+        elif counters[0]:
+            counters[1] += 1
+        else:
+            # 첫 절보다 앞선 ### 는 색인하지 않고 본문 제목으로 둔다
+            continue
+        numbers = [str(chapter_num)] + [str(c) for c in counters[:level - 1]]
+        headings.append({
+            'level': level,
+            'title': _SECTION_NUMBER_RE[level].sub('', match.group(2)),
+            'number': '.'.join(numbers),
+            'id': 'section-' + '-'.join(numbers),
+            'start': start,
+            'body_start': min(offset, len(content)),
+        })
+    for k, heading in enumerate(headings):
+        heading['end'] = headings[k + 1]['start'] if k + 1 < len(headings) else len(content)
+    return headings
+
+# 챕터 본문을 섹션 단위 HTML 청크로 내보내는 제너레이터
+def iter_chapter_html(chapter, manifest=None, counters=None, labels=None):
+    """제목 색인을 따라 챕터를 절/항 단위로 나누어 HTML 청크를 차례로 내보내는 함수
+
+    counters가 있으면 그림/표 번호를 이 챕터 기준으로 새로 매기고, labels {라벨: 항목}이 있으면 @fig:/@tbl: 참조를 링크로 바꾼다.
+    """
+    chapter_num = chapter["number"]
+    chapter_content = chapter["content"]
+    headings = chapter.get("headings")
+    if headings is None:
+        headings = build_heading_index(chapter_content, chapter_num)
+    if counters is not None:
+        counters.update(chapter=chapter_num, figure=0, table=0)
+    resolve = (lambda text: resolve_references(text, labels)) if labels else (lambda text: text)
+    
+    yield f"""
+        <div class="chapter" id="chapter{chapter_num}">
+            <h1>{chapter_num}. {chapter["title"]}</h1>
+            <div class="chapter-content">
+"""
+    
+    # 첫 제목 앞의 도입부
+    intro_content = chapter_content[:headings[0]['start'] if headings else len(chapter_content)].strip()
+    if intro_content:
+        yield from render_blocks(parse_blocks(resolve(intro_content)), manifest, counters)
+        if headings:
+            yield "\n"
+    
+    for heading in headings:
+        level = heading['level']
+        yield f'<h{level} id="{heading["id"]}">{heading["number"]} {render_inline(heading["title"])}</h{level}>\n'
+        body = chapter_content[heading['body_start']:heading['end']].strip()
+        if body:
+            yield from render_blocks(parse_blocks(resolve(body)), manifest, counters)
+            yield "\n"
+    
+    yield """
+            </div>
+        </div>"""
+
+# 목차 항목 HTML (챕터마다 만들어 둔 제목 색인 사용)
+def build_toc_html(chapters, page_of=None):
+    """챕터와 절/항 제목으로 목차 HTML을 만드는 함수 (page_of {앵커: 페이지}가 있으면 링크를 해당 페이지로 연결)"""
+    def href(anchor):
+        return f"{page_of[anchor]}#{anchor}" if page_of else f"#{anchor}"
+    
+    toc_entries = []
+    for chapter in chapters:
+        chapter_num = chapter["number"]
+        toc_entries.append(f'<div class="toc-h1"><a href="{href(f"chapter{chapter_num}")}">{chapter_num}. {chapter["title"]}</a></div>')
+        for heading in chapter["headings"]:
+            toc_entries.append(f'<div class="toc-h{heading["level"]}"><a href="{href(heading["id"])}">'
+                               f'{heading["number"]} {render_inline(heading["title"])}</a></div>')
+    return '\n'.join(toc_entries)
+
+def build_label_lists_html(label_index, page_of=None):
+    """라벨 색인으로 그림 목차와 표 목차 HTML을 만드는 함수 (항목이 없는 목차는 생략)"""
+    parts = []
+    for key, title in (('figures', '그림 목차'), ('tables', '표 목차')):
+        if not label_index[key]:
+            continue
+        entries = []
+        for entry in label_index[key]:
+            href = f"{page_of[entry['anchor']]}#{entry['anchor']}" if page_of else f"#{entry['anchor']}"
+            number = f"[그림 {entry['number']}]" if entry['kind'] == 'figure' else f"&lt;표 {entry['number']}&gt;"
+            entries.append(f'<div class="toc-h2"><a href="{href}">{number} {render_inline(entry["caption"])}</a></div>')
+        parts.append(f"""        <div class="toc-page">
+            <div class="toc-title">{title}</div>
+            <div class="toc-list">
+                {chr(10).join(entries)}
+            </div>
+        </div>
         
-        # 초록 (새 페이지)
-        f.write('\\chapter*{초록}\n\\addcontentsline{toc}{chapter}{초록}\n\n')
-        f.write(sections.get('abstract', ''))
-        f.write('\n\n')
+""")
+    return ''.join(parts)
+
+def iter_front_matter_html(document, toc_content, manifest=None, page_of=None):
+    """표지, 초록, 목차, 그림/표 목차 HTML 청크를 내보내는 제너레이터 (본문 container는 열어 둔 채로 끝남)
+
+    초록의 그림/표는 라벨 색인에 없으므로 번호를 매기지 않는다.
+    """
+    title = document['metadata']['title']
+    author_info = [line.strip() for line in document['author'].split('\n') if ':' in line]
+    today = format_build_date()
+    yield f"""    <!-- 표지 -->
+    <div class="title-page">
+        <div class="title-content">
+            <h1>{title}</h1>
+            <div class="degree-text">석사학위 논문</div>
+        </div>
         
-        # 목차 페이지
-        f.write('\\newpage\n')
-        f.write('\\tableofcontents\n')
-        f.write('\\newpage\n\n')
+        <div class="author-info">
+            {'<br>'.join(author_info)}
+        </div>
         
-        # 그림 목차 추가
-        f.write('\\listoffigures\n')
-        f.write('\\newpage\n\n')
+        <div class="date-university">
+            <p>{today}</p>
+            <p>aSSIST(서울과학종합대학원)</p>
+        </div>
+    </div>
+    
+    <div class="container">
+        <!-- 초록 -->
+        <div class="abstract-page">
+            <h2>초록</h2>
+            <div class="abstract-content">
+                """
+    yield from render_blocks(parse_blocks(document['abstract']), manifest)
+    yield f"""
+            </div>
+        </div>
         
-        # 표 목차 추가
-        f.write('\\listoftables\n')
-        f.write('\\newpage\n\n')
+        <!-- 목차 -->
+        <div class="toc-page">
+            <div class="toc-title">목차</div>
+            <div class="toc-list">
+                {toc_content}
+            </div>
+        </div>
         
-        # 본문 챕터들
-        # 서론
-        f.write('\\chapter{서론}\n\n')
-        f.write(sections.get('introduction', ''))
-        f.write('\n\n')
-        
-        # 이론적 배경
-        f.write('\\chapter{이론적 배경}\n\n')
-        f.write(sections.get('background', ''))
-        f.write('\n\n')
-        
-        # 연구 방법
-        f.write('\\chapter{연구 방법}\n\n')
-        f.write(sections.get('method', ''))
-        f.write('\n\n')
-        
-        # 실험 및 결과
-        f.write('\\chapter{실험 및 결과}\n\n')
-        f.write(sections.get('results', ''))
-        f.write('\n\n')
-        
-        # 결론
-        f.write('\\chapter{결론 및 향후 연구}\n\n')
-        f.write(sections.get('conclusion', ''))
-        f.write('\n\n')
-        
-        # 참고문헌
-        f.write('\\chapter*{참고 문헌}\n\\addcontentsline{toc}{chapter}{참고 문헌}\n\n')
-        f.write(sections.get('references', ''))
-    
-    print(f"마크다운 파일이 생성되었습니다: {markdown_file}")
-    return markdown_file
+"""
+    yield build_label_lists_html(document['labels'], page_of)
 
-# HTML 변환 함수 (개선)
-def convert_to_thesis_html(markdown_file, html_file):
-    """마크다운 파일을 학위 논문 형식의 HTML로 변환하는 함수"""
+# 로컬 글꼴 (fonts/ 아래 글꼴 파일을 본문에 쓰인 글자만 남겨 줄인 뒤 @font-face로 사용)
+# 패턴은 앞에서부터 찾으며, 가변 글꼴(wght 축) 하나로 두 굵기를 모두 채울 수 있음
+FONT_FACES = [
+    {'family': 'Noto Serif KR', 'weight': 400, 'patterns': ['NotoSerifKR-Regular.*', 'NotoSerifKR*wght*.*']},
+    {'family': 'Noto Serif KR', 'weight': 700, 'patterns': ['NotoSerifKR-Bold.*', 'NotoSerifKR*wght*.*']},
+    {'family': 'Noto Sans KR', 'weight': 400, 'patterns': ['NotoSansKR-Regular.*', 'NotoSansKR*wght*.*']},
+    {'family': 'Noto Sans KR', 'weight': 700, 'patterns': ['NotoSansKR-Bold.*', 'NotoSansKR*wght*.*']},
+    {'family': 'D2Coding', 'weight': 400, 'patterns': ['D2Coding.*', 'D2Coding-*.*']},
+    {'family': 'D2Coding', 'weight': 700, 'patterns': ['D2CodingBold.*', 'D2CodingBold-*.*']},
+]
+FONT_FORMATS = {'.woff2': 'woff2', '.woff': 'woff', '.ttf': 'truetype', '.otf': 'opentype'}
+
+# 부분 집합 형식 버전 (생성 방식이 바뀌면 올려서 캐시된 글꼴을 무효화)
+FONT_SUBSET_VERSION = 1
+
+# HTML 틀에 본문과 별도로 들어가는 글자 (사이트 이동 막대, 검색 상자와 SEARCH_JS가 쓰는 문구와 일치 횟수 숫자 포함)
+HTML_TEMPLATE_TEXT = ('석사학위 논문 초록 목차 표 그림 년 월 일 aSSIST(서울과학종합대학원) <> ← 이전 다음 →'
+                      ' 본문 검색 결과 없음 0123456789')
+
+def find_font_file(face):
+    """fonts/에서 글꼴 면(face)에 맞는 첫 파일 경로 (없으면 None)"""
+    for pattern in face['patterns']:
+        for path in sorted(glob.glob(os.path.join(fonts_dir, pattern))):
+            if os.path.splitext(path)[1].lower() in FONT_FORMATS:
+                return path
+    return None
+
+def font_digests(manifest=None):
+    """fonts/ 아래 글꼴 파일의 해시 목록"""
+    font_files = sorted(p for p in glob.glob(os.path.join(fonts_dir, '*'))
+                        if os.path.splitext(p)[1].lower() in FONT_FORMATS)
+    return {path: file_digest(path, manifest) for path in font_files}
+
+def document_codepoints(document):
+    """HTML에 나타날 수 있는 글자의 유니코드 값 (본문, 제목, 저자, 빌드 날짜, HTML 틀 문구, ASCII 전체)"""
+    texts = [document['title'], document['author'], document['abstract'], format_build_date(), HTML_TEMPLATE_TEXT]
+    texts += [str(value) for value in document['metadata'].values()]
+    for chapter in document['chapters']:
+        texts += [chapter['title'], chapter['content']]
+    chars = set(map(chr, range(0x20, 0x7f)))
+    for text in texts:
+        chars.update(text)
+    return sorted(ord(c) for c in chars if c.isprintable())
+
+def subset_font(src_path, codepoints, dst_path, flavor):
+    """글꼴에서 codepoints 글자만 남겨 flavor(woff2/woff) 형식으로 저장하는 함수"""
+    options = font_subset.Options()
+    options.flavor = flavor
+    options.layout_features = ['*']
+    font = font_subset.load_font(src_path, options)
     try:
-        # 이미지 디렉토리 경로 설정
-        images_dir = os.path.join(output_dir, 'images')
+        subsetter = font_subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        tmp_path = temp_path(dst_path)
+        font_subset.save_font(font, tmp_path, options)
+        os.replace(tmp_path, dst_path)
+    finally:
+        font.close()
+
+_font_lock = threading.Lock()
+
+def build_font_css(document, base_dir, manifest=None):
+    """로컬 글꼴의 부분 집합을 output/fonts에 두고 base_dir 기준 @font-face 규칙을 반환하는 함수 (글꼴이 없으면 빈 문자열)
+
+    부분 집합은 원본 글꼴 해시와 글자 집합 해시로 캐시 디렉토리의 fonts/에 저장되므로 본문 글자가 그대로면 다시 만들지 않는다.
+    fontTools가 없으면 원본 글꼴을 그대로 쓴다.
+    """
+    # HTML과 사이트 단계가 동시에 output/fonts를 채우고 정리하지 않도록 직렬화
+    with _font_lock:
+        faces = [(face, find_font_file(face)) for face in FONT_FACES]
+        faces = [(face, path) for face, path in faces if path]
+        if not faces:
+            return ''
+        if not FONTTOOLS_AVAILABLE:
+            print("fontTools가 없어 글꼴 전체를 그대로 사용합니다 (부분 집합 생성 생략).")
         
-        # 논문 스타일 CSS
-        thesis_css = """
-        @import url('https://fonts.googleapis.com/css2?family=Noto+Serif+KR:wght@400;700&family=Noto+Sans+KR:wght@400;700&family=D2Coding:wght@400;700&display=swap');
+        codepoints = document_codepoints(document)
+        glyph_key = hashlib.sha256(''.join(map(chr, codepoints)).encode('utf-8')).hexdigest()
+        fonts_output_dir = os.path.join(output_dir, 'fonts')
+        os.makedirs(fonts_output_dir, exist_ok=True)
+        os.makedirs(font_cache_dir, exist_ok=True)
         
+        rules = []
+        placed = set()
+        for face, src_path in faces:
+            if FONTTOOLS_AVAILABLE:
+                key = compute_key('font', FONT_SUBSET_VERSION, FONTTOOLS_VERSION, FONT_FLAVOR,
+                                  file_digest(src_path, manifest), glyph_key)
+                ext = '.' + FONT_FLAVOR
+                cached = os.path.join(font_cache_dir, key + ext)
+                try:
+                    with cache_lock(cached):
+                        if not os.path.exists(cached):
+                            subset_font(src_path, codepoints, cached, FONT_FLAVOR)
+                except Exception as e:
+                    print(f"글꼴 부분 집합 생성 오류 {src_path}: {e}")
+                    continue
+            else:
+                key = file_digest(src_path, manifest)
+                ext = os.path.splitext(src_path)[1].lower()
+                cached = src_path
+        
+            # 파일 이름에 내용 해시를 넣어 브라우저 캐시가 오래된 글꼴을 쓰지 않게 함
+            name = f"{face['family'].replace(' ', '')}-{face['weight']}-{key[:12]}{ext}"
+            dst_path = os.path.join(fonts_output_dir, name)
+            if not os.path.exists(dst_path):
+                tmp_path = temp_path(dst_path)
+                shutil.copyfile(cached, tmp_path)
+                os.replace(tmp_path, dst_path)
+            placed.add(name)
+            url = os.path.relpath(dst_path, base_dir).replace(os.sep, '/')
+            rules.append(f"""
+        @font-face {{
+            font-family: '{face['family']}';
+            font-style: normal;
+            font-weight: {face['weight']};
+            font-display: swap;
+            src: url('{url}') format('{FONT_FORMATS[ext]}');
+        }}""")
+        
+        # 이번 빌드에서 쓰지 않는 글꼴 파일 정리
+        for entry in os.scandir(fonts_output_dir):
+            if entry.is_file() and entry.name not in placed:
+                os.remove(entry.path)
+        
+        size = sum(os.path.getsize(os.path.join(fonts_output_dir, name)) for name in placed)
+        print(f"글꼴 {len(placed)}개 준비 (글자 {len(codepoints)}자, 합계 {size / 1024:.0f}KB)")
+        return ''.join(rules) + '\n'
+
+# 논문 스타일 CSS (단일 HTML에는 인라인으로, 사이트 모드에서는 공유 CSS 파일로 들어감)
+THESIS_CSS = """
         * {
             box-sizing: border-box;
         }
@@ -609,204 +2717,75 @@ def convert_to_thesis_html(markdown_file, html_file):
             .page-break {
                 page-break-after: always;
             }
+            
+            .search-box {
+                display: none;
+            }
         }
-        """
         
-        # 마크다운 내용 읽기
-        with open(markdown_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        /* 본문 검색 상자 */
+        .search-box {
+            position: fixed;
+            top: 1em;
+            right: 1em;
+            width: 16em;
+            z-index: 10;
+            font-family: 'Noto Sans KR', sans-serif;
+            font-size: 10pt;
+        }
         
-        # 제목 추출 (YAML 메타데이터에서)
-        title_match = re.search(r'title:\s*([^\n]+)', content)
-        title = title_match.group(1).strip() if title_match else "생성형 인공지능 기반 시계열 예측 자동화 연구"
+        .search-box input {
+            width: 100%;
+            padding: 0.4em 0.6em;
+            border: 1px solid #ccc;
+            border-radius: 4px;
+        }
         
-        # 저자 정보
-        author_info = []
-        sections = collect_sections()
-        author_text = sections.get('author', '')
-        for line in author_text.split('\n'):
-            if ':' in line:
-                author_info.append(line.strip())
+        #thesis-search-results {
+            max-height: 60vh;
+            overflow-y: auto;
+            background-color: #fff;
+        }
         
-        # 현재 날짜
-        today = datetime.now().strftime('%Y년 %m월 %d일')
+        #thesis-search-results a {
+            display: block;
+            padding: 0.3em 0.6em;
+            color: #333;
+            text-decoration: none;
+            border-bottom: 1px solid #eee;
+        }
+        """
+
+# HTML 변환 함수 (개선)
+def convert_to_thesis_html(markdown_file, html_file, manifest=None, document=None, open_browser=True):
+    """문서 모델을 학위 논문 형식의 HTML로 변환하는 함수 (document가 없으면 원고에서 새로 만듦)"""
+    try:
+        # 입력(마크다운, 원고, 빌드 날짜, 스크립트)이 그대로면 변환 생략
+        images_key = recorded_stage_key(manifest, 'images')
+        stage_key = compute_key('html', file_digest(markdown_file, manifest), paper_digests(manifest),
+                                data_digests(manifest), font_digests(manifest), FONTTOOLS_VERSION, FONT_FLAVOR,
+                                images_key, format_build_date(), generator_digest(manifest))
+        if is_stage_fresh(manifest, 'html', stage_key, [html_file]):
+            print(f"HTML 입력 변경 없음: 변환을 건너뜁니다 ({html_file})")
+            return True
         
-        # 마크다운 테이블을 HTML로 변환하는 함수
-        def convert_table_to_html(table_md, table_num=None):
-            rows = [row for row in table_md.strip().split('\n') if row.strip()]
-            
-            if len(rows) < 2:
-                return f"<p>테이블 형식 오류: {table_md}</p>"
-            
-            html_table = '<table>\n'
-            if table_num:
-                html_table += f'<caption>표 {table_num}</caption>\n'
-            
-            # 헤더 행
-            header_cells = [cell.strip() for cell in rows[0].split('|')]
-            header_cells = [cell for cell in header_cells if cell != '']  # 빈 셀 제거
-            
-            html_table += '<thead>\n<tr>\n'
-            for cell in header_cells:
-                html_table += f'<th>{cell}</th>\n'
-            html_table += '</tr>\n</thead>\n'
-            
-            # 본문 행
-            html_table += '<tbody>\n'
-            for row in rows[2:]:  # 첫 행(헤더)과 두 번째 행(구분선)을 건너뜀
-                if not row.strip() or not '|' in row:
-                    continue
-                cells = [cell.strip() for cell in row.split('|')]
-                cells = [cell for cell in cells if cell != '']  # 빈 셀 제거
-                
-                html_table += '<tr>\n'
-                for cell in cells:
-                    html_table += f'<td>{cell}</td>\n'
-                html_table += '</tr>\n'
-            
-            html_table += '</tbody>\n</table>'
-            return html_table
-        
-        # 마크다운을 HTML로 변환하는 함수 (특수 태그 처리)
-        def convert_markdown(text):
-            # 이미지 처리
-            def process_image(match):
-                alt = match.group(1) or "그림"
-                path = match.group(2)
-                
-                # 상대 경로 처리
-                if not path.startswith(('http://', 'https://')):
-                    filename = os.path.basename(path)
-                    path = f'images/{filename}'
-                
-                return f'<figure><img src="{path}" alt="{alt}"><figcaption>{alt}</figcaption></figure>'
-            
-            # 코드 블록 처리
-            def process_code_block(match):
-                lang = match.group(1) or ""
-                code = match.group(2)
-                return f'<pre><code class="language-{lang}">{html.escape(code)}</code></pre>'
-            
-            # 인라인 코드 처리
-            def process_inline_code(match):
-                return f'<code>{html.escape(match.group(1))}</code>'
-                
-            # 강조 처리
-            def process_bold(match):
-                return f'<strong>{match.group(1)}</strong>'
-                
-            def process_italic(match):
-                return f'<em>{match.group(1)}</em>'
-            
-            # 테이블 처리
-            def process_table(match):
-                table_content = match.group(0)
-                return convert_table_to_html(table_content)
-                
-            # 순서 없는 목록 처리
-            def process_unordered_list(match):
-                list_text = match.group(0)
-                items = re.findall(r'[\*\-\+]\s+(.*?)(?=\n[\*\-\+]|\n\n|\Z)', list_text + '\n\n', re.DOTALL)
-                html_list = '<ul>\n'
-                for item in items:
-                    html_list += f'  <li>{item.strip()}</li>\n'
-                html_list += '</ul>'
-                return html_list
-                
-            # 순서 있는 목록 처리
-            def process_ordered_list(match):
-                list_text = match.group(0)
-                items = re.findall(r'\d+\.\s+(.*?)(?=\n\d+\.|\n\n|\Z)', list_text + '\n\n', re.DOTALL)
-                html_list = '<ol>\n'
-                for item in items:
-                    html_list += f'  <li>{item.strip()}</li>\n'
-                html_list += '</ol>'
-                return html_list
-            
-            # 처리 순서가 중요함: 블록 요소 → 인라인 요소
-            
-            # 먼저 코드 블록 처리 (다른 마크다운 서식의 영향을 받지 않도록)
-            text = re.sub(r'```([a-z]*)\n(.*?)```', process_code_block, text, flags=re.DOTALL)
-            
-            # 테이블 처리
-            text = re.sub(r'(\|.*\|\n)(\|[\s\-:]*\|\n)(\|.*\|\n)+', process_table, text)
-            
-            # 목록 처리
-            text = re.sub(r'(?:^|\n)(?:[\*\-\+]\s+.*\n)+', process_unordered_list, text)
-            text = re.sub(r'(?:^|\n)(?:\d+\.\s+.*\n)+', process_ordered_list, text)
-            
-            # 제목 처리는 별도로 수행하므로 여기서는 생략
-            
-            # 인라인 요소 처리
-            text = re.sub(r'!\[(.*?)\]\((.*?)\)', process_image, text)  # 이미지
-            text = re.sub(r'`(.*?)`', process_inline_code, text)  # 인라인 코드
-            text = re.sub(r'\*\*(.*?)\*\*|__(.*?)__', lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>', text)  # 강조
-            text = re.sub(r'\*(.*?)\*|_(.*?)_', lambda m: f'<em>{m.group(1) or m.group(2)}</em>', text)  # 기울임
-            text = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', text)  # 링크
-            
-            # 문단 처리: 빈 줄로 구분된 텍스트 블록을 <p> 태그로 감싸기
-            paragraphs = []
-            for para in re.split(r'\n\s*\n', text):
-                if para.strip():
-                    # 이미 HTML 태그로 시작하는 콘텐츠는 그대로 두기
-                    if re.match(r'^\s*<(pre|ul|ol|table|h[1-6]|blockquote|div|figure)', para.strip()):
-                        paragraphs.append(para.strip())
-                    else:
-                        # 줄바꿈 처리
-                        formatted_para = para.replace('\n', '<br>')
-                        paragraphs.append(f'<p>{formatted_para}</p>')
-            
-            return '\n\n'.join(paragraphs)
-        
-        # 목차 및 챕터 내용 생성
-        chapters = [
-            {"number": "1", "title": "서론", "content": sections.get('introduction', '')},
-            {"number": "2", "title": "이론적 배경", "content": sections.get('background', '')},
-            {"number": "3", "title": "연구 방법", "content": sections.get('method', '')},
-            {"number": "4", "title": "실험 및 결과", "content": sections.get('results', '')},
-            {"number": "5", "title": "결론 및 향후 연구", "content": sections.get('conclusion', '')},
-            {"number": "6", "title": "참고 문헌", "content": sections.get('references', '')}
-        ]
+        # 이미지 디렉토리 경로 설정
+        images_dir = os.path.join(output_dir, 'images')
         
-        # 목차 항목 생성
-        toc_entries = []
-        for chapter in chapters:
-            chapter_num = chapter["number"]
-            chapter_title = chapter["title"]
-            toc_entries.append(f'<div class="toc-h1"><a href="#chapter{chapter_num}">{chapter_num}. {chapter_title}</a></div>')
-            
-            # H2 레벨 제목 추출
-            h2_pattern = r'^##\s+(.+?)$'
-            h2_matches = re.findall(h2_pattern, chapter["content"], re.MULTILINE)
-            
-            for i, h2 in enumerate(h2_matches):
-                section_id = f"section-{chapter_num}-{i+1}"
-                section_num = f"{chapter_num}.{i+1}"
-                # 섹션 제목에서 이미 있는 번호 제거
-                clean_h2 = re.sub(r'^\d+\.\d+\s+', '', h2)
-                toc_entries.append(f'<div class="toc-h2"><a href="#{section_id}">{section_num} {clean_h2}</a></div>')
-                
-                # 해당 섹션 내의 H3 제목 찾기
-                section_start = chapter["content"].find(f"## {h2}")
-                if section_start >= 0:
-                    next_h2_match = re.search(r'^##\s+', chapter["content"][section_start+len(h2):], re.MULTILINE)
-                    section_end = next_h2_match.start() + section_start + len(h2) if next_h2_match else len(chapter["content"])
-                    section_content = chapter["content"][section_start:section_end]
-                    
-                    h3_pattern = r'^###\s+(.+?)$'
-                    h3_matches = re.findall(h3_pattern, section_content, re.MULTILINE)
-                    
-                    for j, h3 in enumerate(h3_matches):
-                        subsection_id = f"section-{chapter_num}-{i+1}-{j+1}"
-                        subsection_num = f"{chapter_num}.{i+1}.{j+1}"
-                        # H3 제목에서 이미 있는 번호 제거
-                        clean_h3 = re.sub(r'^\d+\.\d+\.\d+\s+', '', h3)
-                        toc_entries.append(f'<div class="toc-h3"><a href="#{subsection_id}">{subsection_num} {clean_h3}</a></div>')
-        
-        toc_content = '\n'.join(toc_entries)
-        
-        # HTML 파일 시작 부분
-        html_content = f"""<!DOCTYPE html>
+        # 문서 모델 (main에서 이미 만들었다면 그대로 사용)
+        if document is None:
+            document = build_document(collect_sections(), images_dir)
+        title = document['metadata']['title']
+        
+        # 본문에 쓰인 글자만 남긴 로컬 글꼴 (외부 글꼴 서버에 의존하지 않음)
+        thesis_css = build_font_css(document, os.path.dirname(html_file), manifest) + THESIS_CSS
+        chapters = document['chapters']
+        toc_content = build_toc_html(chapters)
+        
+        # 문서를 앞에서부터 청크 단위로 만들어 곧바로 기록 (전체 문서를 메모리에 모으지 않음)
+        def html_chunks():
+            counters = {}  # 그림/표 번호는 챕터마다 새로 매김 (장-순번)
+            yield f"""<!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="UTF-8">
@@ -817,148 +2796,805 @@ def convert_to_thesis_html(markdown_file, html_file):
     </style>
 </head>
 <body>
-    <!-- 표지 -->
-    <div class="title-page">
-        <div class="title-content">
-            <h1>{title}</h1>
-            <div class="degree-text">석사학위 논문</div>
-        </div>
+"""
+            yield search_box_html(os.path.dirname(html_file))
+            yield from iter_front_matter_html(document, toc_content, manifest)
+            yield """        <!-- 본문 -->
+"""
+            
+            # 챕터 내용 추가
+            for chapter in chapters:
+                yield from iter_chapter_html(chapter, manifest, counters, document['labels']['labels'])
+            
+            # HTML 문서 마무리
+            yield """
+    </div>
+</body>
+</html>"""
         
-        <div class="author-info">
-            {'<br>'.join(author_info)}
-        </div>
+        # HTML 파일 저장
+        write_chunks(html_chunks(), html_file)
         
-        <div class="date-university">
-            <p>{today}</p>
-            <p>aSSIST(서울과학종합대학원)</p>
-        </div>
-    </div>
+        print(f"HTML 파일이 생성되었습니다: {html_file}")
+        record_stage(manifest, 'html', stage_key, [html_file])
+        
+        # 브라우저에서 자동 열기
+        if open_browser:
+            try:
+                import webbrowser
+                webbrowser.open('file://' + os.path.abspath(html_file))
+                print("생성된 HTML 파일이 브라우저에서 열렸습니다.")
+            except Exception as e:
+                print(f"브라우저에서 파일을 열지 못했습니다: {e}")
+        
+        return True
     
-    <div class="container">
-        <!-- 초록 -->
-        <div class="abstract-page">
-            <h2>초록</h2>
-            <div class="abstract-content">
-                {convert_markdown(sections.get('abstract', ''))}
-            </div>
-        </div>
+    except subprocess.TimeoutExpired as e:
+        print(f"HTML 변환 시간 초과: {e.timeout:g}초")
+        raise
+    except Exception as e:
+        print(f"HTML 변환 중 오류 발생: {e}")
+        traceback.print_exc()
+        return False
+
+# 여러 페이지 HTML 사이트 (표지/초록/목차 index.html과 챕터별 페이지, 공유 CSS)
+SITE_VERSION = 1
+
+# 사이트 페이지에만 쓰는 이전/다음 챕터 이동 막대
+SITE_CSS = """
+        .site-nav {
+            display: flex;
+            justify-content: space-between;
+            max-width: 210mm;
+            margin: 0 auto;
+            padding: 1em 25mm;
+            font-family: 'Noto Sans KR', sans-serif;
+            font-size: 10pt;
+        }
         
-        <!-- 목차 -->
-        <div class="toc-page">
-            <div class="toc-title">목차</div>
-            <div class="toc-list">
-                {toc_content}
-            </div>
-        </div>
+        .site-nav a {
+            color: #333;
+            text-decoration: none;
+        }
         
-        <!-- 본문 -->
+        @media print {
+            .site-nav {
+                display: none;
+            }
+        }
 """
+
+_SITE_LINK_RE = re.compile(r'(href|src|srcset)="(#[^"]*|images/[^"]*)"')
+
+def rewrite_site_links(chunk, page, page_of, prefix):
+    """사이트 페이지의 청크에서 다른 페이지에 있는 앵커는 해당 페이지로, images/ 경로는 prefix를 붙여 바꾸는 함수"""
+    def replace(match):
+        attr, value = match.groups()
+        if value.startswith('#'):
+            target = page_of.get(value[1:])
+            if target and target != page:
+                value = target + value
+        else:
+            # srcset은 "images/a.webp 480w, images/b.webp 960w" 형태
+            value = re.sub(r'(^|,\s*)images/', lambda m: m.group(1) + prefix + 'images/', value)
+        return f'{attr}="{value}"'
+    return _SITE_LINK_RE.sub(replace, chunk)
+
+def site_page_name(chapter):
+    """챕터 페이지 파일 이름"""
+    return f"chapter{chapter['number']}.html"
+
+def convert_to_thesis_site(markdown_file, site_dir, manifest=None, document=None, open_browser=True, workers=None):
+    """문서 모델을 챕터별 페이지로 나눈 HTML 사이트로 변환하는 함수
+
+    index.html(표지, 초록, 목차)과 chapterN.html을 site_dir에 쓰고, CSS는 thesis.css 하나를 공유한다.
+    각 페이지는 이웃 페이지를 prefetch하며, 그림/표 번호는 챕터마다 매기므로 페이지를 따로 만들어도 같은 번호가 된다.
+    페이지는 스레드 풀에서 동시에 만든다.
+    """
+    try:
+        images_key = recorded_stage_key(manifest, 'images')
+        stage_key = compute_key('site', SITE_VERSION, file_digest(markdown_file, manifest), paper_digests(manifest),
+                                data_digests(manifest), font_digests(manifest), FONTTOOLS_VERSION, FONT_FLAVOR,
+                                images_key, format_build_date(), generator_digest(manifest))
+        if is_stage_fresh(manifest, 'site', stage_key, [os.path.join(site_dir, 'index.html')]):
+            print(f"사이트 입력 변경 없음: 변환을 건너뜁니다 ({site_dir})")
+            return True
+        
+        images_dir = os.path.join(output_dir, 'images')
+        if document is None:
+            document = build_document(collect_sections(), images_dir)
+        title = document['metadata']['title']
+        chapters = document['chapters']
+        os.makedirs(site_dir, exist_ok=True)
+        
+        # 공유 CSS (글꼴 경로는 사이트 디렉토리 기준)
+        css_file = os.path.join(site_dir, 'thesis.css')
+        write_chunks([build_font_css(document, site_dir, manifest), THESIS_CSS, SITE_CSS], css_file)
         
-        # 챕터 내용 추가
+        # 앵커가 있는 페이지 (목차와 본문의 다른 챕터 링크를 이 표로 바꿈)
+        page_of = {}
         for chapter in chapters:
-            chapter_num = chapter["number"]
-            chapter_title = chapter["title"]
-            chapter_content = chapter["content"]
-            
-            # 챕터 번호가 이미 있는 제목을 제거
-            chapter_content = re.sub(r'^#\s+\d+\.\s+.+$', '', chapter_content, flags=re.MULTILINE).strip()
-            
-            html_content += f"""
-        <div class="chapter" id="chapter{chapter_num}">
-            <h1>{chapter_num}. {chapter_title}</h1>
-            <div class="chapter-content">
+            page = site_page_name(chapter)
+            page_of[f"chapter{chapter['number']}"] = page
+            for heading in chapter['headings']:
+                page_of[heading['id']] = page
+        for entry in document['labels']['figures'] + document['labels']['tables']:
+            page_of[entry['anchor']] = page_of[f"chapter{entry['chapter']}"]
+        prefix = os.path.relpath(output_dir, site_dir).replace(os.sep, '/') + '/'
+        
+        pages = ['index.html'] + [site_page_name(chapter) for chapter in chapters]
+        search_box = search_box_html(site_dir, site=True)
+        
+        def page_head(page_title, k):
+            prefetch = ''.join(f'\n    <link rel="prefetch" href="{pages[j]}">' for j in (k - 1, k + 1) if 0 <= j < len(pages))
+            return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{page_title}</title>
+    <link rel="stylesheet" href="thesis.css">{prefetch}
+</head>
+<body>
+{search_box}"""
+        
+        def page_nav(k):
+            prev_link = f'<a href="{pages[k - 1]}">&larr; 이전</a>' if k > 0 else '<span></span>'
+            next_link = f'<a href="{pages[k + 1]}">다음 &rarr;</a>' if k + 1 < len(pages) else '<span></span>'
+            return f"""    <nav class="site-nav">
+        {prev_link}
+        <a href="index.html">목차</a>
+        {next_link}
+    </nav>
 """
-            
-            # 섹션 처리
-            if "##" in chapter_content:
-                # 섹션(H2) 추출 및 처리
-                sections_pattern = r'##\s+(.+?)(?=\n##|\Z)'
-                sections_with_titles = re.split(sections_pattern, chapter_content, flags=re.DOTALL)
-                
-                # 첫 번째 요소가 ## 앞의 내용이라면 처리
-                if sections_with_titles and not sections_with_titles[0].startswith('##'):
-                    intro_content = sections_with_titles.pop(0).strip()
-                    if intro_content:
-                        html_content += convert_markdown(intro_content) + "\n"
-                
-                # 나머지 요소들은 제목과 내용이 번갈아가며 나옴
-                for i in range(0, len(sections_with_titles), 2):
-                    if i+1 < len(sections_with_titles):
-                        section_title = sections_with_titles[i].strip()
-                        section_content = sections_with_titles[i+1].strip()
-                        
-                        # 섹션 번호 제거
-                        clean_title = re.sub(r'^\d+\.\d+\s+', '', section_title)
-                        section_id = f"section-{chapter_num}-{i//2+1}"
-                        section_num = f"{chapter_num}.{i//2+1}"
-                        
-                        html_content += f'<h2 id="{section_id}">{section_num} {clean_title}</h2>\n'
-                        
-                        # 섹션 내 서브섹션(H3) 처리
-                        if "###" in section_content:
-                            subsections_pattern = r'###\s+(.+?)(?=\n###|\Z)'
-                            subsections_with_titles = re.split(subsections_pattern, section_content, flags=re.DOTALL)
-                            
-                            # 첫 번째 요소가 ### 앞의 내용이라면 처리
-                            if subsections_with_titles and not subsections_with_titles[0].startswith('###'):
-                                subsection_intro = subsections_with_titles.pop(0).strip()
-                                if subsection_intro:
-                                    html_content += convert_markdown(subsection_intro) + "\n"
-                            
-                            # 나머지 요소들은 제목과 내용이 번갈아가며 나옴
-                            for j in range(0, len(subsections_with_titles), 2):
-                                if j+1 < len(subsections_with_titles):
-                                    subsection_title = subsections_with_titles[j].strip()
-                                    subsection_content = subsections_with_titles[j+1].strip()
-                                    
-                                    # 서브섹션 번호 제거
-                                    clean_subsection_title = re.sub(r'^\d+\.\d+\.\d+\s+', '', subsection_title)
-                                    subsection_id = f"section-{chapter_num}-{i//2+1}-{j//2+1}"
-                                    subsection_num = f"{chapter_num}.{i//2+1}.{j//2+1}"
-                                    
-                                    html_content += f'<h3 id="{subsection_id}">{subsection_num} {clean_subsection_title}</h3>\n'
-                                    html_content += convert_markdown(subsection_content) + "\n"
-                        else:
-                            # 서브섹션이 없으면 섹션 내용 전체를 변환
-                            html_content += convert_markdown(section_content) + "\n"
-            else:
-                # 섹션이 없으면 챕터 내용 전체를 변환
-                html_content += convert_markdown(chapter_content)
-            
-            html_content += """
-            </div>
-        </div>"""
         
-        # HTML 문서 마무리
-        html_content += """
-    </div>
-</body>
-</html>"""
+        def index_chunks():
+            yield page_head(title, 0)
+            for chunk in iter_front_matter_html(document, build_toc_html(chapters, page_of), manifest, page_of):
+                yield rewrite_site_links(chunk, pages[0], page_of, prefix)
+            yield "    </div>\n"
+            yield page_nav(0)
+            yield "</body>\n</html>"
         
-        # HTML 파일 저장
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        def chapter_chunks(k):
+            chapter = chapters[k - 1]
+            yield page_head(f"{chapter['number']}. {chapter['title']} - {title}", k)
+            yield page_nav(k)
+            yield '    <div class="container">\n'
+            for chunk in iter_chapter_html(chapter, manifest, {}, document['labels']['labels']):
+                yield rewrite_site_links(chunk, pages[k], page_of, prefix)
+            yield "\n    </div>\n"
+            yield page_nav(k)
+            yield "</body>\n</html>"
         
-        print(f"HTML 파일이 생성되었습니다: {html_file}")
+        # 페이지별 키: 모든 페이지가 공유하는 입력(페이지 목록, 앵커 위치, 라벨 색인, 그림 등)과 그 페이지의 내용
+        # (본문 챕터 하나만 바뀌면 그 페이지만 다시 씀, 목차가 바뀌면 index.html도 다시 씀)
+        shared_key = compute_key('site-shared', SITE_VERSION, pages, page_of, prefix, search_box,
+                                 document['labels'], images_key, format_build_date(), generator_digest(manifest))
         
-        # 브라우저에서 자동 열기
-        try:
-            import webbrowser
-            webbrowser.open('file://' + os.path.abspath(html_file))
-            print("생성된 HTML 파일이 브라우저에서 열렸습니다.")
-        except Exception as e:
-            print(f"브라우저에서 파일을 열지 못했습니다: {e}")
+        def page_key(k):
+            if k == 0:
+                toc = [(chapter['number'], chapter['title'], chapter['headings']) for chapter in chapters]
+                return compute_key('site-page', shared_key, document['metadata'], document['author'],
+                                   document['abstract'], toc)
+            return compute_key('site-page', shared_key, chapters[k - 1])
+        
+        def render_page(k):
+            path = os.path.join(site_dir, pages[k])
+            key = page_key(k)
+            if not is_stage_fresh(manifest, f'site:{pages[k]}', key, [path]):
+                write_chunks(index_chunks() if k == 0 else chapter_chunks(k), path)
+                record_stage(manifest, f'site:{pages[k]}', key, [path])
+            return path
+        
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            outputs = list(executor.map(bind_stage_context(render_page), range(len(pages))))
+        outputs.append(css_file)
+        
+        # 챕터가 줄어 더 이상 쓰지 않는 페이지 정리
+        for path in glob.glob(os.path.join(site_dir, '*.html')):
+            if path not in outputs:
+                os.remove(path)
+        
+        print(f"HTML 사이트가 생성되었습니다: {site_dir} (페이지 {len(pages)}개)")
+        record_stage(manifest, 'site', stage_key, outputs)
+        
+        if open_browser:
+            try:
+                import webbrowser
+                webbrowser.open('file://' + os.path.abspath(outputs[0]))
+                print("생성된 사이트가 브라우저에서 열렸습니다.")
+            except Exception as e:
+                print(f"브라우저에서 파일을 열지 못했습니다: {e}")
         
         return True
     
+    except subprocess.TimeoutExpired as e:
+        print(f"HTML 사이트 변환 시간 초과: {e.timeout:g}초")
+        raise
     except Exception as e:
-        print(f"HTML 변환 중 오류 발생: {e}")
+        print(f"HTML 사이트 변환 중 오류 발생: {e}")
         traceback.print_exc()
         return False
 
+# 본문 검색 색인 (글자 바이그램 역색인, 띄어쓰기가 없는 한국어 복합어도 부분 일치로 찾음)
+# 색인 파일은 file://로 연 HTML에서도 <script>로 읽을 수 있도록 JS 대입문 형태로 저장한다.
+SEARCH_INDEX_VERSION = 1
+SEARCH_INDEX_PREFIX = 'window.THESIS_SEARCH_INDEX = '
+_VLQ_DIGITS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+_VLQ_VALUES = {c: i for i, c in enumerate(_VLQ_DIGITS)}
+_MD_IMAGE_RE = re.compile(r'!\[([^\]\n]*)\]\([^)\n]*\)')
+_MD_LINK_RE = re.compile(r'\[([^\]\n]*)\]\([^)\n]*\)')
+_HTML_TAG_RE = re.compile(r'<[^>\n]+>')
+_WORD_RE = re.compile(r'\w+')
+
+def encode_vlq(values):
+    """0 이상의 정수 목록을 5비트 단위 가변 길이 base64 문자열로 만드는 함수"""
+    digits = []
+    for value in values:
+        while True:
+            digit = value & 31
+            value >>= 5
+            digits.append(_VLQ_DIGITS[digit | 32 if value else digit])
+            if not value:
+                break
+    return ''.join(digits)
+
+def decode_vlq(text):
+    """encode_vlq의 역변환"""
+    values = []
+    value = shift = 0
+    for c in text:
+        digit = _VLQ_VALUES[c]
+        value |= (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+def search_runs(text):
+    """검색용 글자열 목록 (NFKC 정규화, 소문자, 문자/숫자가 이어진 구간)"""
+    return _WORD_RE.findall(unicodedata.normalize('NFKC', text).lower())
+
+def run_grams(run):
+    """글자열의 바이그램 목록 (한 글자면 그 글자 하나)"""
+    return [run[i:i + 2] for i in range(len(run) - 1)] or [run]
+
+def plain_text(markdown_text):
+    """검색 색인용으로 마크다운에서 그림/링크 주소와 HTML 태그를 걷어낸 본문"""
+    text = _MD_IMAGE_RE.sub(r'\1', markdown_text)
+    text = _MD_LINK_RE.sub(r'\1', text)
+    return _HTML_TAG_RE.sub(' ', text)
+
+def section_terms(text):
+    """구간의 바이그램별 위치 목록 {바이그램: [위치, ...]} (글자열 사이는 위치를 하나 띄워 구문 일치가 넘어가지 않게 함)"""
+    terms = {}
+    position = 0
+    for run in search_runs(plain_text(text)):
+        for gram in run_grams(run):
+            terms.setdefault(gram, []).append(position)
+            position += 1
+        position += 1
+    return terms
+
+def chapter_search_sections(chapter, manifest=None):
+    """챕터를 도입부와 절/항 단위로 나눈 검색 구간 [{'id', 'title', 'terms'}] (챕터 내용이 그대로면 캐시 사용)"""
+    content = chapter['content']
+    key = compute_key('search', SEARCH_INDEX_VERSION, chapter['number'], chapter['title'], content)
+    cache_path = os.path.join(search_cache_dir, f'{key}.json')
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    
+    headings = chapter.get('headings')
+    if headings is None:
+        headings = build_heading_index(content, chapter['number'])
+    chapter_title = f"{chapter['number']}. {chapter['title']}"
+    sections = [{'id': f"chapter{chapter['number']}", 'title': chapter_title,
+                 'terms': section_terms(chapter_title + '\n' + content[:headings[0]['start'] if headings else len(content)])}]
+    for heading in headings:
+        title = f"{heading['number']} {plain_text(heading['title'])}"
+        sections.append({'id': heading['id'], 'title': title,
+                         'terms': section_terms(title + '\n' + content[heading['body_start']:heading['end']])})
+    
+    os.makedirs(search_cache_dir, exist_ok=True)
+    write_chunks([json.dumps(sections, ensure_ascii=False, separators=(',', ':'))], cache_path)
+    return sections
+
+def build_search_index(document, manifest=None):
+    """문서 모델로부터 검색 색인을 만드는 함수
+
+    반환값: {'version', 'sections': [[id, 사이트 페이지, 제목]], 'terms': {바이그램: 게시 목록}}
+    게시 목록은 구간마다 (구간 번호 차이, 위치 개수, 위치 차이...)를 이어 붙인 정수열을 encode_vlq로 줄인 문자열이다.
+    """
+    sections = []
+    postings = {}
+    for chapter in document['chapters']:
+        page = site_page_name(chapter)
+        for section in chapter_search_sections(chapter, manifest):
+            for term, positions in section['terms'].items():
+                postings.setdefault(term, []).append((len(sections), positions))
+            sections.append([section['id'], page, section['title']])
+    
+    terms = {}
+    for term in sorted(postings):
+        values = []
+        previous_section = 0
+        for section, positions in postings[term]:
+            values += [section - previous_section, len(positions)]
+            values += [position - previous for previous, position in zip([0] + positions, positions)]
+            previous_section = section
+        terms[term] = encode_vlq(values)
+    return {'version': SEARCH_INDEX_VERSION, 'sections': sections, 'terms': terms}
+
+def write_search_index(index, path):
+    """검색 색인을 JS 대입문 형태로 저장하는 함수"""
+    return write_chunks([SEARCH_INDEX_PREFIX, json.dumps(index, ensure_ascii=False, separators=(',', ':')), ';\n'], path)
+
+def load_search_index(path):
+    """write_search_index로 저장한 검색 색인을 읽는 함수"""
+    text = read_file_content(path)
+    if not text.startswith(SEARCH_INDEX_PREFIX):
+        raise ValueError(f"검색 색인 형식이 아닙니다: {path}")
+    return json.loads(text[len(SEARCH_INDEX_PREFIX):].rstrip().rstrip(';'))
+
+def _term_postings(index, term, memo):
+    """바이그램의 게시 목록을 {구간 번호: [위치, ...]}로 풀어 memo에 보관하는 함수"""
+    if term not in memo:
+        values = decode_vlq(index['terms'].get(term, ''))
+        postings = {}
+        i = section = 0
+        while i < len(values):
+            section += values[i]
+            count = values[i + 1]
+            positions = []
+            position = 0
+            for delta in values[i + 2:i + 2 + count]:
+                position += delta
+                positions.append(position)
+            postings[section] = positions
+            i += 2 + count
+        memo[term] = postings
+    return memo[term]
+
+def search_index(index, query, limit=10):
+    """검색어의 모든 글자열이 나오는 구간을 일치 횟수 순으로 [(구간 [id, 페이지, 제목], 일치 횟수)]로 반환하는 함수
+
+    여러 글자 글자열은 바이그램이 연속된 위치에 있어야 일치하며, 한 글자 글자열은 그 글자를 포함한 바이그램으로 찾는다.
+    """
+    memo = {}
+    scores = None
+    for run in search_runs(query):
+        hits = {}
+        if len(run) == 1:
+            # 글자의 위치는 그 글자로 시작하는 바이그램의 위치 (글자열 끝 글자면 마지막 바이그램 다음 위치)
+            found = {}
+            for term in index['terms']:
+                for shift, char in enumerate(term):
+                    if char == run:
+                        for section, positions in _term_postings(index, term, memo).items():
+                            found.setdefault(section, set()).update(p + shift for p in positions)
+            hits = {section: len(positions) for section, positions in found.items()}
+        else:
+            grams = run_grams(run)
+            lists = [_term_postings(index, gram, memo) for gram in grams]
+            for section in set(lists[0]).intersection(*lists[1:]):
+                following = [set(postings[section]) for postings in lists[1:]]
+                count = sum(all(p + j + 1 in positions for j, positions in enumerate(following))
+                            for p in lists[0][section])
+                if count:
+                    hits[section] = count
+        scores = hits if scores is None else {section: scores[section] + count
+                                              for section, count in hits.items() if section in scores}
+        if not scores:
+            return []
+    ranked = sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))
+    return [(index['sections'][section], count) for section, count in ranked[:limit]]
+
+# 브라우저용 검색 스크립트 (검색 상자에 처음 포커스가 갈 때 색인을 읽고, search_index와 같은 규칙으로 찾음)
+SEARCH_JS = r"""(function () {
+    'use strict';
+    var script = document.currentScript;
+    var indexUrl = script.getAttribute('data-index');
+    var site = script.getAttribute('data-site') === '1';
+    var input = document.getElementById('thesis-search');
+    var output = document.getElementById('thesis-search-results');
+    var DIGITS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/';
+    var index = null, terms = null, memo = {}, loading = false;
+    if (!input || !output) {
+        return;
+    }
+
+    function load(callback) {
+        if (index) {
+            return callback();
+        }
+        if (loading) {
+            return;
+        }
+        loading = true;
+        var tag = document.createElement('script');
+        tag.src = indexUrl;
+        tag.onload = function () {
+            index = window.THESIS_SEARCH_INDEX;
+            terms = Object.keys(index.terms);
+            callback();
+        };
+        document.head.appendChild(tag);
+    }
+
+    function runs(text) {
+        return text.normalize('NFKC').toLowerCase().match(/[\p{L}\p{M}\p{N}_]+/gu) || [];
+    }
+
+    function postings(term) {
+        if (!(term in memo)) {
+            var text = index.terms[term] || '', values = [], value = 0, shift = 0, i, digit;
+            for (i = 0; i < text.length; i++) {
+                digit = DIGITS.indexOf(text.charAt(i));
+                value += (digit & 31) * Math.pow(2, shift);
+                if (digit & 32) {
+                    shift += 5;
+                } else {
+                    values.push(value);
+                    value = shift = 0;
+                }
+            }
+            var result = {}, section = 0, j, count, position, list;
+            for (i = 0; i < values.length; i += 2 + count) {
+                section += values[i];
+                count = values[i + 1];
+                list = [];
+                position = 0;
+                for (j = 0; j < count; j++) {
+                    position += values[i + 2 + j];
+                    list.push(position);
+                }
+                result[section] = list;
+            }
+            memo[term] = result;
+        }
+        return memo[term];
+    }
+
+    function runHits(run) {
+        var hits = {}, section, i;
+        if (run.length === 1) {
+            var found = {};
+            terms.forEach(function (term) {
+                if (term.indexOf(run) < 0) {
+                    return;
+                }
+                var lists = postings(term);
+                for (var shift = 0; shift < term.length; shift++) {
+                    if (term.charAt(shift) !== run) {
+                        continue;
+                    }
+                    for (section in lists) {
+                        found[section] = found[section] || new Set();
+                        lists[section].forEach(function (p) { found[section].add(p + shift); });
+                    }
+                }
+            });
+            for (section in found) {
+                hits[section] = found[section].size;
+            }
+            return hits;
+        }
+        var lists = [];
+        for (i = 0; i + 1 < run.length; i++) {
+            lists.push(postings(run.substr(i, 2)));
+        }
+        for (section in lists[0]) {
+            var sets = [], ok = true;
+            for (i = 1; i < lists.length && ok; i++) {
+                ok = section in lists[i];
+                if (ok) {
+                    sets.push(new Set(lists[i][section]));
+                }
+            }
+            if (!ok) {
+                continue;
+            }
+            var count = lists[0][section].filter(function (p) {
+                return sets.every(function (set, j) { return set.has(p + j + 1); });
+            }).length;
+            if (count) {
+                hits[section] = count;
+            }
+        }
+        return hits;
+    }
+
+    function search(query) {
+        var scores = null;
+        var parts = runs(query);
+        for (var k = 0; k < parts.length; k++) {
+            var hits = runHits(parts[k]), next = {};
+            for (var section in hits) {
+                if (scores === null || section in scores) {
+                    next[section] = hits[section] + (scores ? scores[section] : 0);
+                }
+            }
+            scores = next;
+        }
+        return Object.keys(scores || {}).map(Number).sort(function (a, b) {
+            return scores[b] - scores[a] || a - b;
+        }).slice(0, 20).map(function (section) {
+            return [index.sections[section], scores[section]];
+        });
+    }
+
+    function render() {
+        var query = input.value.trim();
+        output.textContent = '';
+        if (!query) {
+            return;
+        }
+        var results = search(query);
+        if (!results.length) {
+            output.textContent = '검색 결과 없음';
+            return;
+        }
+        results.forEach(function (result) {
+            var link = document.createElement('a');
+            link.href = (site ? result[0][1] : '') + '#' + result[0][0];
+            link.textContent = result[0][2] + ' (' + result[1] + ')';
+            output.appendChild(link);
+        });
+    }
+
+    var timer = null;
+    input.addEventListener('focus', function () { load(function () {}); });
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () { load(render); }, 80);
+    });
+})();
+"""
+
+def search_box_html(base_dir, site=False):
+    """base_dir의 HTML에서 쓰는 검색 상자와 검색 스크립트 태그"""
+    prefix = os.path.relpath(search_dir, base_dir).replace(os.sep, '/')
+    return f"""    <div class="search-box">
+        <input type="search" id="thesis-search" placeholder="본문 검색" autocomplete="off">
+        <div id="thesis-search-results"></div>
+    </div>
+    <script src="{prefix}/search.js" data-index="{prefix}/index.js" data-site="{int(site)}" defer></script>
+"""
+
+def print_search_results(results, query):
+    """search 명령의 검색 결과 출력"""
+    if not results:
+        print(f"'{query}' 검색 결과 없음")
+        return
+    print(f"'{query}' 검색 결과 {len(results)}건:")
+    for (section_id, page, title), count in results:
+        print(f"  {title}  ({count}회, {page}#{section_id})")
+
+# pandoc 실행기 (가능하면 오래 떠 있는 pandoc 서버에 작업을 보내고, 안 되면 1회성 실행)
+# 서버 모드는 pandoc 3의 `pandoc server` 또는 별도 설치된 pandoc-server를 사용하며,
+# THESIS_PANDOC_SERVER=0 이면 항상 1회성 실행을 쓴다.
+PANDOC_SERVER_TIMEOUT = 300
+_pandoc_server = {'process': None, 'url': None, 'available': None}
+_pandoc_lock = threading.Lock()
+pandoc_jobs = []
+
+def _pandoc_server_command():
+    """사용할 수 있는 pandoc 서버 실행 명령 (없으면 None)"""
+    if shutil.which('pandoc-server'):
+        return ['pandoc-server']
+    if shutil.which('pandoc'):
+        return ['pandoc', 'server']
+    return None
+
+def start_pandoc_server(wait=5.0):
+    """로컬 포트에 pandoc 서버를 띄우고 주소를 반환하는 함수 (이미 떠 있으면 재사용, 실패하면 None)"""
+    import socket
+    with _pandoc_lock:
+        if _pandoc_server['available'] is not None:
+            return _pandoc_server['url']
+        _pandoc_server['available'] = False
+        command = _pandoc_server_command()
+        if command is None or os.environ.get('THESIS_PANDOC_SERVER') == '0':
+            return None
+        
+        # 빈 포트를 골라 서버 실행
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        try:
+            process = subprocess.Popen(command + ['--port', str(port), '--timeout', str(PANDOC_SERVER_TIMEOUT)],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            return None
+        
+        # 포트가 열릴 때까지 대기 (서버 모드를 지원하지 않는 pandoc이면 곧바로 종료됨)
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline and process.poll() is None:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        else:
+            if process.poll() is None:
+                process.kill()
+            print("pandoc 서버 모드를 사용할 수 없습니다: 1회성 실행으로 전환합니다.")
+            return None
+        
+        import atexit
+        atexit.register(stop_pandoc_server)
+        _pandoc_server.update(process=process, url=f'http://127.0.0.1:{port}/', available=True)
+        print(f"pandoc 서버 시작: {_pandoc_server['url']}")
+        return _pandoc_server['url']
+
+def stop_pandoc_server():
+    """실행 중인 pandoc 서버를 종료하는 함수"""
+    process = _pandoc_server['process']
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    _pandoc_server.update(process=None, url=None, available=None)
+
+def disable_pandoc_server():
+    """응답하지 않는 pandoc 서버를 내리고 이후 작업은 1회성 실행을 쓰게 하는 함수"""
+    with _pandoc_lock:
+        stop_pandoc_server()
+        _pandoc_server['available'] = False
+
+def pandoc_argv(options):
+    """서버 API 형식의 옵션 dict를 pandoc 명령행 인자 목록으로 바꾸는 함수"""
+    argv = ['pandoc']
+    for key, value in options.items():
+        if value is True:
+            argv.append(f'--{key}')
+        elif value not in (None, False):
+            argv.append(f'--{key}={value}')
+    return argv
+
+def run_pandoc(text, options, name='pandoc', timeout=None):
+    """마크다운 text를 options(서버 API 키 이름, template은 파일 경로)대로 변환하는 함수
+
+    {'ok', 'output', 'error', 'mode', 'seconds'}를 반환하고 같은 내용을 pandoc_jobs에 기록한다.
+    제한 시간을 넘기면 subprocess.TimeoutExpired를 전달한다.
+    """
+    url = start_pandoc_server()
+    started = time.perf_counter()
+    job = {'name': name, 'ok': False, 'output': '', 'error': '', 'mode': 'oneshot'}
+    if url:
+        import urllib.request
+        import urllib.error
+        payload = dict(options, text=text)
+        if payload.get('template'):
+            # 서버는 파일을 읽지 않으므로 템플릿 내용을 직접 전달
+            payload['template'] = read_file_content(payload['template'])
+            payload['standalone'] = True
+        request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json', 'Accept': 'application/json'})
+        job['mode'] = 'server'
+        try:
+            with urllib.request.urlopen(request, timeout=stage_time_left(timeout)) as response:
+                reply = json.loads(response.read().decode('utf-8'))
+            job.update(ok=True, output=reply.get('output', ''),
+                       error='\n'.join(str(message) for message in reply.get('messages', [])))
+        except urllib.error.HTTPError as e:
+            job['error'] = e.read().decode('utf-8', errors='replace')
+        except TimeoutError:
+            raise subprocess.TimeoutExpired(url, timeout)
+        except (urllib.error.URLError, ConnectionError) as e:
+            if isinstance(getattr(e, 'reason', None), TimeoutError):
+                raise subprocess.TimeoutExpired(url, timeout)
+            # 서버가 죽었거나 연결을 받지 않으면 이번 작업부터 1회성 실행으로 전환
+            print(f"pandoc 서버에 연결할 수 없어 1회성 실행으로 전환합니다: {e}")
+            disable_pandoc_server()
+            url = None
+            job['mode'] = 'oneshot'
+    if not url:
+        result = run_process(pandoc_argv(options), name=name, input=text, capture_output=True, text=True,
+                             timeout=timeout)
+        job.update(ok=result.returncode == 0, output=result.stdout,
+                   error=result.stderr or f"종료 코드 {result.returncode}")
+    job['seconds'] = round(time.perf_counter() - started, 3)
+    pandoc_jobs.append({key: job[key] for key in ('name', 'mode', 'ok', 'seconds')})
+    return job
+
+def print_pandoc_jobs(jobs):
+    """pandoc 작업별 실행 방식과 소요 시간을 출력하는 함수"""
+    if not jobs:
+        return
+    print(f"pandoc 작업 {len(jobs)}개, 합계 {sum(job['seconds'] for job in jobs):.2f}s:")
+    for job in jobs:
+        print(f"  {job['name']:<16} {job['mode']:<8} {job['seconds']:6.2f}s{'' if job['ok'] else '  (실패)'}")
+
+# LaTeX 보조 파일 (상호 참조, 목차, 그림/표 목차)
+LATEX_AUX_EXTENSIONS = ['.aux', '.toc', '.lof', '.lot', '.out']
+LATEX_MAX_PASSES = 4
+
+def _latex_aux_digest(build_dir, jobname):
+    """빌드 디렉토리의 보조 파일(\\include된 챕터의 .aux 포함) 내용을 하나의 해시로 묶는 함수"""
+    h = hashlib.sha256()
+    paths = [os.path.join(build_dir, jobname + ext) for ext in LATEX_AUX_EXTENSIONS]
+    paths += sorted(glob.glob(os.path.join(build_dir, 'chapters', '*.aux')))
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                h.update(path.encode() + f.read())
+    return h.hexdigest()
+
+# 유지되는 빌드 디렉토리에서 LaTeX 엔진을 직접 실행하는 함수
+def run_latex(tex_file, build_dir, engine, resource_paths=(), timeout=None):
+    """보조 파일이 더 이상 바뀌지 않을 때까지(최대 LATEX_MAX_PASSES회) 엔진을 다시 실행하는 함수
+
+    이전 빌드의 .aux/.toc 등이 남아 있으면 내용이 크게 바뀌지 않은 경우 한 번으로 끝난다.
+    그림은 TEXINPUTS에 resource_paths를 넣어 PDF용 변형부터 찾게 한다.
+    """
+    # \include된 챕터의 .aux는 빌드 디렉토리 아래 chapters/에 쓰임
+    os.makedirs(os.path.join(build_dir, 'chapters'), exist_ok=True)
+    jobname = Path(tex_file).stem
+    env = dict(os.environ)
+    # 끝의 구분자는 TeX 기본 경로를 뒤에 붙이라는 의미
+    env['TEXINPUTS'] = os.pathsep.join([os.path.abspath(p) for p in resource_paths] + [env.get('TEXINPUTS', '')])
+    cmd = [engine, '-interaction=nonstopmode', '-halt-on-error', f'-jobname={jobname}', os.path.abspath(tex_file)]
+    
+    aux_digest = _latex_aux_digest(build_dir, jobname)
+    for run in range(1, LATEX_MAX_PASSES + 1):
+        print(f"{engine} 실행 {run}회차...")
+        result = run_process(cmd, name=f'{engine} {run}', cwd=build_dir, env=env, capture_output=True, text=True,
+                             errors='replace', timeout=timeout)
+        if result.returncode != 0:
+            errors = [line for line in result.stdout.splitlines() if line.startswith('!')]
+            print('\n'.join(errors[:10]) or result.stdout[-2000:])
+            print(f"\nPDF 변환 실패: 종료 코드 {result.returncode} (로그: {os.path.join(build_dir, jobname + '.log')})")
+            return False
+        new_digest = _latex_aux_digest(build_dir, jobname)
+        if new_digest == aux_digest:
+            break
+        aux_digest = new_digest
+    return True
+
+# 챕터별 LaTeX 조각 생성 함수
+def write_latex_chapters(document, manifest=None, timeout=None):
+    """챕터마다 output/chapters/ch<번호>.tex를 만들고 \\include 이름 목록을 반환하는 함수 (내용이 그대로인 챕터는 pandoc 생략, 실패 시 None)"""
+    chapters_dir = os.path.join(output_dir, 'chapters')
+    os.makedirs(chapters_dir, exist_ok=True)
+    options = {'from': 'markdown', 'to': 'latex', 'listings': True, 'top-level-division': 'chapter'}
+    
+    names = []
+    for chapter in document['chapters']:
+        name = f"chapters/ch{chapter['number']}"
+        tex_path = os.path.join(chapters_dir, f"ch{chapter['number']}.tex")
+        source = chapter_markdown(chapter, document['labels']['labels'])
+        key = compute_key('latex-chapter', source, options, generator_digest(manifest))
+        if not is_stage_fresh(manifest, f'latex:{name}', key, [tex_path]):
+            job = run_pandoc(source, options, name, timeout)
+            if not job['ok']:
+                print(f"표준 오류:\n{job['error']}")
+                print(f"\n{chapter['number']}장 LaTeX 생성 실패")
+                return None
+            if write_if_changed(tex_path, job['output']):
+                print(f"챕터 LaTeX 파일이 생성되었습니다: {tex_path}")
+            record_stage(manifest, f'latex:{name}', key, [tex_path])
+        names.append(name)
+    return names
+
 # PDF 변환 함수
-def convert_to_pdf(markdown_file, pdf_file):
-    """마크다운 파일을 PDF로 변환하는 함수"""
+def convert_to_pdf(markdown_file, pdf_file, manifest=None, timeout=None, document=None, draft=None):
+    """문서 모델을 챕터별 \\include 구조의 LaTeX로 만든 뒤 PDF로 조판하는 함수
+
+    draft에 챕터 번호 목록을 주면 \\includeonly로 해당 챕터만 다시 조판하고, 나머지 챕터의
+    쪽 번호와 참조는 마지막 전체 빌드의 .aux 값을 그대로 쓴다 (결과는 pdf_file에 저장).
+    timeout초를 넘기면 pandoc/xelatex을 종료하고 TimeoutExpired를 전달한다.
+    """
     try:
         print("PDF로 변환 중...")
         
@@ -968,10 +3604,12 @@ def convert_to_pdf(markdown_file, pdf_file):
         
         # LaTeX 템플릿 파일 생성
         template_path = os.path.join(templates_dir, 'thesis_template.tex')
+        # 초안은 별도 주 문서(thesis-draft.tex)에 써서 전체 빌드의 thesis.tex를 건드리지 않음
+        latex_file = os.path.join(output_dir, 'thesis-draft.tex' if draft else 'thesis.tex')
+        latex_build_dir = os.path.join(output_dir, 'latex')
         
-        # 간단한 LaTeX 템플릿 작성
-        with open(template_path, 'w', encoding='utf-8') as f:
-            f.write(r"""
+        # 간단한 LaTeX 템플릿 작성 (내용이 같으면 다시 쓰지 않음)
+        template_changed = write_if_changed(template_path, r"""
 \documentclass[$if(fontsize)$$fontsize$,$endif$$if(lang)$$lang$,$endif$$if(papersize)$$papersize$,$endif$$for(classoption)$$classoption$$sep$,$endfor$]{$documentclass$}
 
 % 한국어 지원
@@ -1103,113 +3741,947 @@ $body$
 \end{document}
 """)
         
-        print(f"LaTeX 템플릿 파일이 생성되었습니다: {template_path}")
+        if template_changed:
+            print(f"LaTeX 템플릿 파일이 생성되었습니다: {template_path}")
         
-        # PDF 변환을 위한 명령어 구성
+        # 그림 탐색 경로 (PDF용 변형을 먼저 찾음, 엔진 실행 시 TEXINPUTS로 전달)
         resource_paths = [
+            os.path.join(os.path.abspath(output_dir), 'print'),
             os.path.abspath(output_dir),
             os.path.join(os.path.abspath(output_dir), 'images'),
+            os.path.abspath(generated_plots_dir),
             os.path.join(os.path.abspath(results_dir), 'analysis_plots')
         ]
         
-        resource_path_args = " ".join([f"--resource-path {path}" for path in resource_paths])
-        
         # xelatex 확인
         xelatex_available = shutil.which("xelatex") is not None
         pdf_engine = "xelatex" if xelatex_available else "pdflatex"
         
-        # PDF 생성 명령어
-        cmd = f"pandoc {markdown_file} -o {pdf_file} --pdf-engine={pdf_engine} --template {template_path} --listings --number-sections --toc --top-level-division=chapter {resource_path_args}"
+        # 주 문서 LaTeX 변환 옵션 (표지/초록/목차 + 챕터 \include 목록을 입력으로 받음)
+        options = {'from': 'markdown', 'to': 'latex', 'standalone': True, 'template': template_path, 'listings': True,
+                   'number-sections': True, 'table-of-contents': True, 'top-level-division': 'chapter'}
         
-        print(f"PDF 변환을 위한 명령어:\n{cmd}")
+        # 마크다운, 템플릿, 변환 옵션, 초안 챕터, 그림(이미지 단계 키: 원본과 PDF용 변형)이 그대로면
+        # pandoc과 xelatex 실행 모두 생략 (그림은 TEXINPUTS로 읽으므로 .tex에 드러나지 않음)
+        images_key = recorded_stage_key(manifest, 'images')
+        stage = 'pdf-draft' if draft else 'pdf'
+        stage_key = compute_key(stage, file_digest(markdown_file, manifest), file_digest(template_path, manifest),
+                                options, pdf_engine, sorted(draft or []), images_key, generator_digest(manifest))
+        if is_stage_fresh(manifest, stage, stage_key, [latex_file, pdf_file]):
+            print(f"PDF 입력 변경 없음: 변환을 건너뜁니다 ({pdf_file})")
+            return True
         
-        # 명령어 실행
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        if shutil.which('pandoc') is None:
+            print("\nPDF 변환 실패: pandoc을 찾을 수 없습니다.")
+            print("\n팁: pandoc을 설치한 뒤 다시 실행하세요.")
+            print("Ubuntu/Debian: 'sudo apt-get install pandoc'")
+            print("Mac: 'brew install pandoc'")
+            print("Windows: https://pandoc.org/installing.html 에서 설치 파일을 받으세요")
+            print("\n혹은 다른 PDF 변환 도구를 사용해보세요:")
+            print("1. 웹에서 Markdown to PDF 변환 서비스 이용")
+            print("2. VS Code의 Markdown PDF 확장 기능 사용")
+            return False
         
-        # 결과 확인
-        if result.returncode != 0:
-            print(f"표준 오류:\n{result.stderr}")
-            print(f"\nPDF 변환 실패: 종료 코드 {result.returncode}")
-            
-            # 실패 시 LaTeX 중간 파일 생성 시도
-            latex_file = os.path.join(output_dir, 'thesis.tex')
-            latex_cmd = f"pandoc {markdown_file} -o {latex_file} --template {template_path} --listings --number-sections --toc --top-level-division=chapter {resource_path_args}"
-            print("\n더 자세한 오류 검사를 위해 LaTeX 중간 파일 생성 시도...")
-            subprocess.run(latex_cmd, shell=True)
-            
-            # 사용자에게 팁 제공
-            if not xelatex_available:
-                print("\n팁: xelatex이 설치되어 있지 않아 PDF 생성에 실패했을 수 있습니다.")
-                print("Ubuntu/Debian: 'sudo apt-get install texlive-xetex texlive-lang-korean'")
-                print("Mac: MacTeX 패키지를 설치하세요 (https://www.tug.org/mactex/)")
-                print("Windows: MikTeX 또는 TeX Live를 설치하세요")
-                print("\n혹은 다른 PDF 변환 도구를 사용해보세요:")
-                print("1. 웹에서 Markdown to PDF 변환 서비스 이용")
-                print("2. VS Code의 Markdown PDF 확장 기능 사용")
-            
+        if document is None:
+            document = build_document(collect_sections(), os.path.join(output_dir, 'images'))
+        if draft:
+            known = {chapter['number'] for chapter in document['chapters']}
+            unknown = [number for number in draft if number not in known]
+            if unknown:
+                print(f"PDF 변환 실패: 없는 챕터 번호 {', '.join(unknown)} (가능한 번호: {', '.join(sorted(known))})")
+                return False
+        
+        # 1단계: 챕터별 LaTeX 조각과 이를 \include하는 주 문서(output/thesis.tex)를 먼저 생성
+        first_job = len(pandoc_jobs)
+        chapter_names = write_latex_chapters(document, manifest, timeout)
+        if chapter_names is None:
             return False
-        else:
-            print(f"PDF 파일이 성공적으로 생성되었습니다: {pdf_file}")
+        
+        front = io.StringIO()
+        write_front_matter(front, document)
+        front.write('\n\n'.join(f'\\include{{{name}}}' for name in chapter_names) + '\n')
+        
+        job = run_pandoc(front.getvalue(), options, 'thesis', timeout)
+        if not job['ok']:
+            print(f"표준 오류:\n{job['error']}")
+            print("\nLaTeX 생성 실패")
+            return False
+        tex = job['output']
+        
+        # 초안 모드: 지정한 챕터만 조판 (\includeonly는 프리앰블에 있어야 함)
+        if draft:
+            includeonly = ','.join(f'chapters/ch{number}' for number in draft)
+            tex = tex.replace('\\begin{document}', f'\\includeonly{{{includeonly}}}\n\\begin{{document}}', 1)
+            if not glob.glob(os.path.join(latex_build_dir, 'chapters', '*.aux')):
+                print("참고: 전체 빌드 기록이 없어 다른 챕터의 쪽 번호와 참조가 비어 있을 수 있습니다.")
+        write_if_changed(latex_file, tex)
+        print(f"LaTeX 파일이 생성되었습니다: {latex_file}")
+        print_pandoc_jobs(pandoc_jobs[first_job:])
+        
+        # 주 문서, 챕터 LaTeX, \includegraphics로 읽는 그림(PDF 단계 키와 같은 이미지 단계 키)이
+        # 지난 조판 때와 같으면 엔진 실행 생략
+        # (jobname이 주 문서 이름이므로 초안은 thesis-draft.pdf/.aux를 따로 쓰고 챕터 .aux만 공유)
+        latex_stage = 'latex-draft' if draft else 'latex'
+        built_pdf = os.path.join(latex_build_dir, Path(latex_file).stem + '.pdf')
+        tex_key = compute_key(latex_stage, file_digest(latex_file, manifest), pdf_engine, images_key,
+                              [file_digest(os.path.join(output_dir, name + '.tex'), manifest) for name in chapter_names])
+        if is_stage_fresh(manifest, latex_stage, tex_key, [built_pdf]) and os.path.exists(pdf_file):
+            print("LaTeX 내용이 이전과 같습니다: 조판을 건너뜁니다.")
+            record_stage(manifest, stage, stage_key, [latex_file, pdf_file])
             return True
         
+        # 2단계: 유지되는 빌드 디렉토리에서 엔진 실행 (.aux/.toc/.lof/.lot 재사용)
+        if shutil.which(pdf_engine) is None:
+            print(f"\nPDF 변환 실패: {pdf_engine}을 찾을 수 없습니다 (LaTeX 파일은 {latex_file})")
+            print("\n팁: xelatex이 설치되어 있지 않아 PDF 생성에 실패했을 수 있습니다.")
+            print("Ubuntu/Debian: 'sudo apt-get install texlive-xetex texlive-lang-korean'")
+            print("Mac: MacTeX 패키지를 설치하세요 (https://www.tug.org/mactex/)")
+            print("Windows: MikTeX 또는 TeX Live를 설치하세요")
+            print("\n혹은 다른 PDF 변환 도구를 사용해보세요:")
+            print("1. 웹에서 Markdown to PDF 변환 서비스 이용")
+            print("2. VS Code의 Markdown PDF 확장 기능 사용")
+            return False
+        
+        if not run_latex(latex_file, latex_build_dir, pdf_engine, resource_paths, timeout):
+            return False
+        record_stage(manifest, latex_stage, tex_key, [built_pdf])
+        
+        # 완성된 PDF를 임시 파일로 복사한 뒤 교체
+        tmp_pdf = temp_path(pdf_file)
+        shutil.copyfile(built_pdf, tmp_pdf)
+        try:
+            check_stage_deadline()
+        except subprocess.TimeoutExpired:
+            os.remove(tmp_pdf)
+            raise
+        os.replace(tmp_pdf, pdf_file)
+        print(f"PDF 파일이 성공적으로 생성되었습니다: {pdf_file}")
+        record_stage(manifest, stage, stage_key, [latex_file, pdf_file])
+        return True
+        
+    except subprocess.TimeoutExpired as e:
+        print(f"PDF 변환 시간 초과: {e.timeout:g}초")
+        raise
     except Exception as e:
         print(f"PDF 변환 중 오류 발생: {e}")
         traceback.print_exc()
         return False
 
-def main():
-    print("논문 생성 프로세스 시작...")
+# 단계별 제한 시간 (초, None이면 제한 없음)
+STAGE_TIMEOUTS = {
+    'images': None,
+    'document': None,
+    'markdown': None,
+    'html': 300,
+    'site': 300,
+    'search': None,
+    'pdf': 900,
+    'stats': None,
+    'figures': None
+}
+
+# 빌드 계측 (단계와 외부 프로세스별 시간, 메모리, 입출력)
+BUILD_REPORT_VERSION = 1
+_instrument = {'threads': {}, 'hooked': False}  # 스레드 id -> 실행 중인 단계의 기록
+stage_metrics = {}
+process_log = []
+
+# 실행 중인 단계의 마감 시각과 취소 신호 (스레드별, run_stages가 설정)
+# 스레드는 강제로 멈출 수 없으므로 단계가 외부 프로세스 실행과 파일 교체 직전에 직접 확인한다.
+_stage_context = threading.local()
+
+def check_stage_deadline():
+    """현재 단계의 제한 시간이 지났거나 빌드가 취소되었으면 subprocess.TimeoutExpired를 던지는 함수"""
+    context = getattr(_stage_context, 'value', None)
+    if context is None:
+        return
+    name, deadline, limit, cancel_event = context
+    if cancel_event.is_set() or (deadline is not None and time.perf_counter() >= deadline):
+        raise subprocess.TimeoutExpired(f'{name} 단계', limit)
+
+def stage_time_left(timeout=None):
+    """timeout과 현재 단계의 남은 시간 중 짧은 쪽 (둘 다 없으면 None, 이미 지났으면 TimeoutExpired)"""
+    check_stage_deadline()
+    context = getattr(_stage_context, 'value', None)
+    if context is None or context[1] is None:
+        return timeout
+    left = context[1] - time.perf_counter()
+    return left if timeout is None else min(timeout, left)
+
+def bind_stage_context(func):
+    """단계 안에서 띄운 작업 스레드도 같은 마감 시각을 따르도록 func를 감싸는 함수"""
+    context = getattr(_stage_context, 'value', None)
+    
+    def wrapper(*args, **kwargs):
+        _stage_context.value = context
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _stage_context.value = None
+    return wrapper
+
+def _run_stage(name, func, results, deadline, limit, cancel_event):
+    """단계 스레드에 마감 시각과 취소 신호를 설정하고 단계 함수를 실행하는 함수"""
+    _stage_context.value = (name, deadline, limit, cancel_event)
+    try:
+        return func(results)
+    finally:
+        _stage_context.value = None
+
+def _audit_open(event, args):
+    """파일 열기 감사 이벤트를 해당 스레드에서 실행 중인 단계의 파일 목록에 기록하는 훅"""
+    if event == 'open':
+        record = _instrument['threads'].get(threading.get_ident())
+        if record is not None and isinstance(args[0], (str, bytes, os.PathLike)):
+            record['files'].add(os.fsdecode(args[0]))
+
+def _thread_io():
+    """현재 스레드가 지금까지 읽고 쓴 바이트 수 (리눅스 /proc의 rchar, wchar, 없으면 None)"""
+    try:
+        with open(f'/proc/self/task/{threading.get_native_id()}/io', 'rb') as f:
+            fields = dict(line.split(b':', 1) for line in f.read().splitlines())
+        return int(fields[b'rchar']), int(fields[b'wchar'])
+    except (OSError, KeyError, ValueError, AttributeError):
+        return None
+
+def _max_rss_mb(who=None):
+    """프로세스(또는 종료된 자식 프로세스 중 가장 큰 것)의 최대 RSS (MB)"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # 리눅스는 KB, macOS는 바이트 단위
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def measure_call(name, func, *args, profile_dir=None):
+    """func를 실행하면서 벽시계/CPU 시간, 메모리, 입출력 바이트, 연 파일 수를 stage_metrics[name]에 기록하는 함수
+
+    CPU 시간과 입출력은 단계를 실행한 스레드 기준이며, 단계 안에서 따로 띄운 스레드/프로세스는
+    포함하지 않는다 (process_cpu_seconds는 그 시간 동안의 프로세스 전체 CPU, 외부 프로세스는 run_process가 따로 기록). tracemalloc 최대값은 추적 중일 때만
+    기록하며, 동시에 실행된 단계의 할당이 함께 잡힌다. profile_dir를 주면 cProfile 결과를 <이름>.prof로 저장한다.
+    """
+    if not _instrument['hooked']:
+        sys.addaudithook(_audit_open)
+        _instrument['hooked'] = True
+    io_before = _thread_io()
+    record = {'files': set()}
+    ident = threading.get_ident()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    profiler = None
+    if profile_dir:
+        import cProfile
+        profiler = cProfile.Profile()
+    _instrument['threads'][ident] = record
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    process_cpu = time.process_time()
+    try:
+        if profiler is not None:
+            return profiler.runcall(func, *args)
+        return func(*args)
+    finally:
+        cpu = time.thread_time() - cpu
+        process_cpu = time.process_time() - process_cpu
+        wall = time.perf_counter() - wall
+        del _instrument['threads'][ident]
+        io_after = _thread_io()
+        stage_metrics[name] = {
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+            'process_cpu_seconds': round(process_cpu, 4),
+            'bytes_read': io_after[0] - io_before[0] if io_before and io_after else None,
+            'bytes_written': io_after[1] - io_before[1] if io_before and io_after else None,
+            'files_touched': len(record['files']),
+            'tracemalloc_peak_mb': round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+                                   if tracemalloc.is_tracing() else None,
+            'max_rss_mb': _max_rss_mb()
+        }
+        if profiler is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, f'{name}.prof'))
+
+def run_process(cmd, name=None, **kwargs):
+    """subprocess.run으로 외부 프로그램을 실행하고 벽시계 시간, 자식 CPU 시간, 최대 RSS를 process_log에 기록하는 함수
+
+    자식 CPU 시간은 실행 전후 RUSAGE_CHILDREN 차이이므로, 다른 단계의 외부 프로세스가 동시에 끝나면 함께 잡힌다.
+    """
+    before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+    started = time.perf_counter()
+    entry = {'name': name or os.path.basename(cmd[0]), 'returncode': None}
+    # 단계의 남은 시간을 넘기지 않도록 외부 프로세스 제한 시간을 줄임
+    kwargs['timeout'] = stage_time_left(kwargs.get('timeout'))
+    try:
+        result = subprocess.run(cmd, **kwargs)
+        entry['returncode'] = result.returncode
+        return result
+    finally:
+        entry['wall_seconds'] = round(time.perf_counter() - started, 4)
+        if resource:
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            entry['cpu_seconds'] = round(after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime, 4)
+            entry['max_rss_mb'] = _max_rss_mb(resource.RUSAGE_CHILDREN)
+        process_log.append(entry)
+
+def write_build_report(report, report_path, targets=()):
+    """run_stages 결과와 단계/외부 프로세스 계측값을 JSON 빌드 보고서로 저장하는 함수"""
+    data = {
+        'version': BUILD_REPORT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'targets': list(targets),
+        'seconds': report['seconds'],
+        'max_rss_mb': _max_rss_mb(),
+        'stages': report['stages'],
+        'processes': report.get('processes', []),
+        'pandoc_jobs': report.get('pandoc_jobs', [])
+    }
+    write_chunks([json.dumps(data, ensure_ascii=False, indent=2)], report_path)
+    return report_path
+
+def print_profile_summary(profile_dir, limit=15):
+    """단계별 cProfile 결과에서 누적 시간이 긴 main.py 함수를 출력하는 함수"""
+    import pstats
+    for path in sorted(glob.glob(os.path.join(profile_dir, '*.prof'))):
+        print(f"\n{os.path.basename(path)} (누적 시간 상위 {limit}개, main.py 함수):")
+        stats = pstats.Stats(path, stream=sys.stdout)
+        stats.sort_stats('cumulative').print_stats(re.escape(os.path.basename(__file__)), limit)
+
+# 빌드 단계 DAG 실행 함수
+def run_stages(stages, workers=None, cancel_event=None, profile_dir=None):
+    """선행 단계(deps)가 모두 끝난 단계부터 스레드 풀에서 동시에 실행하고 결과와 단계별 요약을 반환하는 함수
+
+    stages는 {이름: {'func': func(results), 'deps': [...], 'timeout': 초}} 형식이며,
+    단계 상태는 ok, failed, timeout, skipped(선행 단계 실패), cancelled 중 하나이다.
+    단계 함수가 False를 반환하거나 예외를 던지면 실패로 본다. 제한 시간은 단계가 check_stage_deadline,
+    run_process, write_chunks에서 스스로 확인해 멈추며, 시간을 넘긴 단계도 실제로 끝날 때까지 기다린 뒤 상태를 정한다.
+    단계별 계측값(measure_call)은 요약에, 그동안 실행된 외부 프로세스와 pandoc 작업은 보고서에 함께 담긴다.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    
+    for name, stage in stages.items():
+        for dep in stage.get('deps', []):
+            if dep not in stages:
+                raise ValueError(f"알 수 없는 선행 단계: {name} -> {dep}")
+    
+    cancel_event = cancel_event or threading.Event()
+    results = {}
+    summary = {}
+    first_process, first_pandoc_job = len(process_log), len(pandoc_jobs)
+    pending = dict(stages)
+    running = {}  # future -> (이름, 시작 시각, 마감 시각)
+    build_start = time.perf_counter()
+    
+    def finish(name, status, started=None, error=None):
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        summary[name] = {'status': status, 'seconds': round(elapsed, 3), 'error': error}
+        # 취소되어 아직 끝나지 않은 단계는 계측값이 없음
+        if started is not None and name in stage_metrics:
+            summary[name]['metrics'] = stage_metrics.pop(name)
+    
+    executor = ThreadPoolExecutor(max_workers=workers or max(1, len(stages)))
+    try:
+        while pending or running:
+            # 실행 가능한 단계 시작 (선행 단계가 실패했으면 건너뜀)
+            for name in list(pending):
+                deps = pending[name].get('deps', [])
+                if cancel_event.is_set():
+                    finish(name, 'cancelled')
+                elif any(dep in summary and summary[dep]['status'] != 'ok' for dep in deps):
+                    failed = [dep for dep in deps if dep in summary and summary[dep]['status'] != 'ok']
+                    finish(name, 'skipped', error=f"선행 단계 실패: {', '.join(failed)}")
+                elif all(dep in summary for dep in deps):
+                    timeout = pending[name].get('timeout')
+                    started = time.perf_counter()
+                    stage_metrics.pop(name, None)
+                    deadline = started + timeout if timeout else None
+                    future = executor.submit(measure_call, name, _run_stage, name, pending[name]['func'], results,
+                                             deadline, timeout, cancel_event, profile_dir=profile_dir)
+                    running[future] = (name, started, deadline)
+                else:
+                    continue
+                del pending[name]
+            
+            if not running:
+                # 더 이상 시작할 수 있는 단계가 없으면 순환 의존
+                for name in list(pending):
+                    finish(name, 'skipped', error="순환 의존")
+                    del pending[name]
+                break
+            
+            deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+            wait_for = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+            done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                name, started, _ = running.pop(future)
+                try:
+                    value = future.result()
+                except (subprocess.TimeoutExpired, TimeoutError) as e:
+                    finish(name, 'timeout', started, str(e))
+                except Exception as e:
+                    finish(name, 'failed', started, f"{type(e).__name__}: {e}")
+                else:
+                    if value is False:
+                        finish(name, 'failed', started)
+                    else:
+                        results[name] = value
+                        finish(name, 'ok', started)
+            
+            # 제한 시간을 넘긴 단계는 스스로 멈출 때까지 기다림 (다음 확인 지점에서 TimeoutExpired로 끝남)
+            now = time.perf_counter()
+            for future, (name, started, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    print(f"{name} 단계가 제한 시간 {deadline - started:g}초를 넘겨 멈추기를 기다립니다...")
+                    running[future] = (name, started, None)
+    except KeyboardInterrupt:
+        print("\n빌드가 취소되었습니다.")
+        cancel_event.set()
+        for future, (name, started, _) in running.items():
+            future.cancel()
+            finish(name, 'cancelled', started)
+        for name in pending:
+            finish(name, 'cancelled')
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return {
+        'results': results,
+        'stages': {name: summary[name] for name in stages if name in summary},
+        'seconds': round(time.perf_counter() - build_start, 3),
+        'processes': process_log[first_process:],
+        'pandoc_jobs': pandoc_jobs[first_pandoc_job:]
+    }
+
+# 단계 실행 요약 출력 함수
+def print_stage_summary(report):
+    print("\n단계별 실행 결과:")
+    for name, entry in report['stages'].items():
+        line = f"  {name:<10} {entry['status']:<10} {entry['seconds']:8.2f}s"
+        metrics = entry.get('metrics')
+        if metrics:
+            line += f"  CPU {metrics['cpu_seconds']:6.2f}s  파일 {metrics['files_touched']:4d}개"
+        if entry['error']:
+            line += f"  ({entry['error']})"
+        print(line)
+    processes = report.get('processes', [])
+    if processes:
+        print(f"  외부 프로세스 {len(processes)}개, 합계 {sum(p['wall_seconds'] for p in processes):.2f}s")
+    total_stage = sum(entry['seconds'] for entry in report['stages'].values())
+    print(f"  전체 소요 시간 {report['seconds']:.2f}s (단계 합계 {total_stage:.2f}s)")
+
+# 논문 빌드 단계 구성 함수
+def build_pipeline(manifest, targets=('html', 'pdf'), open_browser=True, draft=None, bucket='month'):
+    """이미지 준비, 문서 모델, 마크다운, HTML/사이트/PDF 변환, 검색 색인, 대기질 집계 중 targets와 그 선행 단계만 골라 단계 DAG로 구성하는 함수"""
+    images_dir = os.path.join(output_dir, 'images')
+    markdown_key = compute_key('markdown', paper_digests(manifest), data_digests(manifest), format_build_date(),
+                               images_dir, generator_digest(manifest))
+    
+    def stage_figures(results):
+        print("\n0. 분석 그림 재생성 중...")
+        return regenerate_figures(manifest)
+    
+    def stage_images(results):
+        print("\n1. 이미지 준비 중...")
+        return prepare_images(manifest)
     
-    # 이미지 준비
-    print("\n1. 이미지 준비 중...")
-    images_dir = prepare_images()
+    def stage_document(results):
+        # 원고, 빌드 날짜, 스크립트가 그대로면 섹션 수집과 마크다운 생성을 생략
+        if is_stage_fresh(manifest, 'markdown', markdown_key, [markdown_file]):
+            print("\n2-3. 원고 변경 없음: 섹션 수집과 마크다운 생성을 건너뜁니다.")
+            return None
+        print("\n2. 논문 섹션 수집 중...")
+        document = build_document(collect_sections(), images_dir)
+        record_chapter_outputs(manifest, document)
+        return document
     
-    # 섹션 내용 수집
-    print("\n2. 논문 섹션 수집 중...")
-    sections = collect_sections()
+    def stage_markdown(results):
+        document = results['document']
+        if document is None:
+            return markdown_file
+        print("\n3. 마크다운 파일 생성 중...")
+        md_file = generate_thesis_markdown(document)
+        record_stage(manifest, 'markdown', markdown_key, [md_file])
+        return md_file
     
-    # 마크다운 생성
-    print("\n3. 마크다운 파일 생성 중...")
-    md_file = generate_thesis_markdown(sections, images_dir)
+    def stage_html(results):
+        return convert_to_thesis_html(results['markdown'], html_file, manifest, results['document'], open_browser)
     
-    print("\n논문 마크다운 생성이 완료되었습니다!")
-    print(f"마크다운 파일: {md_file}")
+    def stage_site(results):
+        return convert_to_thesis_site(results['markdown'], site_dir, manifest, results['document'], open_browser)
     
-    # 변환 옵션 제공
-    print("\n다음 단계를 선택하세요:")
-    print("1. HTML로 변환 (석사논문 스타일)")
-    print("2. PDF로 변환 (xelatex 필요)")
-    print("3. HTML과 PDF 모두 생성")
-    print("4. 종료 (나중에 수동으로 변환)")
+    def stage_search(results):
+        # 원고가 그대로면 색인 생략, 바뀌었으면 내용이 바뀐 챕터만 다시 색인
+        search_key = compute_key('search', SEARCH_INDEX_VERSION, file_digest(markdown_file, manifest),
+                                 paper_digests(manifest), data_digests(manifest), generator_digest(manifest))
+        index_file = os.path.join(search_dir, 'index.js')
+        script_file = os.path.join(search_dir, 'search.js')
+        if is_stage_fresh(manifest, 'search', search_key, [index_file, script_file]):
+            print(f"\n검색 색인 입력 변경 없음: 색인을 건너뜁니다 ({index_file})")
+            return index_file
+        print("\n본문 검색 색인 생성 중...")
+        document = results['document'] or build_document(collect_sections(), images_dir)
+        index = build_search_index(document, manifest)
+        os.makedirs(search_dir, exist_ok=True)
+        size = write_search_index(index, index_file)
+        write_chunks([SEARCH_JS], script_file)
+        print(f"검색 색인이 저장되었습니다: {index_file} (구간 {len(index['sections'])}개, "
+              f"바이그램 {len(index['terms'])}개, {size / 1024:.0f}KB)")
+        record_stage(manifest, 'search', search_key, [index_file, script_file])
+        return index_file
+    
+    def stage_pdf(results):
+        # 초안 모드는 전체 PDF를 덮어쓰지 않도록 별도 파일에 저장
+        target_pdf = os.path.join(output_dir, 'thesis-draft.pdf') if draft else pdf_file
+        return convert_to_pdf(results['markdown'], target_pdf, manifest, STAGE_TIMEOUTS['pdf'],
+                              results['document'], draft)
+    
+    def stage_stats(results):
+        # 원본 CSV와 시간 구간이 그대로면 집계 생략
+        csv_path = os.path.join(results_dir, 'seoul_air_quality_data.csv')
+        stats_key = compute_key('stats', file_digest(csv_path, manifest), bucket, generator_digest(manifest))
+        if is_stage_fresh(manifest, 'stats', stats_key, [stats_file]):
+            print(f"\n대기질 데이터 변경 없음: 집계를 건너뜁니다 ({stats_file})")
+            return stats_file
+        print(f"\n대기질 데이터 집계 중 (측정소 x {bucket})...")
+        write_aggregate_csv(aggregate_air_quality(csv_path, bucket), stats_file)
+        print(f"집계 결과가 저장되었습니다: {stats_file}")
+        record_stage(manifest, 'stats', stats_key, [stats_file])
+        return stats_file
+    
+    # 이미지 준비와 섹션 수집은 서로 독립, HTML과 PDF는 마크다운과 이미지가 준비되면 동시에 실행
+    stages = {
+        'figures': {'func': stage_figures, 'deps': []},
+        # 그림 재생성을 함께 요청하면 새 그림이 놓인 뒤에 이미지를 준비
+        'images': {'func': stage_images, 'deps': ['figures'] if 'figures' in targets else []},
+        'document': {'func': stage_document, 'deps': []},
+        'markdown': {'func': stage_markdown, 'deps': ['document']},
+        'html': {'func': stage_html, 'deps': ['images', 'markdown']},
+        'site': {'func': stage_site, 'deps': ['images', 'markdown']},
+        'search': {'func': stage_search, 'deps': ['markdown']},
+        'pdf': {'func': stage_pdf, 'deps': ['images', 'markdown']},
+        'stats': {'func': stage_stats, 'deps': []},
+    }
+    for name, stage in stages.items():
+        stage['timeout'] = STAGE_TIMEOUTS.get(name)
+    
+    # 요청한 단계와 그 선행 단계만 실행
+    needed = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(stages[name]['deps'])
+    return {name: stage for name, stage in stages.items() if name in needed}
+
+# 명령행 대상별로 실행할 단계
+CLI_TARGETS = {
+    'md': ['images', 'markdown'],
+    'html': ['images', 'markdown', 'html', 'search'],
+    'site': ['images', 'markdown', 'site', 'search'],
+    'pdf': ['images', 'markdown', 'pdf'],
+    'all': ['images', 'markdown', 'html', 'search', 'pdf'],
+    'search': ['markdown', 'search'],
+    'stats': ['stats'],
+    'figures': ['figures']
+}
+
+# watch 모드 입력 스냅샷 함수
+def scan_inputs():
+    """원고 마크다운(하위 폴더 포함), 분석 그림(PNG), 연구 결과 CSV, 글꼴 파일의 경로별 (mtime_ns, 크기)를 반환하는 함수"""
+    snapshot = {}
+    for root, suffix, recursive in ((paper_dir, '.md', True), (plots_dir, '.png', False), (results_dir, '.csv', False),
+                                    (fonts_dir, tuple(FONT_FORMATS), False)):
+        stack = [root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(suffix):
+                        st = entry.stat()
+                        snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+# 단계별 입력 파일 목록 (어떤 파일이 어떤 출력에 쓰이는지)
+def stage_inputs(document=None):
+    """단계 이름별 입력 파일 집합을 반환하는 함수 (HTML/PDF는 본문에서 참조하는 그림만 포함, 문서가 없으면 모든 그림)"""
+    paper_files = set(glob.glob(os.path.join(paper_dir, '**', '*.md'), recursive=True))
+    plot_files = set(glob.glob(os.path.join(plots_dir, '*.png')))
+    data_files = set(glob.glob(os.path.join(results_dir, '*.csv')))
+    font_files = set(font_digests())
+    if document is None:
+        figures = plot_files
+    else:
+        referenced = {os.path.basename(asset['path']) for asset in document['assets']}
+        figures = {path for path in plot_files if os.path.basename(path) in referenced}
+    return {
+        'images': paper_files | plot_files,
+        'document': paper_files | data_files,
+        'markdown': paper_files | data_files,
+        'html': paper_files | data_files | font_files | figures,
+        'site': paper_files | data_files | font_files | figures,
+        'search': paper_files | data_files,
+        'pdf': paper_files | data_files | figures,
+        'stats': {os.path.join(results_dir, 'seoul_air_quality_data.csv')},
+        'figures': {path for spec in FIGURE_SPECS.values() for path in figure_inputs(spec)}
+    }
+
+# 원고 파일과 챕터 출력의 대응 (최상위 폴더 이름의 숫자가 챕터 번호, 0_overview는 표지/초록)
+def source_chapter(path):
+    """paper/ 아래 원고 파일이 속한 챕터 번호를 반환하는 함수 (본문 챕터가 아니면 None)"""
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(paper_dir))
+    prefix = rel.split(os.sep)[0].split('_')[0]
+    return prefix if prefix in {number for _, number, _, _ in DOCUMENT_CHAPTERS} else None
+
+def record_chapter_outputs(manifest, document):
+    """챕터 번호별 원고 파일과 출력 파일(챕터 LaTeX, 사이트 페이지)을 매니페스트에 기록하는 함수"""
+    if manifest is None:
+        return
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(paper_dir, '**', '*.md'), recursive=True)):
+        number = source_chapter(path)
+        if number is not None:
+            sources.setdefault(number, []).append(path)
+    manifest['chapters'] = {
+        chapter['number']: {
+            'sources': sources.get(chapter['number'], []),
+            'outputs': [os.path.join(output_dir, 'chapters', f"ch{chapter['number']}.tex"),
+                        os.path.join(site_dir, site_page_name(chapter))],
+        }
+        for chapter in document['chapters']
+    }
+
+def changed_chapters(changed, manifest):
+    """바뀐 파일이 모두 기록된 본문 챕터의 원고이면 그 챕터 번호 목록을, 아니면 None을 반환하는 함수
+
+    표지/초록, 연구 결과 CSV, 그림, 새로 생기거나 지워진 원고처럼 챕터 하나로 한정할 수 없는 변경은 None.
+    """
+    recorded = (manifest or {}).get('chapters', {})
+    owner = {path: number for number, entry in recorded.items() for path in entry['sources']}
+    numbers = set()
+    for path in changed:
+        if path not in owner or not os.path.exists(path):
+            return None
+        numbers.add(owner[path])
+    return sorted(numbers) or None
+
+def affected_stages(changed, inputs):
+    """바뀐 파일 경로 집합으로부터 다시 실행해야 하는 단계 집합을 구하는 함수"""
+    affected = {name for name, files in inputs.items() if changed & files}
+    for path in changed:
+        # 새로 생기거나 지워진 파일은 위치로 판단
+        if os.path.commonpath([os.path.abspath(path), os.path.abspath(paper_dir)]) == os.path.abspath(paper_dir):
+            affected |= {'images', 'document', 'markdown', 'html', 'site', 'search', 'pdf'}
+        elif os.path.dirname(os.path.abspath(path)) == os.path.abspath(plots_dir):
+            affected.add('images')
+        elif os.path.dirname(os.path.abspath(path)) == os.path.abspath(results_dir) and path.endswith('.csv'):
+            affected |= {'document', 'markdown', 'html', 'site', 'search', 'pdf'}
+        elif os.path.dirname(os.path.abspath(path)) == os.path.abspath(fonts_dir):
+            affected |= {'html', 'site'}
+    return affected
+
+# 파일 변경 감시 후 영향받는 출력만 다시 생성
+def watch(manifest, targets, interval=0.3, open_browser=False, draft=None, bucket='month', report_path=None):
+    """원고와 그림을 주기적으로 살펴 바뀐 파일이 입력인 단계만 다시 실행하는 함수 (Ctrl+C로 종료)"""
+    wanted = set(build_pipeline(manifest, targets))
+    report = run_stages(build_pipeline(manifest, targets, open_browser, draft, bucket))
+    save_manifest(manifest)
+    print_stage_summary(report)
+    if report_path:
+        write_build_report(report, report_path, targets)
+    inputs = stage_inputs(report['results'].get('document'))
+    snapshot = scan_inputs()
     
+    print(f"\n파일 변경 감시 중: {paper_dir}, {plots_dir} (Ctrl+C로 종료)")
     try:
-        choice = input("\n선택 (1-4): ")
-        
-        if choice == '1':
-            # HTML 변환
-            convert_to_thesis_html(md_file, html_file)
-        elif choice == '2':
-            # PDF 변환
-            print("\nPDF로 변환 중...")
-            convert_to_pdf(md_file, pdf_file)
-        elif choice == '3':
-            # 둘 다 변환
-            print("\nHTML 변환 중...")
-            convert_to_thesis_html(md_file, html_file)
-            print("\nPDF 변환 중...")
-            convert_to_pdf(md_file, pdf_file)
+        while True:
+            time.sleep(interval)
+            current = scan_inputs()
+            if current == snapshot:
+                continue
+            
+            # 편집기가 저장을 마칠 때까지 잠시 기다림
+            while True:
+                time.sleep(0.05)
+                settled = scan_inputs()
+                if settled == current:
+                    break
+                current = settled
+            
+            changed = {path for path in current.keys() | snapshot.keys() if current.get(path) != snapshot.get(path)}
+            snapshot = current
+            affected = affected_stages(changed, inputs) & wanted
+            print(f"\n변경 감지: {', '.join(sorted(changed))}")
+            if not affected:
+                print("대상 출력에 영향을 주지 않는 변경입니다.")
+                continue
+            
+            # 본문 챕터만 바뀌었으면 PDF는 \includeonly 초안으로 그 챕터만 다시 조판 (결과는 thesis-draft.pdf)
+            pdf_draft = draft
+            if pdf_draft is None and 'pdf' in affected:
+                pdf_draft = changed_chapters(changed, manifest)
+                if pdf_draft:
+                    print(f"바뀐 챕터만 PDF 초안으로 조판합니다: {', '.join(pdf_draft)}장")
+            
+            report = run_stages(build_pipeline(manifest, sorted(affected), open_browser, pdf_draft, bucket))
+            save_manifest(manifest)
+            print_stage_summary(report)
+            if report_path:
+                write_build_report(report, report_path, sorted(affected))
+            if report['results'].get('document') is not None:
+                inputs = stage_inputs(report['results']['document'])
+    except KeyboardInterrupt:
+        print("\n파일 감시를 종료합니다.")
+
+# 여러 프로젝트 일괄 빌드 (프로젝트마다 별도 프로세스와 출력 디렉토리, 내용 주소 캐시는 공유)
+# 프로젝트 루트는 paper/, research_results/, fonts/를 담은 디렉토리이며, YAML 파일로 변형(대상, 출력, 초안 챕터)을 지정할 수 있다.
+#   - root: theses/kim
+#     target: html
+#   - {root: theses/kim, target: pdf, draft: "4", output: output-draft}
+BATCH_CACHE_DIR = '.thesis_cache'
+BATCH_SPEC_KEYS = {'root', 'target', 'output', 'draft', 'name', 'figures'}
+
+def load_batch_specs(entries, target='html'):
+    """프로젝트 루트 또는 YAML 파일 목록을 빌드 명세 목록 [{'name', 'root', 'target', 'output', 'draft', 'figures'}]으로 바꾸는 함수"""
+    specs = []
+    for entry in entries:
+        if entry.endswith(('.yaml', '.yml')):
+            with open(entry, 'r', encoding='utf-8') as f:
+                items = yaml.safe_load(f) or []
+            if not isinstance(items, list):
+                raise ValueError(f"{entry}: 프로젝트 목록(YAML 리스트)이 아닙니다")
+            base = os.path.dirname(entry)
         else:
+            items, base = [entry], ''
+        
+        for item in items:
+            if isinstance(item, str):
+                item = {'root': item}
+            if not isinstance(item, dict) or not item.get('root'):
+                raise ValueError(f"root가 지정되지 않은 항목: {item}")
+            unknown = set(item) - BATCH_SPEC_KEYS
+            if unknown:
+                raise ValueError(f"알 수 없는 키: {', '.join(sorted(unknown))}")
+            item_target = str(item.get('target', target))
+            if item_target not in CLI_TARGETS:
+                raise ValueError(f"알 수 없는 대상: {item_target} (사용 가능: {', '.join(CLI_TARGETS)})")
+            root = os.path.join(base, str(item['root']))
+            draft = item.get('draft')
+            specs.append({
+                'name': str(item.get('name') or f"{os.path.basename(os.path.normpath(root))}:{item_target}"),
+                'root': root,
+                'target': item_target,
+                'output': os.path.join(root, str(item.get('output', 'output'))),
+                'draft': ','.join(map(str, draft)) if isinstance(draft, list) else (str(draft) if draft else None),
+                'figures': bool(item.get('figures')),
+            })
+    
+    # 출력 디렉토리를 함께 쓰면 매니페스트와 결과가 섞이므로 허용하지 않음
+    outputs = {}
+    for spec in specs:
+        output = os.path.abspath(spec['output'])
+        if output in outputs:
+            raise ValueError(f"출력 디렉토리가 겹칩니다: {spec['output']} ({outputs[output]}, {spec['name']}) - output을 따로 지정하세요")
+        outputs[output] = spec['name']
+    return specs
+
+def build_project(spec, cache, bucket='month', figures=False):
+    """일괄 빌드 작업 단위: 프로젝트 하나를 자기 출력 디렉토리에 빌드하고 출력은 <출력>/build.log에 남기는 함수"""
+    root = spec['root']
+    argv = [spec['target'], '--paper-dir', os.path.join(root, 'paper'),
+            '--results-dir', os.path.join(root, 'research_results'), '--output-dir', spec['output'],
+            '--fonts-dir', os.path.join(root, 'fonts'), '--cache-dir', cache, '--bucket', bucket, '--no-browser']
+    if spec['draft']:
+        argv += ['--draft', spec['draft']]
+    if figures or spec['figures']:
+        argv.append('--figures')
+    
+    os.makedirs(spec['output'], exist_ok=True)
+    log_path = os.path.join(spec['output'], 'build.log')
+    started = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            code = main(argv)
+        except SystemExit as e:
+            code = e.code
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # 풀 작업 프로세스는 atexit을 거치지 않고 끝날 수 있으므로 여기서 pandoc 서버 정리
+            stop_pandoc_server()
+    return dict(spec, status='ok' if code == 0 else 'failed', seconds=time.perf_counter() - started, log=log_path)
+
+def run_batch(entries, target='html', jobs=None, cache=None, bucket='month', figures=False):
+    """여러 프로젝트를 프로세스 풀에서 빌드하고 결과 표를 출력하는 함수 (모두 성공하면 0)"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    try:
+        specs = load_batch_specs(entries, target)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"일괄 빌드 설정 오류: {e}")
+        return 2
+    if not specs:
+        print("빌드할 프로젝트가 없습니다.")
+        return 0
+    
+    cache = os.path.abspath(cache or BATCH_CACHE_DIR)
+    os.makedirs(cache, exist_ok=True)
+    workers = min(jobs or os.cpu_count() or 1, len(specs))
+    print(f"일괄 빌드: 프로젝트 {len(specs)}개, 프로세스 {workers}개, 공유 캐시 {cache}")
+    
+    started = time.perf_counter()
+    results = []
+    
+    def report(result):
+        results.append(result)
+        print(f"  [{len(results)}/{len(specs)}] {result['name']:<30} {result['status']:<7} {result['seconds']:6.2f}s  {result['log']}")
+    
+    if workers <= 1:
+        for spec in specs:
+            report(build_project(spec, cache, bucket, figures))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(build_project, spec, cache, bucket, figures): spec for spec in specs}
+            for future in as_completed(futures):
+                try:
+                    report(future.result())
+                except Exception as e:
+                    spec = futures[future]
+                    print(f"빌드 프로세스 오류 {spec['name']}: {e}")
+                    report(dict(spec, status='failed', seconds=0.0, log=os.path.join(spec['output'], 'build.log')))
+    
+    failed = [result['name'] for result in results if result['status'] != 'ok']
+    total = sum(result['seconds'] for result in results)
+    elapsed = time.perf_counter() - started
+    print(f"\n일괄 빌드 완료: 성공 {len(results) - len(failed)}개, 실패 {len(failed)}개, "
+          f"전체 {elapsed:.2f}s (프로젝트 합계 {total:.2f}s)")
+    if failed:
+        print(f"실패한 프로젝트: {', '.join(failed)} (각 출력 디렉토리의 build.log 참고)")
+    return 1 if failed else 0
+
+# 명령행 인자 처리
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="paper/ 원고로부터 학위 논문 마크다운, HTML, PDF를 생성합니다.")
+    parser.add_argument('target', nargs='?', choices=list(CLI_TARGETS),
+                        help="생성할 출력 (생략하면 대화형 메뉴, --watch만 주면 html)")
+    parser.add_argument('query', nargs='*', help="search 대상에서 찾을 검색어 (예: main.py search 시계열 예측)")
+    parser.add_argument('--paper-dir', help="원고 디렉토리 (기본: paper)")
+    parser.add_argument('--results-dir', help="연구 결과 디렉토리 (기본: research_results)")
+    parser.add_argument('--output-dir', help="출력 디렉토리 (기본: output)")
+    parser.add_argument('--fonts-dir', help="HTML에 넣을 글꼴 파일 디렉토리 (기본: fonts)")
+    parser.add_argument('--cache-dir', help=f"그림 변형, 표, 글꼴, 색인 등 내용 주소 캐시 디렉토리 "
+                                            f"(기본: <출력>/.cache, --batch에서는 {BATCH_CACHE_DIR})")
+    parser.add_argument('--batch', nargs='+', metavar='ROOT',
+                        help="여러 프로젝트 루트(또는 프로젝트 목록 YAML)를 프로세스 풀에서 일괄 빌드 (target은 기본 대상)")
+    parser.add_argument('--jobs', type=int, help="--batch의 동시 빌드 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--limit', type=int, default=10, help="search 결과 최대 개수")
+    parser.add_argument('--watch', action='store_true', help="원고/그림 변경을 감시하여 영향받는 출력만 다시 생성")
+    parser.add_argument('--interval', type=float, default=0.3, help="watch 모드의 확인 간격(초)")
+    parser.add_argument('--no-browser', action='store_true', help="HTML 생성 후 브라우저를 열지 않음")
+    parser.add_argument('--draft', metavar='CHAPTERS',
+                        help="PDF에서 지정한 챕터만 다시 조판 (예: 4 또는 3,4, 결과는 thesis-draft.pdf)")
+    parser.add_argument('--figures', action='store_true',
+                        help="빌드 전에 데이터에서 분석 그림을 다시 그림 (matplotlib 필요, 입력이 바뀐 그림만)")
+    parser.add_argument('--report', metavar='PATH',
+                        help="단계별 계측 결과를 저장할 JSON 빌드 보고서 (기본: output/build_report.json)")
+    parser.add_argument('--no-report', action='store_true', help="빌드 보고서를 저장하지 않음")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="tracemalloc으로 단계별 최대 메모리를 기록 (빌드가 느려짐)")
+    parser.add_argument('--profile', action='store_true',
+                        help="단계를 하나씩 실행하며 cProfile 결과를 output/profile/<단계>.prof로 저장")
+    parser.add_argument('--bucket', choices=list(AGGREGATE_BUCKETS), default='month',
+                        help="stats 대상의 시간 구간 (기본: month, none이면 측정소별 전체)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.batch:
+        return run_batch(args.batch, args.target or 'html', args.jobs, args.cache_dir, args.bucket, args.figures)
+    configure_paths(args.paper_dir, args.results_dir, args.output_dir, args.fonts_dir, args.cache_dir)
+    print("논문 생성 프로세스 시작...")
+    
+    # 이전 빌드 매니페스트 로드
+    manifest = load_manifest()
+    open_browser = not (args.no_browser or args.watch)
+    draft = [number.strip() for number in args.draft.split(',') if number.strip()] if args.draft else None
+    report_path = None if args.no_report else args.report or report_file
+    profile_dir = os.path.join(output_dir, 'profile') if args.profile else None
+    if args.trace_memory:
+        tracemalloc.start()
+    
+    if args.watch:
+        targets = CLI_TARGETS[args.target or 'html']
+        watch(manifest, ['figures'] + targets if args.figures else targets, args.interval, open_browser, draft,
+              args.bucket, report_path)
+        return 0
+    
+    if args.target:
+        targets = CLI_TARGETS[args.target]
+    else:
+        # 대상을 주지 않으면 변환 옵션을 먼저 받아 전체 단계를 한 번에 실행
+        print("\n마크다운 생성 후 진행할 단계를 선택하세요:")
+        print("1. HTML로 변환 (석사논문 스타일)")
+        print("2. PDF로 변환 (xelatex 필요)")
+        print("3. HTML과 PDF 모두 생성 (동시에 실행)")
+        print("4. 종료 (나중에 수동으로 변환)")
+        
+        try:
+            choice = input("\n선택 (1-4): ")
+        except Exception as e:
+            print(f"\n오류 발생: {e}")
+            # 기본 선택지로 HTML 변환 시도
+            print("\nHTML 변환을 시도합니다...")
+            choice = '1'
+        
+        targets = CLI_TARGETS[{'1': 'html', '2': 'pdf', '3': 'all'}.get(choice.strip(), 'md')]
+        if targets == CLI_TARGETS['md']:
             print("\n변환을 건너뛰었습니다. 나중에 수동으로 변환할 수 있습니다.")
-    except Exception as e:
-        print(f"\n오류 발생: {e}")
-        # 기본 선택지로 HTML 변환 시도
-        print("\nHTML 변환을 시도합니다...")
-        convert_to_thesis_html(md_file, html_file)
+    
+    if args.figures and 'figures' not in targets:
+        targets = ['figures'] + targets
+    
+    try:
+        # 프로파일링할 때는 단계별 결과가 섞이지 않도록 한 번에 한 단계씩 실행
+        report = run_stages(build_pipeline(manifest, targets, open_browser, draft, args.bucket),
+                            workers=1 if profile_dir else None, profile_dir=profile_dir)
+    finally:
+        save_manifest(manifest)
+    print_stage_summary(report)
+    if profile_dir:
+        print_profile_summary(profile_dir)
+    if report_path:
+        write_build_report(report, report_path, targets)
+        print(f"빌드 보고서: {report_path}")
     
     print("\n프로세스 완료!")
-    print(f"마크다운 파일: {md_file}")
-    print(f"HTML 파일: {html_file}")
-    print(f"PDF 파일: {pdf_file} (생성에 성공했다면)")
+    if 'markdown' in targets:
+        print(f"마크다운 파일: {markdown_file}")
+    if 'html' in targets:
+        print(f"HTML 파일: {html_file}")
+    if 'site' in targets:
+        print(f"HTML 사이트: {os.path.join(site_dir, 'index.html')}")
+    if 'search' in targets:
+        print(f"검색 색인: {os.path.join(search_dir, 'index.js')}")
+    if 'pdf' in targets:
+        print(f"PDF 파일: {os.path.join(output_dir, 'thesis-draft.pdf') if draft else pdf_file} (생성에 성공했다면)")
+    if 'stats' in targets:
+        print(f"대기질 집계 파일: {stats_file}")
+    
+    # search 명령: 방금 갱신한 색인으로 검색어 조회
+    if args.target == 'search' and args.query:
+        query = ' '.join(args.query)
+        started = time.perf_counter()
+        results = search_index(load_search_index(os.path.join(search_dir, 'index.js')), query, args.limit)
+        print()
+        print_search_results(results, query)
+        print(f"검색 시간: {(time.perf_counter() - started) * 1000:.1f}ms")
+    return 0 if all(entry['status'] == 'ok' for entry in report['stages'].values()) else 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import csv
+import math
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+def accumulate_all(values):
+    acc = main.new_accumulator()
+    for value in values:
+        main.accumulate(acc, value)
+    return acc
+
+
+class AccumulatorTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.lognormvariate(3, 1) for _ in range(2000)]
+        self.values += [0.0, -4.5, -0.25, None, math.nan]
+        rng.shuffle(self.values)
+
+    def test_merge_equals_single_pass(self):
+        whole = accumulate_all(self.values)
+        for cuts in ([1000], [1, 2, 3], [500, 501, 1900], [len(self.values)]):
+            merged = main.new_accumulator()
+            bounds = [0] + cuts + [len(self.values)]
+            for start, end in zip(bounds, bounds[1:]):
+                main.merge_accumulators(merged, accumulate_all(self.values[start:end]))
+            for key in ('count', 'missing', 'zeros', 'min', 'max', 'positive', 'negative'):
+                self.assertEqual(merged[key], whole[key], key)
+            self.assertAlmostEqual(merged['mean'], whole['mean'], places=9)
+            self.assertAlmostEqual(merged['m2'] / whole['m2'], 1.0, places=9)
+
+    def test_merge_with_empty(self):
+        whole = accumulate_all(self.values)
+        merged = main.merge_accumulators(main.new_accumulator(), accumulate_all(self.values))
+        main.merge_accumulators(merged, main.new_accumulator())
+        self.assertEqual(merged['count'], whole['count'])
+        self.assertEqual(merged['mean'], whole['mean'])
+        self.assertEqual(merged['m2'], whole['m2'])
+
+    def test_missing_values(self):
+        acc = accumulate_all([None, math.nan, 1.0])
+        self.assertEqual((acc['count'], acc['missing']), (1, 2))
+
+    def test_quantile_relative_error(self):
+        acc = accumulate_all(self.values)
+        present = sorted(v for v in self.values if v is not None and v == v)
+        for q in (0.0, 0.01, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0):
+            exact = present[int(q * (len(present) - 1))]
+            estimate = main.accumulator_quantile(acc, q)
+            self.assertLessEqual(abs(estimate - exact), main.SKETCH_RELATIVE_ACCURACY * abs(exact) + 1e-12,
+                                 f"q={q}: {estimate} vs {exact}")
+
+    def test_quantile_of_empty_is_nan(self):
+        self.assertTrue(math.isnan(main.accumulator_quantile(main.new_accumulator(), 0.5)))
+
+
+class AggregateCsvTest(unittest.TestCase):
+    def test_chunked_aggregation_matches_single_chunk(self):
+        rng = random.Random(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'air.csv')
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['MSRDT', 'MSRSTE_NM'] + main.AIR_QUALITY_POLLUTANTS)
+                for hour in range(24 * 62):
+                    stamp = (datetime(2024, 1, 1) + timedelta(hours=hour)).strftime('%Y-%m-%d %H:%M:%S')
+                    for station in ('강남구', '종로구'):
+                        writer.writerow([stamp, station] + [round(rng.uniform(0, 80), 1) if rng.random() > 0.05
+                                                            else '' for _ in main.AIR_QUALITY_POLLUTANTS])
+            single = main.aggregate_air_quality(path, chunk_bytes=1 << 30, workers=1)
+            chunked = main.aggregate_air_quality(path, chunk_bytes=4096, workers=1)
+        self.assertEqual(set(single['groups']), set(chunked['groups']))
+        for key, accs in single['groups'].items():
+            for acc, other in zip(accs, chunked['groups'][key]):
+                self.assertEqual(main.summarize_accumulator(acc).keys(), main.summarize_accumulator(other).keys())
+                for field, value in main.summarize_accumulator(acc).items():
+                    self.assertAlmostEqual(value, main.summarize_accumulator(other)[field], places=6, msg=field)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+class LoadBatchSpecsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def spec_file(self, text):
+        path = os.path.join(self.dir, 'projects.yaml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_plain_roots_use_default_target(self):
+        specs = main.load_batch_specs(['theses/kim', 'theses/lee/'], target='pdf')
+        self.assertEqual(specs[0], {'name': 'kim:pdf', 'root': 'theses/kim', 'target': 'pdf',
+                                    'output': os.path.join('theses/kim', 'output'), 'draft': None, 'figures': False})
+        self.assertEqual(specs[1]['name'], 'lee:pdf')
+
+    def test_yaml_roots_are_relative_to_file(self):
+        path = self.spec_file('- theses/kim\n'
+                              '- {root: theses/kim, target: pdf, draft: [3, 4], output: output-draft, figures: true}\n'
+                              '- {root: theses/lee, draft: 4, name: lee-html}\n')
+        kim, draft, lee = main.load_batch_specs([path])
+        self.assertEqual(kim['root'], os.path.join(self.dir, 'theses/kim'))
+        self.assertEqual(kim['target'], 'html')
+        self.assertEqual(draft['output'], os.path.join(self.dir, 'theses/kim', 'output-draft'))
+        self.assertEqual(draft['draft'], '3,4')
+        self.assertTrue(draft['figures'])
+        self.assertEqual(lee['name'], 'lee-html')
+        self.assertEqual(lee['draft'], '4')
+
+    def test_invalid_entries(self):
+        cases = [
+            ('root: theses/kim\n', '프로젝트 목록'),
+            ('- {target: pdf}\n', 'root가 지정되지 않은 항목'),
+            ('- {root: theses/kim, colour: red}\n', '알 수 없는 키: colour'),
+            ('- {root: theses/kim, target: docx}\n', '알 수 없는 대상: docx'),
+            ('- theses/kim\n- {root: theses/kim, target: pdf}\n', '출력 디렉토리가 겹칩니다'),
+        ]
+        for text, message in cases:
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, message):
+                    main.load_batch_specs([self.spec_file(text)])
+
+    def test_empty_yaml(self):
+        self.assertEqual(main.load_batch_specs([self.spec_file('')]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+HEADER = 'MSRDT,MSRSTE_NM,NO2,O3,CO,SO2,PM10,PM25\n'
+ROWS = [
+    '2024-01-01 00:00:00,강남구,0.021,0.013,0.5,0.003,41,22\n',
+    '2024-01-01 00:00:00,종로구,0.030,,0.6,0.004,35,18\n',
+    '2024-01-01 01:00:00,강남구,0.019,0.015,0.4,0.003,39,\n',
+]
+
+
+class ColumnCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(main, 'data_cache_dir', os.path.join(tmp.name, 'cache'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+        self.csv_path = os.path.join(tmp.name, 'air.csv')
+        self.cache_path = os.path.join(tmp.name, 'cache', 'air.col')
+        self.write(ROWS)
+
+    def write(self, rows):
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(HEADER + ''.join(rows))
+
+    def test_round_trip(self):
+        data = main.load_air_quality(self.csv_path)
+        self.assertEqual(list(data['timestamps']), [1704067200, 1704067200, 1704070800])
+        self.assertEqual([data['stations'][code] for code in data['station_codes']], ['강남구', '종로구', '강남구'])
+        self.assertEqual(list(data['columns']['PM10']), [41.0, 35.0, 39.0])
+        self.assertTrue(math.isnan(data['columns']['O3'][1]))
+        self.assertTrue(math.isnan(data['columns']['PM25'][2]))
+        self.assertAlmostEqual(data['columns']['NO2'][0], 0.021, places=6)
+
+    def test_reuses_cache_until_csv_changes(self):
+        main.load_air_quality(self.csv_path)
+        with mock.patch.object(main, 'build_column_cache', wraps=main.build_column_cache) as build:
+            main.load_air_quality(self.csv_path)
+            build.assert_not_called()
+            self.write(ROWS + ['2024-01-01 02:00:00,종로구,0.02,0.01,0.3,0.002,30,12\n'])
+            data = main.load_air_quality(self.csv_path)
+            build.assert_called_once()
+        self.assertEqual(len(data['timestamps']), 4)
+
+    def test_touched_csv_refreshes_stat_without_rebuild(self):
+        main.load_air_quality(self.csv_path)
+        st = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        with mock.patch.object(main, 'build_column_cache', wraps=main.build_column_cache) as build:
+            main.load_air_quality(self.csv_path)
+            build.assert_not_called()
+        meta, mapped = main._read_column_cache(self.cache_path)
+        mapped.close()
+        self.assertEqual(meta['source']['mtime_ns'], st.st_mtime_ns + 10 ** 9)
+        # 기록이 갱신되었으므로 다음 읽기는 원본을 다시 해시하지 않음
+        with mock.patch.object(main, 'file_digest', side_effect=AssertionError('rehashed')):
+            self.assertEqual(len(main.load_air_quality(self.csv_path)['timestamps']), 3)
+
+    def test_corrupt_cache_is_rebuilt(self):
+        main.load_air_quality(self.csv_path)
+        with open(self.cache_path, 'wb') as f:
+            f.write(b'not a column cache')
+        self.assertIsNone(main._read_column_cache(self.cache_path))
+        self.assertEqual(len(main.load_air_quality(self.csv_path)['timestamps']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
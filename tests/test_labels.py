@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+def chapter(number, content):
+    return {'number': number, 'title': f'{number}장', 'content': content}
+
+
+class LabelIndexTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for patcher in (mock.patch.object(main, 'label_cache_dir', tmp.name),
+                        mock.patch.dict(main._label_memo, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # 정의되지 않은 참조 경고는 검사 대상이 아님
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+        self.chapters = [
+            chapter('1', '도입 @fig:trend 참고.\n\n![추세](images/a.png){#fig:trend}\n\n'
+                         '| a |\n|---|\n| 1 |\n\n: 요약 {#tbl:summary}\n'),
+            chapter('2', '## 절\n\n![](images/plain.png)\n\n![첫 그림](images/b.png)\n\n![둘째 그림](images/c.png){#fig:second}\n\n'
+                         '@fig:second, [@tbl:summary], `@fig:trend` 그리고 @fig:missing.\n'),
+        ]
+
+    def test_numbers_restart_per_chapter(self):
+        index = main.build_label_index(self.chapters)
+        self.assertEqual([entry['number'] for entry in index['figures']], ['1-1', '2-1', '2-2'])
+        self.assertEqual([entry['number'] for entry in index['tables']], ['1-1'])
+        self.assertEqual(index['labels']['fig:second']['anchor'], 'fig:second')
+        self.assertEqual(index['figures'][1]['anchor'], 'fig-2-1')
+        self.assertEqual(sorted(index['labels']), ['fig:second', 'fig:trend', 'tbl:summary'])
+
+    def test_resolve_references(self):
+        labels = main.build_label_index(self.chapters)['labels']
+        text = self.chapters[1]['content'].split('\n\n')[-1]
+        self.assertEqual(main.resolve_references(text, labels),
+                         '[그림 2-2](#fig:second), [표 1-1](#tbl:summary), `@fig:trend` 그리고 @fig:missing.\n')
+        self.assertEqual(main.resolve_references(text, labels, link=False),
+                         '그림 2-2, 표 1-1, `@fig:trend` 그리고 @fig:missing.\n')
+
+    def test_latex_references_use_ref(self):
+        labels = main.build_label_index(self.chapters)['labels']
+        self.assertEqual(main.resolve_references('[@fig:second]와 [@tbl:summary]', labels, latex=True),
+                         '그림\u00a0\\ref{fig:second}와 표\u00a0\\ref{tbl:summary}')
+
+    def test_chapter_markdown_moves_table_label_into_caption(self):
+        labels = main.build_label_index(self.chapters)['labels']
+        chapter = dict(self.chapters[0], numbered=True)
+        markdown = main.chapter_markdown(chapter, labels)
+        self.assertIn(': 요약 \\label{tbl:summary}\n', markdown)
+        self.assertIn('그림\u00a0\\ref{fig:trend}', markdown)
+        self.assertIn('{#fig:trend}', markdown)
+
+    def test_email_is_not_a_reference(self):
+        labels = main.build_label_index(self.chapters)['labels']
+        self.assertEqual(main.resolve_references('mail@fig:trend', labels), 'mail@fig:trend')
+
+    def test_scan_is_cached(self):
+        first = main.build_label_index(self.chapters)
+        main._label_memo.clear()
+        self.assertEqual(main.build_label_index(self.chapters), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
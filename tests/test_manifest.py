@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+class StageFreshnessTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output = os.path.join(tmp.name, 'thesis.html')
+        self.extra = os.path.join(tmp.name, 'thesis.css')
+        for path in (self.output, self.extra):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('x')
+        self.manifest = {'stages': {}}
+        self.key = main.compute_key('html', {'a.md': '1'})
+
+    def test_fresh_after_record(self):
+        self.assertFalse(main.is_stage_fresh(self.manifest, 'html', self.key, [self.output]))
+        main.record_stage(self.manifest, 'html', self.key, [self.output])
+        self.assertTrue(main.is_stage_fresh(self.manifest, 'html', self.key, [self.output]))
+        self.assertEqual(main.recorded_stage_key(self.manifest, 'html'), self.key)
+
+    def test_key_mismatch(self):
+        main.record_stage(self.manifest, 'html', self.key, [self.output])
+        other = main.compute_key('html', {'a.md': '2'})
+        self.assertNotEqual(other, self.key)
+        self.assertFalse(main.is_stage_fresh(self.manifest, 'html', other, [self.output]))
+
+    def test_missing_output(self):
+        main.record_stage(self.manifest, 'html', self.key, [self.output])
+        os.remove(self.output)
+        self.assertFalse(main.is_stage_fresh(self.manifest, 'html', self.key, [self.output]))
+
+    def test_missing_recorded_output(self):
+        main.record_stage(self.manifest, 'html', self.key, [self.output, self.extra])
+        os.remove(self.extra)
+        self.assertFalse(main.is_stage_fresh(self.manifest, 'html', self.key, [self.output]))
+
+    def test_without_manifest(self):
+        main.record_stage(None, 'html', self.key, [self.output])
+        self.assertFalse(main.is_stage_fresh(None, 'html', self.key, [self.output]))
+        self.assertIsNone(main.recorded_stage_key(None, 'html'))
+
+    def test_key_is_order_independent_for_dicts(self):
+        self.assertEqual(main.compute_key('x', {'a': 1, 'b': 2}), main.compute_key('x', {'b': 2, 'a': 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+class RenderInlineTest(unittest.TestCase):
+    def assertInline(self, text, expected):
+        self.assertEqual(main.render_inline(text), expected)
+
+    def test_emphasis(self):
+        self.assertInline('**bold** and *em*', '<strong>bold</strong> and <em>em</em>')
+        self.assertInline('***both***', '<em><strong>both</strong></em>')
+        self.assertInline('*a **b** c*', '<em>a <strong>b</strong> c</em>')
+        self.assertInline('_x_ and __y__', '<em>x</em> and <strong>y</strong>')
+
+    def test_unmatched_or_spaced_delimiters_stay_literal(self):
+        self.assertInline('*unclosed', '*unclosed')
+        self.assertInline('a * b * c', 'a * b * c')
+        self.assertInline('**open *one*', '**open <em>one</em>')
+
+    def test_intraword_underscore(self):
+        self.assertInline('snake_case_name', 'snake_case_name')
+        self.assertInline('file_name.png과 _강조_', 'file_name.png과 <em>강조</em>')
+
+    def test_code_and_math_are_not_emphasised(self):
+        self.assertInline('`*code*`', '<code>*code*</code>')
+        self.assertInline('`a < b`', '<code>a &lt; b</code>')
+        self.assertInline('$a_b$ _x_', '$a_b$ <em>x</em>')
+
+    def test_links(self):
+        self.assertInline('[link](http://x.com/a_b)', '<a href="http://x.com/a_b">link</a>')
+        self.assertInline('[**bold link**](u)', '<a href="u"><strong>bold link</strong></a>')
+        self.assertInline('[no close](', '[no close](')
+        self.assertInline('[just brackets]', '[just brackets]')
+        self.assertInline('*[a](u)*', '<em><a href="u">a</a></em>')
+
+    def test_image(self):
+        self.assertInline('![alt](images/x.png)', '<img src="images/x.png" alt="alt">')
+
+
+class ParseBlocksTest(unittest.TestCase):
+    def test_block_kinds(self):
+        blocks = main.parse_blocks('# T\n\npara **x**\n\n```py\ncode\n```\n\n- a\n- b\n')
+        self.assertEqual([block[0] for block in blocks], ['heading', 'para', 'code', 'list'])
+        self.assertEqual(blocks[2], ('code', 'py', 'code\n'))
+        self.assertEqual([item['text'] for item in blocks[3][1]['items']], ['a', 'b'])
+
+    def test_fenced_code_keeps_markdown(self):
+        blocks = main.parse_blocks('```\n# not a heading\n![x](y.png)\n```')
+        self.assertEqual(blocks, [('code', '', '# not a heading\n![x](y.png)\n')])
+
+    def test_figure_and_table_labels(self):
+        blocks = main.parse_blocks('| a | b |\n|---|---|\n| 1 | 2 |\n\n: 표 캡션 {#tbl:t}\n\n'
+                                   '![cap](images/a.png){#fig:a}\n')
+        self.assertEqual(blocks[0], ('table', '| a | b |\n|---|---|\n| 1 | 2 |', '표 캡션 {#tbl:t}'))
+        self.assertEqual(blocks[1], ('figure', 'cap', 'images/a.png', 'fig:a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+class RunStagesTest(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+
+    def statuses(self, report):
+        return {name: entry['status'] for name, entry in report['stages'].items()}
+
+    def test_runs_in_dependency_order(self):
+        order = []
+        lock = threading.Lock()
+
+        def stage(name, value):
+            def func(results):
+                with lock:
+                    order.append(name)
+                return value(results)
+            return func
+
+        report = main.run_stages({
+            'markdown': {'func': stage('markdown', lambda r: r['document'] + '.md'), 'deps': ['document']},
+            'document': {'func': stage('document', lambda r: 'thesis'), 'deps': []},
+            'html': {'func': stage('html', lambda r: r['markdown'] + '.html'), 'deps': ['markdown']},
+        })
+        self.assertEqual(order, ['document', 'markdown', 'html'])
+        self.assertEqual(report['results']['html'], 'thesis.md.html')
+        self.assertEqual(set(self.statuses(report).values()), {'ok'})
+
+    def test_failed_dependency_skips_dependents(self):
+        def broken(results):
+            raise RuntimeError('pandoc 없음')
+
+        report = main.run_stages({
+            'images': {'func': lambda r: 'images', 'deps': []},
+            'markdown': {'func': lambda r: False, 'deps': []},
+            'document': {'func': broken, 'deps': []},
+            'html': {'func': lambda r: 'html', 'deps': ['images', 'markdown']},
+            'pdf': {'func': lambda r: 'pdf', 'deps': ['document']},
+        })
+        self.assertEqual(self.statuses(report), {'images': 'ok', 'markdown': 'failed', 'document': 'failed',
+                                                 'html': 'skipped', 'pdf': 'skipped'})
+        self.assertEqual(report['stages']['document']['error'], 'RuntimeError: pandoc 없음')
+        self.assertEqual(report['stages']['html']['error'], '선행 단계 실패: markdown')
+        self.assertNotIn('html', report['results'])
+
+    def test_cycle_and_unknown_dependency(self):
+        report = main.run_stages({
+            'a': {'func': lambda r: 1, 'deps': ['b']},
+            'b': {'func': lambda r: 2, 'deps': ['a']},
+        })
+        self.assertEqual(self.statuses(report), {'a': 'skipped', 'b': 'skipped'})
+        self.assertEqual(report['stages']['a']['error'], '순환 의존')
+        with self.assertRaises(ValueError):
+            main.run_stages({'a': {'func': lambda r: 1, 'deps': ['missing']}})
+
+    def test_stage_stops_at_deadline(self):
+        def slow(results):
+            while True:
+                main.check_stage_deadline()
+                time.sleep(0.01)
+
+        report = main.run_stages({
+            'pdf': {'func': slow, 'deps': [], 'timeout': 0.1},
+            'stats': {'func': lambda r: 'stats', 'deps': ['pdf']},
+            'html': {'func': lambda r: 'html', 'deps': []},
+        })
+        self.assertEqual(self.statuses(report), {'pdf': 'timeout', 'stats': 'skipped', 'html': 'ok'})
+
+    def test_late_write_is_discarded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'thesis.html')
+
+            def late(results):
+                time.sleep(0.2)
+                main.write_chunks(['<html>'], path)
+
+            report = main.run_stages({'html': {'func': late, 'deps': [], 'timeout': 0.05}})
+            self.assertEqual(report['stages']['html']['status'], 'timeout')
+            self.assertEqual(os.listdir(tmp), [])
+
+    def test_deadline_check_outside_stage(self):
+        main.check_stage_deadline()
+        self.assertEqual(main.stage_time_left(5), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
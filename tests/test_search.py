@@ -0,0 +1,59 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+class VlqTest(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(11)
+        cases = [[], [0], [31], [32], [1023, 1024], [2 ** 40, 0, 5]]
+        cases.append([rng.randrange(1 << rng.randrange(1, 30)) for _ in range(500)])
+        for values in cases:
+            self.assertEqual(main.decode_vlq(main.encode_vlq(values)), values)
+
+    def test_small_values_take_one_digit(self):
+        self.assertEqual(len(main.encode_vlq(list(range(32)))), 32)
+        self.assertEqual(len(main.encode_vlq([32])), 2)
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        patcher = mock.patch.object(main, 'search_cache_dir', os.path.join(self.tmp, 'search'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        content = ('시계열 예측 서론.\n\n## 데이터\n\n대기질 데이터와 시계열 모델.\n\n'
+                   '## 모델\n\nLSTM 모델과 Transformer 모델, 모델 비교.')
+        self.document = {'chapters': [{'number': '1', 'title': '서론', 'content': content}]}
+
+    def test_query_ranks_sections(self):
+        index = main.build_search_index(self.document)
+        titles = [section[2] for section, _ in main.search_index(index, '모델')]
+        self.assertEqual(titles[0], '1.2 모델')
+        self.assertIn('1.1 데이터', titles)
+        results = main.search_index(index, '시계열 데이터')
+        self.assertEqual([(section[0], count) for section, count in results], [('section-1-1', 3)])
+        self.assertEqual(main.search_index(index, '없는말'), [])
+
+    def test_single_character_query(self):
+        index = main.build_search_index(self.document)
+        counts = {section[0]: count for section, count in main.search_index(index, '론')}
+        self.assertEqual(counts, {'chapter1': 2})
+
+    def test_write_and_load(self):
+        index = main.build_search_index(self.document)
+        path = os.path.join(self.tmp, 'index.js')
+        main.write_search_index(index, path)
+        self.assertEqual(main.load_search_index(path), index)
+
+
+if __name__ == '__main__':
+    unittest.main()
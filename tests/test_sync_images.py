@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+class SyncImagesTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+        self.src_dir = os.path.join(tmp.name, 'plots')
+        self.dst_dir = os.path.join(tmp.name, 'images')
+        os.makedirs(self.src_dir)
+        os.makedirs(self.dst_dir)
+        for name in ('a.png', 'b.png', 'c.png'):
+            self.write(os.path.join(self.src_dir, name), name)
+        # 사용자가 직접 둔 파일 (배치 기록에 없음)
+        self.write(os.path.join(self.dst_dir, 'manual.png'), 'manual')
+        self.manifest = {'files': {}, 'stages': {}}
+
+    def write(self, path, text):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def src(self, *names):
+        return [os.path.join(self.src_dir, name) for name in names]
+
+    def listing(self):
+        return sorted(os.listdir(self.dst_dir))
+
+    def test_places_and_records(self):
+        stats = main.sync_images(self.src('a.png', 'b.png'), self.dst_dir, link=False, manifest=self.manifest)
+        self.assertEqual(stats['copy'], 2)
+        self.assertEqual(self.listing(), ['a.png', 'b.png', 'manual.png'])
+        self.assertEqual(main.placed_images(self.manifest)[os.path.join(self.dst_dir, 'a.png')],
+                         os.path.join(self.src_dir, 'a.png'))
+        stats = main.sync_images(self.src('a.png', 'b.png'), self.dst_dir, link=False, manifest=self.manifest)
+        self.assertEqual(stats['skipped'], 2)
+
+    def test_prunes_only_placed_files(self):
+        main.sync_images(self.src('a.png', 'b.png'), self.dst_dir, link=False, manifest=self.manifest)
+        stats = main.sync_images(self.src('a.png'), self.dst_dir, link=False, manifest=self.manifest)
+        self.assertEqual(stats['removed'], 1)
+        self.assertEqual(self.listing(), ['a.png', 'manual.png'])
+        self.assertNotIn(os.path.join(self.dst_dir, 'b.png'), main.placed_images(self.manifest))
+
+    def test_keep_names_survive(self):
+        main.sync_images(self.src('a.png', 'c.png'), self.dst_dir, link=False, manifest=self.manifest)
+        stats = main.sync_images(self.src('a.png'), self.dst_dir, keep=('c.png',), link=False, manifest=self.manifest)
+        self.assertEqual(stats['removed'], 0)
+        self.assertEqual(self.listing(), ['a.png', 'c.png', 'manual.png'])
+
+    def test_other_directories_untouched(self):
+        other_dir = os.path.join(os.path.dirname(self.dst_dir), 'other')
+        main.sync_images(self.src('b.png'), other_dir, link=False, manifest=self.manifest)
+        main.sync_images(self.src('a.png'), self.dst_dir, link=False, manifest=self.manifest)
+        self.assertEqual(os.listdir(other_dir), ['b.png'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+CSV = ',MSE,RMSE,MAPE\narima,12.5,3.5355,20.04\nlstm,8.25,2.8723,15.5\ntransformer,6,2.4495,12.25\n'
+
+
+class TableDirectiveTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name, value in (('results_dir', tmp.name), ('table_cache_dir', os.path.join(tmp.name, 'tables'))):
+            patcher = mock.patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.enterContext(mock.patch.dict(main._table_memo, clear=True))
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+        with open(os.path.join(tmp.name, 'metrics.csv'), 'w', encoding='utf-8') as f:
+            f.write(CSV)
+
+    def expand(self, body):
+        return main.expand_table_directives(f"앞 문단\n\n```csv-table\n{body}```\n\n뒤 문단")
+
+    def test_selects_columns_rows_and_formats(self):
+        text = self.expand('source: metrics.csv\ncolumns: ["", RMSE, MAPE]\nrows: [lstm, arima]\n'
+                           'rename: {"": 모델}\nformat: ".2f"\nformats: {MAPE: ".1f"}\ncaption: 모델별 성능\n')
+        self.assertEqual(text, '앞 문단\n\n'
+                               '| 모델 | RMSE | MAPE |\n'
+                               '|---|---:|---:|\n'
+                               '| lstm | 2.87 | 15.5 |\n'
+                               '| arima | 3.54 | 20.0 |\n'
+                               '\n: 모델별 성능\n\n뒤 문단')
+
+    def test_whole_table_by_default(self):
+        text = self.expand('source: metrics.csv\n')
+        self.assertIn('|  | MSE | RMSE | MAPE |', text)
+        self.assertIn('| transformer | 6 | 2.4495 | 12.25 |', text)
+        self.assertNotIn('\n: ', text)
+
+    def test_errors_are_shown_in_text(self):
+        self.assertIn('**표 지시문 오류**', self.expand('source: metrics.csv\ncolumns: [R2]\n'))
+        self.assertIn('CSV에 없는 행: gru', self.expand('source: metrics.csv\nrows: [gru]\n'))
+        self.assertIn('알 수 없는 키: color', self.expand('source: metrics.csv\ncolor: red\n'))
+        self.assertIn('**표 지시문 오류**', self.expand('source: missing.csv\n'))
+
+    def test_text_without_directive_unchanged(self):
+        text = '```python\nprint(1)\n```'
+        self.assertIs(main.expand_table_directives(text), text)
+
+    def test_cached_table_reused(self):
+        first = self.expand('source: metrics.csv\ncaption: 성능\n')
+        main._table_memo.clear()
+        with mock.patch.object(main.csv, 'reader', side_effect=AssertionError('CSV를 다시 읽음')):
+            self.assertEqual(self.expand('source: metrics.csv\ncaption: 성능\n'), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+PAPER_FILES = [
+    '0_overview/0_3_abstract.md',
+    '2_background/2_1_forecasting.md',
+    '2_background/2_2_llm.md',
+    '4_experiments_and_results/4_1_setup.md',
+]
+
+
+class ChapterDependencyTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paper = os.path.join(tmp.name, 'paper')
+        for name, value in (('paper_dir', self.paper), ('output_dir', os.path.join(tmp.name, 'output')),
+                            ('site_dir', os.path.join(tmp.name, 'output', 'site'))):
+            patcher = mock.patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for name in PAPER_FILES:
+            os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+            with open(self.path(name), 'w', encoding='utf-8') as f:
+                f.write('내용\n')
+        self.manifest = {'stages': {}}
+        document = {'chapters': [{'number': number} for _, number, _, _ in main.DOCUMENT_CHAPTERS]}
+        main.record_chapter_outputs(self.manifest, document)
+
+    def path(self, name):
+        return os.path.join(self.paper, *name.split('/'))
+
+    def test_source_chapter_uses_folder_number(self):
+        self.assertEqual(main.source_chapter(self.path('2_background/2_2_llm.md')), '2')
+        self.assertEqual(main.source_chapter(self.path('4_experiments_and_results/4_1_setup.md')), '4')
+        self.assertIsNone(main.source_chapter(self.path('0_overview/0_3_abstract.md')))
+
+    def test_records_sources_and_outputs_per_chapter(self):
+        chapters = self.manifest['chapters']
+        self.assertEqual(chapters['2']['sources'],
+                         [self.path('2_background/2_1_forecasting.md'), self.path('2_background/2_2_llm.md')])
+        self.assertEqual(chapters['1']['sources'], [])
+        self.assertEqual(chapters['4']['outputs'], [os.path.join(main.output_dir, 'chapters', 'ch4.tex'),
+                                                    os.path.join(main.site_dir, 'chapter4.html')])
+
+    def test_changed_chapters(self):
+        changed = {self.path('2_background/2_2_llm.md'), self.path('4_experiments_and_results/4_1_setup.md')}
+        self.assertEqual(main.changed_chapters(changed, self.manifest), ['2', '4'])
+
+    def test_changes_outside_one_chapter_need_full_build(self):
+        self.assertIsNone(main.changed_chapters({self.path('0_overview/0_3_abstract.md')}, self.manifest))
+        self.assertIsNone(main.changed_chapters({self.path('2_background/2_3_new.md')}, self.manifest))
+        self.assertIsNone(main.changed_chapters({os.path.join(self.paper, 'data.csv')}, self.manifest))
+        os.remove(self.path('2_background/2_1_forecasting.md'))
+        self.assertIsNone(main.changed_chapters({self.path('2_background/2_1_forecasting.md')}, self.manifest))
+        self.assertIsNone(main.changed_chapters({self.path('2_background/2_2_llm.md')}, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+
+class WriteChunksTest(unittest.TestCase):
+    def test_targets(self):
+        chunks = ['<p>', '한글', '</p>']
+        buffer = io.BytesIO()
+        self.assertEqual(main.write_chunks(chunks, buffer), len('<p>한글</p>'.encode('utf-8')))
+        self.assertEqual(buffer.getvalue().decode('utf-8'), '<p>한글</p>')
+        text = io.StringIO()
+        main.write_chunks(chunks, text)
+        self.assertEqual(text.getvalue(), '<p>한글</p>')
+
+    def test_failed_write_keeps_previous_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out.html')
+            main.write_chunks(['old'], path)
+
+            def broken():
+                yield 'new'
+                raise RuntimeError('중단')
+            with self.assertRaises(RuntimeError):
+                main.write_chunks(broken(), path)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), 'old')
+            self.assertEqual(os.listdir(tmp), ['out.html'])
+
+    def test_threads_writing_same_target(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out.html')
+            barrier = threading.Barrier(8)
+            errors = []
+
+            def chunks(k):
+                barrier.wait()
+                for _ in range(200):
+                    yield f'{k}' * 100
+
+            def write(k):
+                try:
+                    main.write_chunks(chunks(k), path)
+                except Exception as e:
+                    errors.append(e)
+            threads = [threading.Thread(target=write, args=(k,)) for k in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            with open(path, encoding='utf-8') as f:
+                content = f.read()
+            self.assertEqual(len(content), 20000)
+            self.assertEqual(len(set(content)), 1)
+            self.assertEqual(os.listdir(tmp), ['out.html'])
+
+
+if __name__ == '__main__':
+    unittest.main()